@@ -0,0 +1,82 @@
+"""CLI commands for managing the background CentML agent."""
+
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from centml.sdk.agent import connect_agent
+from centml.sdk.config import settings
+
+# How long `agent start` waits for the daemon to accept connections.
+START_TIMEOUT = 10.0
+
+
+def stop_running_agent():
+    """Ask a running agent to exit; returns False when none is running."""
+    agent_client = connect_agent(match_identity=False)
+    if agent_client is None:
+        return False
+    agent_client.request("shutdown")
+    return True
+
+
+@click.group(help="Manage the background agent that keeps CLI connections warm")
+def agent():
+    pass
+
+
+@agent.command(help="Start the agent")
+@click.option("--foreground", is_flag=True, default=False, help="Run in the foreground instead of daemonizing")
+def start(foreground):
+    if not settings.CENTML_AGENT_SOCKET:
+        raise click.ClickException("The agent is disabled (CENTML_AGENT_SOCKET is empty)")
+
+    agent_client = connect_agent(match_identity=False)
+    if agent_client is not None:
+        click.echo(f"Agent already running (pid {agent_client.pid})")
+        return
+
+    if foreground:
+        from centml.sdk.agent.server import serve  # pylint: disable=import-outside-toplevel
+
+        click.echo(f"Agent listening on {settings.CENTML_AGENT_SOCKET}")
+        serve()
+        return
+
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "centml.sdk.agent.server"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        cwd=os.path.expanduser("~"),
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        agent_client = connect_agent(match_identity=False)
+        if agent_client is not None:
+            click.echo(f"Agent started (pid {agent_client.pid})")
+            return
+        time.sleep(0.1)
+    raise click.ClickException("Agent did not start; run `centml agent start --foreground` to see why")
+
+
+@agent.command(help="Stop the agent")
+def stop():
+    if stop_running_agent():
+        click.echo("Agent stopped")
+    else:
+        click.echo("Agent is not running")
+
+
+@agent.command(help="Show whether the agent is running")
+def status():
+    agent_client = connect_agent(match_identity=False)
+    if agent_client is None:
+        click.echo("Agent is not running")
+    else:
+        click.echo(f"Agent running (pid {agent_client.pid}) on {settings.CENTML_AGENT_SOCKET}")
@@ -12,6 +12,8 @@ from centml.sdk import (
     HardwareInstanceResponse,
 )
 from centml.sdk.api import get_centml_client
+from centml.cli.completion import store_deployments
+from centml.cli.resolve import DEPLOYMENT
 
 # convert deployment type enum to a user friendly name
 depl_type_to_name_map = {
@@ -183,6 +185,9 @@ def ls(type):
     with get_centml_client() as cclient:
         depl_type = depl_name_to_type_map[type] if type in depl_name_to_type_map else None
         deployments = cclient.get(depl_type)
+        if depl_type is None:
+            # A full listing is exactly what shell completion caches; keep it fresh for free.
+            store_deployments(deployments)
         rows = []
         for d in deployments:
             if d.type in depl_type_to_name_map:
@@ -208,7 +213,7 @@ def ls(type):
 
 @click.command(help="Get deployment details")
 @click.argument("type", type=click.Choice(list(depl_name_to_type_map.keys())))
-@click.argument("id", type=int)
+@click.argument("id", type=DEPLOYMENT)
 @handle_exception
 def get(type, id):
     with get_centml_client() as cclient:
@@ -299,7 +304,7 @@ def get(type, id):
 
 
 @click.command(help="Delete a deployment")
-@click.argument("id", type=int)
+@click.argument("id", type=DEPLOYMENT)
 @handle_exception
 def delete(id):
     with get_centml_client() as cclient:
@@ -308,7 +313,7 @@ def delete(id):
 
 
 @click.command(help="Pause a deployment")
-@click.argument("id", type=int)
+@click.argument("id", type=DEPLOYMENT)
 @handle_exception
 def pause(id):
     with get_centml_client() as cclient:
@@ -317,7 +322,7 @@ def pause(id):
 
 
 @click.command(help="Resume a deployment")
-@click.argument("id", type=int)
+@click.argument("id", type=DEPLOYMENT)
 @handle_exception
 def resume(id):
     with get_centml_client() as cclient:
@@ -0,0 +1,143 @@
+"""Shell-completion callbacks for deployment ids and pod names.
+
+Completion runs on every TAB press, so the callbacks only ever read the
+local cache. When a cached entry is older than its TTL, a detached process
+refreshes it in the background and the slightly stale entry is served in
+the meantime.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from click.shell_completion import CompletionItem
+
+from centml.sdk import DeploymentStatus
+from centml.sdk.api import get_centml_client
+from centml.sdk.config import settings
+from centml.sdk.shell import get_running_pods
+from centml.sdk.utils.disk_cache import read_cache, write_cache
+
+DEPLOYMENTS_CACHE = "deployments"
+# Seconds before a cached entry is refreshed in the background.
+DEPLOYMENTS_TTL = 60
+PODS_TTL = 15
+# A background refresh that has not finished after this many seconds is
+# assumed to have died, and another one may be started.
+REFRESH_LOCK_TIMEOUT = 30
+
+
+def pods_cache_name(deployment_id):
+    return f"pods-{deployment_id}"
+
+
+def store_deployments(deployments):
+    """Save a deployment listing for completion; callers that already fetched one pass it here."""
+    try:
+        write_cache(
+            DEPLOYMENTS_CACHE,
+            [{"id": d.id, "name": d.name, "type": d.type.value, "status": d.status.value} for d in deployments],
+        )
+    except OSError:
+        # The cache is best-effort; an unwritable cache dir must not break the caller.
+        pass
+
+
+def refresh_deployments():
+    with get_centml_client() as cclient:
+        store_deployments(cclient.get(None))
+
+
+def refresh_pods(deployment_id):
+    with get_centml_client() as cclient:
+        write_cache(pods_cache_name(deployment_id), get_running_pods(cclient, deployment_id))
+
+
+def _lock_path(cache_name):
+    return os.path.join(settings.CENTML_CACHE_PATH, f".{cache_name}.refresh")
+
+
+def _claim_refresh(cache_name):
+    os.makedirs(settings.CENTML_CACHE_PATH, exist_ok=True)
+    lock_path = _lock_path(cache_name)
+    for _ in range(2):
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < REFRESH_LOCK_TIMEOUT:
+                    return False
+                os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def _refresh_in_background(cache_name, *args):
+    try:
+        if not _claim_refresh(cache_name):
+            return
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-m", "centml.cli.completion", cache_name, *map(str, args)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        # Completion must never fail loudly; the next TAB will try again.
+        pass
+
+
+def _cached(cache_name, ttl, *refresh_args):
+    data, age = read_cache(cache_name)
+    if data is None or age > ttl:
+        _refresh_in_background(cache_name, *refresh_args)
+    return data or []
+
+
+def complete_deployment(ctx, param, incomplete):
+    """Complete deployment ids, plus the names of deployments that are not deleted."""
+    items = []
+    for d in _cached(DEPLOYMENTS_CACHE, DEPLOYMENTS_TTL):
+        if str(d["id"]).startswith(incomplete):
+            items.append(CompletionItem(str(d["id"]), help=d["name"]))
+        elif (
+            d["name"].startswith(incomplete)
+            and d.get("status") != DeploymentStatus.DELETED.value
+            and not incomplete.isdigit()
+        ):
+            items.append(CompletionItem(d["name"], help=str(d["id"])))
+    return items
+
+
+def complete_pod_name(ctx, param, incomplete):
+    deployment_id = ctx.params.get("deployment_id")
+    # Commands taking a list of deployments complete pods when only one is given.
+    deployment_ids = ctx.params.get("deployment_ids")
+    if deployment_ids and len(deployment_ids) == 1:
+        deployment_id = deployment_ids[0]
+    # Unresolved names are left as strings while completing.
+    if not isinstance(deployment_id, int):
+        return []
+    cache_name = pods_cache_name(deployment_id)
+    return [CompletionItem(pod) for pod in _cached(cache_name, PODS_TTL, deployment_id) if pod.startswith(incomplete)]
+
+
+def main(cache_name, *args):
+    try:
+        if cache_name == DEPLOYMENTS_CACHE:
+            refresh_deployments()
+        else:
+            refresh_pods(int(args[0]))
+    finally:
+        try:
+            os.unlink(_lock_path(cache_name))
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -11,7 +11,9 @@ import click
 import requests
 
 
+from centml.cli.agent import stop_running_agent
 from centml.sdk import auth
+from centml.sdk.agent import connect_agent
 from centml.sdk.config import settings
 
 CLIENT_ID = settings.CENTML_WORKOS_CLIENT_ID
@@ -64,6 +66,13 @@ class OAuthHandler(BaseHTTPRequestHandler):
         pass
 
 
+def _reset_agent():
+    # Make a running agent drop its cached token and pick up the new credentials.
+    agent_client = connect_agent()
+    if agent_client is not None:
+        agent_client.request("reset")
+
+
 def get_auth_code():
     server = HTTPServer((SERVER_HOST, SERVER_PORT), OAuthHandler)
     server.handle_request()
@@ -93,6 +102,7 @@ def login(token_file):
     cred = auth.load_centml_cred()
     if cred is not None and auth.refresh_centml_token(cred.get("refresh_token")):
         click.echo("Authenticating with stored credentials...\n")
+        _reset_agent()
         click.echo("✅ Login successful")
     else:
         click.echo("Logging into CentML...")
@@ -121,6 +131,7 @@ def login(token_file):
                     os.makedirs(os.path.dirname(settings.CENTML_CRED_FILE_PATH), exist_ok=True)
                     with open(settings.CENTML_CRED_FILE_PATH, "w") as f:
                         json.dump(cred, f)
+                    _reset_agent()
                     click.echo("✅ Login successful")
             except Exception as e:
                 click.echo(f"Login failed: {e}")
@@ -131,4 +142,6 @@ def login(token_file):
 @click.command(help="Logout from CentML")
 def logout():
     auth.remove_centml_cred()
+    # A running agent would otherwise keep serving requests with the old token.
+    stop_running_agent()
     click.echo("Logout successful")
@@ -0,0 +1,279 @@
+"""CLI command for reading and tailing deployment logs."""
+
+import json
+import re
+import sys
+from datetime import datetime, timezone
+
+import click
+
+from centml.cli.cluster import handle_exception
+from centml.cli.resolve import DEPLOYMENT
+from centml.sdk.api import get_centml_client
+from centml.sdk.logs import aggregate_events, export_events, filter_events, format_event
+from centml.sdk.logs.follow import now_ms
+
+_DURATION_RE = re.compile(r"^(\d+)([smhd])$")
+_UNIT_MS = {"s": 1000, "m": 60 * 1000, "h": 60 * 60 * 1000, "d": 24 * 60 * 60 * 1000}
+_SIZE_RE = re.compile(r"^(\d+)([KMG]?)B?$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_time(value, now):
+    """Parse a --since/--until value into Unix milliseconds.
+
+    Accepts a duration before *now* (``90s``, ``30m``, ``2h``, ``1d``), an
+    ISO 8601 timestamp (UTC unless it carries an offset) or raw epoch
+    milliseconds.
+    """
+    value = value.strip()
+    match = _DURATION_RE.match(value)
+    if match:
+        return now - int(match.group(1)) * _UNIT_MS[match.group(2)]
+    if value.isdigit():
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise click.BadParameter(f"'{value}' is not a duration (e.g. 30m) or an ISO 8601 time") from e
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def parse_duration_seconds(value):
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise click.BadParameter(f"'{value}' is not a duration (e.g. 15m, 1h, 1d)")
+    return int(match.group(1)) * _UNIT_MS[match.group(2)] // 1000
+
+
+def parse_size(value):
+    match = _SIZE_RE.match(value.strip())
+    if not match:
+        raise click.BadParameter(f"'{value}' is not a size (e.g. 500M, 2G)")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).upper()]
+
+
+def _resolve_revision(cclient, deployment_id, revision):
+    if revision is not None:
+        return revision
+    revision = cclient.get_current_revision_number(deployment_id)
+    if revision is None:
+        raise click.ClickException(f"No revisions found for deployment {deployment_id}")
+    return revision
+
+
+class LogSourceParamType(click.ParamType):
+    """A deployment id or name, optionally followed by ``:REVISION``; converts to (id, revision or None)."""
+
+    name = "deployment[:revision]"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        deployment, sep, revision = value.rpartition(":")
+        if not sep or not revision.isdigit():
+            deployment, revision = value, None
+        return DEPLOYMENT.convert(deployment, param, ctx), None if revision is None else int(revision)
+
+    def shell_complete(self, ctx, param, incomplete):
+        return DEPLOYMENT.shell_complete(ctx, param, incomplete)
+
+
+LOG_SOURCE = LogSourceParamType()
+
+
+def _format_tagged_event(event):
+    source = event["source"]
+    return f"{source['deployment_id']}:{source['revision_number']} {format_event(event)}"
+
+
+def _event_formatter(output, fields=None, tagged=False):
+    if output == "ndjson":
+        return lambda event: json.dumps(event, separators=(",", ":"), default=str)
+    if fields:
+        return lambda event: "\t".join("" if event[name] is None else str(event[name]) for name in fields)
+    return _format_tagged_event if tagged else format_event
+
+
+def _echo_stats(stats):
+    click.echo(f"{stats.total} events")
+    for level, count in stats.by_level.most_common():
+        click.echo(f"  {level:<10} {count}")
+    for bucket, count in stats.histogram():
+        minute = datetime.fromtimestamp(bucket / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        click.echo(f"{minute}  {count}")
+
+
+@click.command(
+    help="Show logs of a deployment. Given several DEPLOYMENT[:REVISION] sources, their logs are "
+    "fetched concurrently and merged into one timestamp-ordered stream tagged with the source."
+)
+@click.argument("sources", nargs=-1, required=True, type=LOG_SOURCE)
+@click.option(
+    "--revision", type=int, default=None, help="Revision for sources without one (defaults to the current revision)"
+)
+@click.option("--since", default="1h", show_default=True, help="Start time: a duration ago (30m, 2h, 1d) or ISO 8601")
+@click.option("--until", default=None, help="End time, same formats as --since (defaults to now)")
+@click.option("--follow", "-f", is_flag=True, default=False, help="Keep polling for new log events")
+@click.option("--poll-interval", type=float, default=2.0, show_default=True, help="Seconds between polls with --follow")
+@click.option(
+    "--output", "-o", type=click.Choice(["text", "ndjson"]), default="text", show_default=True, help="Output format"
+)
+@click.option("--cache", is_flag=True, default=False, help="Serve already fetched time ranges from the local log cache")
+@click.option("--grep", "-e", "patterns", multiple=True, help="Only show events whose message matches this regex")
+@click.option("--ignore-case", "-i", is_flag=True, default=False, help="Match --grep patterns case-insensitively")
+@click.option("--invert-match", "-v", is_flag=True, default=False, help="Show events that do not match --grep")
+@click.option(
+    "--level",
+    type=click.Choice(["trace", "debug", "info", "warning", "error", "critical"], case_sensitive=False),
+    default=None,
+    help="Only show events at this level or above",
+)
+@click.option("--field", "fields", multiple=True, help="Only output these event fields (dotted for nested ones)")
+@click.option("--max-matches", type=int, default=None, help="Stop after this many matching events")
+@click.option("--count", is_flag=True, default=False, help="Print counts per level and per minute instead of events")
+@handle_exception
+def logs(  # pylint: disable=R0917
+    sources,
+    revision,
+    since,
+    until,
+    follow,
+    poll_interval,
+    output,
+    cache,
+    patterns,
+    ignore_case,
+    invert_match,
+    level,
+    fields,
+    max_matches,
+    count,
+):
+    if follow and until is not None:
+        raise click.UsageError("--until cannot be combined with --follow")
+    if follow and count:
+        raise click.UsageError("--count cannot be combined with --follow")
+    merged = len(sources) > 1
+    if merged and (follow or cache):
+        raise click.UsageError("--follow and --cache take a single deployment")
+
+    now = now_ms()
+    start_time = parse_time(since, now)
+    end_time = parse_time(until, now) if until is not None else now
+    formatter = _event_formatter(output, fields, tagged=merged)
+
+    with get_centml_client() as cclient:
+        sources = [
+            (
+                deployment_id,
+                _resolve_revision(cclient, deployment_id, revision if source_revision is None else source_revision),
+            )
+            for deployment_id, source_revision in sources
+        ]
+        deployment_id, revision = sources[0]
+
+        if merged:
+            events = cclient.get_merged_deployment_logs(
+                sources, start_time, end_time, adaptive_line_count=True, stream=True
+            )
+        elif follow:
+            events = cclient.follow_deployment_logs(deployment_id, revision, start_time, poll_interval=poll_interval)
+        else:
+            events = cclient.get_deployment_logs(
+                deployment_id,
+                revision,
+                start_time,
+                end_time,
+                stream=True,
+                prefetch=2,
+                adaptive_line_count=True,
+                cache=cache,
+            )
+
+        if patterns or level or fields or max_matches is not None:
+            events = filter_events(
+                events,
+                patterns,
+                ignore_case=ignore_case,
+                invert=invert_match,
+                min_level=level,
+                fields=None if count else fields,
+                max_matches=max_matches,
+            )
+
+        if count:
+            _echo_stats(aggregate_events(events))
+            return
+
+        out = sys.stdout
+        try:
+            for event in events:
+                out.write(formatter(event) + "\n")
+                if follow:
+                    out.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.flush()
+
+
+def _report_export_progress(stats):
+    click.echo(
+        f"\r{stats.events} events, {stats.events_per_second:,.0f} events/s, "
+        f"{stats.bytes_written / 1024**2:.1f} MB in {len(stats.files)} file(s)",
+        nl=False,
+        err=True,
+    )
+
+
+@click.command(name="export-logs", help="Export deployment logs to compressed NDJSON files")
+@click.argument("deployment_id", type=DEPLOYMENT)
+@click.argument("output", type=click.Path(dir_okay=False, writable=True))
+@click.option("--revision", type=int, default=None, help="Revision number (defaults to the current revision)")
+@click.option("--since", default="1d", show_default=True, help="Start time: a duration ago (30m, 2h, 1d) or ISO 8601")
+@click.option("--until", default=None, help="End time, same formats as --since (defaults to now)")
+@click.option(
+    "--compression", type=click.Choice(["gzip", "zstd", "none"]), default="gzip", show_default=True, help="Compression"
+)
+@click.option("--rotate-size", default=None, help="Start a new file after this compressed size (e.g. 500M)")
+@click.option("--rotate-interval", default=None, help="Start a new file for every window of log time (e.g. 1h)")
+@click.option(
+    "--shards", type=int, default=1, show_default=True, help="Split the window into concurrently fetched shards"
+)
+@click.option("--max-workers", type=int, default=4, show_default=True, help="Concurrent requests when sharding")
+@handle_exception
+def export_logs(  # pylint: disable=R0917
+    deployment_id, output, revision, since, until, compression, rotate_size, rotate_interval, shards, max_workers
+):
+    now = now_ms()
+    start_time = parse_time(since, now)
+    end_time = parse_time(until, now) if until is not None else now
+
+    with get_centml_client() as cclient:
+        revision = _resolve_revision(cclient, deployment_id, revision)
+        events = cclient.get_deployment_logs(
+            deployment_id,
+            revision,
+            start_time,
+            end_time,
+            stream=True,
+            prefetch=2,
+            adaptive_line_count=True,
+            shards=shards,
+            max_workers=max_workers,
+        )
+        stats = export_events(
+            events,
+            output,
+            compression=compression,
+            rotate_bytes=parse_size(rotate_size) if rotate_size else None,
+            rotate_seconds=parse_duration_seconds(rotate_interval) if rotate_interval else None,
+            progress=_report_export_progress,
+        )
+
+    click.echo(err=True)
+    for path in stats.files:
+        click.echo(path)
@@ -1,8 +1,11 @@
 import click
 
+from centml.cli.agent import agent
 from centml.cli.login import login, logout
 from centml.cli.cluster import ls, get, delete, pause, resume, capacity
-from centml.cli.shell import shell, exec_cmd
+from centml.cli.shell import shell, exec_cmd, cp, sync
+from centml.cli.logs import logs, export_logs
+from centml.cli.top import top
 
 
 @click.group()
@@ -29,6 +32,7 @@ def cli():
 
 cli.add_command(login)
 cli.add_command(logout)
+cli.add_command(agent)
 
 
 @click.group(help="CentML cluster CLI tool")
@@ -42,8 +46,13 @@ ccluster.add_command(delete)
 ccluster.add_command(pause)
 ccluster.add_command(resume)
 ccluster.add_command(capacity)
+ccluster.add_command(top)
 ccluster.add_command(shell)
 ccluster.add_command(exec_cmd, name="exec")
+ccluster.add_command(cp)
+ccluster.add_command(sync)
+ccluster.add_command(logs)
+ccluster.add_command(export_logs)
 
 
 cli.add_command(ccluster, name="cluster")
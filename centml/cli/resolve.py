@@ -0,0 +1,95 @@
+"""Resolve deployment names given on the command line to deployment ids.
+
+Names are looked up in the deployment listing cached for shell completion,
+so a name-based command normally costs one local file read. The listing is
+only re-downloaded when a name is missing from it or points at a deleted
+deployment.
+"""
+
+import click
+from click.shell_completion import CompletionItem
+
+from centml.cli.completion import DEPLOYMENTS_CACHE, complete_deployment, refresh_deployments
+from centml.sdk import DeploymentStatus
+from centml.sdk.utils.disk_cache import read_cache
+
+
+def _lookup(entries, name):
+    matches = [d for d in entries or [] if d["name"] == name]
+    live = [d for d in matches if d.get("status") != DeploymentStatus.DELETED.value]
+    return live or matches
+
+
+def resolve_deployment_name(name, refresh=True):
+    """Return the id of the deployment called *name*, or None if there is none.
+
+    Raises click.UsageError when several live deployments share the name.
+    """
+    entries, _ = read_cache(DEPLOYMENTS_CACHE)
+    matches = _lookup(entries, name)
+    # A name that only matches deleted deployments may have been reused since.
+    stale = all(d.get("status") == DeploymentStatus.DELETED.value for d in matches)
+    if stale and refresh:
+        refresh_deployments()
+        entries, _ = read_cache(DEPLOYMENTS_CACHE)
+        matches = _lookup(entries, name)
+
+    if not matches:
+        return None
+    if len(matches) > 1:
+        ids = ", ".join(str(d["id"]) for d in matches)
+        raise click.UsageError(f"Deployment name '{name}' is ambiguous (ids: {ids}); use an id instead")
+    return matches[0]["id"]
+
+
+class DeploymentParamType(click.ParamType):
+    """Accepts a deployment id or name and converts it to the numeric id.
+
+    All-digit values are always treated as ids.
+    """
+
+    name = "deployment"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        if value.isdigit():
+            return int(value)
+
+        # Completion parses the command line on every TAB: never hit the API then.
+        resilient = ctx is not None and ctx.resilient_parsing
+        deployment_id = resolve_deployment_name(value, refresh=not resilient)
+        if deployment_id is None:
+            if resilient:
+                return value
+            self.fail(f"No deployment named '{value}'", param, ctx)
+        return deployment_id
+
+    def shell_complete(self, ctx, param, incomplete):
+        return complete_deployment(ctx, param, incomplete)
+
+
+DEPLOYMENT = DeploymentParamType()
+
+
+class DeploymentListParamType(click.ParamType):
+    """Accepts comma-separated deployment ids or names and converts them to a tuple of ids."""
+
+    name = "deployments"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        parts = [part.strip() for part in value.split(",") if part.strip()]
+        if not parts:
+            self.fail("No deployment given", param, ctx)
+        return tuple(DEPLOYMENT.convert(part, param, ctx) for part in parts)
+
+    def shell_complete(self, ctx, param, incomplete):
+        head, sep, last = incomplete.rpartition(",")
+        return [
+            CompletionItem(head + sep + item.value, help=item.help) for item in complete_deployment(ctx, param, last)
+        ]
+
+
+DEPLOYMENTS = DeploymentListParamType()
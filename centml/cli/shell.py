@@ -1,16 +1,37 @@
 """CLI commands for interactive shell and command execution in deployment pods."""
 
 import asyncio
+import os
 import shlex
 import sys
+from contextlib import contextmanager
 
 import click
+import websockets
 
 from centml.cli.cluster import handle_exception
+from centml.cli.completion import complete_pod_name, pods_cache_name
+from centml.cli.resolve import DEPLOYMENT, DEPLOYMENTS
 from centml.sdk import auth
 from centml.sdk.api import get_centml_client
 from centml.sdk.config import settings
-from centml.sdk.shell import build_ws_url, exec_session, get_running_pods, interactive_session
+from centml.sdk.shell import (
+    ExecSession,
+    ShellError,
+    build_ws_url,
+    copy_from_pod,
+    copy_to_pod,
+    exec_binary_session,
+    exec_session,
+    get_running_pods,
+    interactive_session,
+    sync_to_pod,
+)
+from centml.sdk.utils.disk_cache import invalidate_cache, read_cache, write_cache
+
+# Running pod lists younger than this are used without asking the API again,
+# so repeated shell/exec calls skip the status lookup.
+RUNNING_PODS_TTL = 5
 
 
 def _select_pod(running_pods, deployment_id):
@@ -24,37 +45,69 @@ def _select_pod(running_pods, deployment_id):
     return running_pods[choice - 1]
 
 
+def _cached_running_pods(deployment_id):
+    pods, age = read_cache(pods_cache_name(deployment_id))
+    return pods if pods is not None and age <= RUNNING_PODS_TTL else None
+
+
+def _fetch_running_pods(cclient, deployment_id):
+    running_pods = get_running_pods(cclient, deployment_id)
+    try:
+        write_cache(pods_cache_name(deployment_id), running_pods)
+    except OSError:
+        # The cache is best-effort; an unwritable cache dir must not break the caller.
+        pass
+    return running_pods
+
+
+@contextmanager
+def _forget_pods_on_failure(deployment_id):
+    """Drop the cached pod list when connecting fails, e.g. because the pod went away."""
+    try:
+        yield
+    except (OSError, websockets.InvalidHandshake):
+        invalidate_cache(pods_cache_name(deployment_id))
+        raise
+
+
 def _connect_args(deployment_id, pod, shell_type, first_pod=False):
-    """Resolve pod, build WebSocket URL, and obtain auth token."""
-    with get_centml_client() as cclient:
-        running_pods = get_running_pods(cclient, deployment_id)
-        if not running_pods:
-            raise click.ClickException(f"No running pods found for deployment {deployment_id}")
-
-        if pod is not None and pod not in running_pods:
-            pods_list = ", ".join(running_pods)
-            raise click.ClickException(f"Pod '{pod}' not found. Available running pods: {pods_list}")
-
-        if pod is not None:
-            pod_name = pod
-        elif len(running_pods) == 1 or first_pod:
-            pod_name = running_pods[0]
-        elif not sys.stdin.isatty():
-            raise click.ClickException(
-                "Multiple running pods found and stdin is not a TTY. "
-                "Please specify a pod with --pod or use --first-pod."
-            )
-        else:
-            pod_name = _select_pod(running_pods, deployment_id)
+    """Resolve pod, build WebSocket URL, and obtain auth token.
 
-    ws_url = build_ws_url(settings.CENTML_PLATFORM_API_URL, deployment_id, pod_name, shell_type)
+    The token is fetched once and also used for the running pod lookup,
+    which is skipped entirely when the pods were cached moments ago.
+    """
     token = auth.get_centml_token()
+
+    running_pods = _cached_running_pods(deployment_id)
+    # A pod missing from the cached list may have started since.
+    if running_pods is None or (pod is not None and pod not in running_pods):
+        with get_centml_client(token) as cclient:
+            running_pods = _fetch_running_pods(cclient, deployment_id)
+    if not running_pods:
+        raise click.ClickException(f"No running pods found for deployment {deployment_id}")
+
+    if pod is not None and pod not in running_pods:
+        pods_list = ", ".join(running_pods)
+        raise click.ClickException(f"Pod '{pod}' not found. Available running pods: {pods_list}")
+
+    if pod is not None:
+        pod_name = pod
+    elif len(running_pods) == 1 or first_pod:
+        pod_name = running_pods[0]
+    elif not sys.stdin.isatty():
+        raise click.ClickException(
+            "Multiple running pods found and stdin is not a TTY. Please specify a pod with --pod or use --first-pod."
+        )
+    else:
+        pod_name = _select_pod(running_pods, deployment_id)
+
+    ws_url = build_ws_url(settings.CENTML_PLATFORM_API_URL, deployment_id, pod_name, shell_type)
     return ws_url, token
 
 
 @click.command(help="Open an interactive shell to a deployment pod")
-@click.argument("deployment_id", type=int)
-@click.option("--pod", default=None, help="Specify a pod name")
+@click.argument("deployment_id", type=DEPLOYMENT)
+@click.option("--pod", default=None, shell_complete=complete_pod_name, help="Specify a pod name")
 @click.option("--shell", "shell_type", default=None, type=click.Choice(["bash", "sh", "zsh"]), help="Shell type")
 @click.option(
     "--first-pod", is_flag=True, default=False, help="Auto-select the first running pod (skip interactive selection)"
@@ -65,20 +118,277 @@ def shell(deployment_id, pod, shell_type, first_pod):
         raise click.ClickException("Interactive shell requires a terminal (TTY)")
 
     ws_url, token = _connect_args(deployment_id, pod, shell_type, first_pod)
-    exit_code = asyncio.run(interactive_session(ws_url, token))
+    with _forget_pods_on_failure(deployment_id):
+        exit_code = asyncio.run(interactive_session(ws_url, token))
+    sys.exit(exit_code)
+
+
+def read_batch(lines):
+    """Commands of a batch file: one per line, skipping blank lines and ``#`` comments."""
+    commands = (line.strip() for line in lines)
+    return [command for command in commands if command and not command.startswith("#")]
+
+
+def _write_output(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+async def _exec_batch(ws_url, token, commands, fail_fast):
+    """Run commands in one remote shell; return the first non-zero exit code (0 if all succeeded)."""
+    exit_code = 0
+    async with ExecSession(ws_url, token) as session:
+        for command in commands:
+            click.echo(f"$ {command}", err=True)
+            result = await session.run(command, write=_write_output)
+            if result.exit_code:
+                click.echo(f"'{command}' exited with {result.exit_code}", err=True)
+                exit_code = exit_code or result.exit_code
+                if fail_fast:
+                    break
+    return exit_code
+
+
+def _fanout_targets(deployment_ids, all_pods, token):
+    """(deployment id, pod) pairs to run on: every running pod, or the first one of each deployment."""
+    running = {deployment_id: _cached_running_pods(deployment_id) for deployment_id in deployment_ids}
+    missing = [deployment_id for deployment_id, pods in running.items() if pods is None]
+    if missing:
+        with get_centml_client(token) as cclient:
+            running.update((deployment_id, _fetch_running_pods(cclient, deployment_id)) for deployment_id in missing)
+
+    targets = []
+    for deployment_id in deployment_ids:
+        running_pods = running[deployment_id]
+        if not running_pods:
+            click.echo(f"No running pods found for deployment {deployment_id}, skipping it", err=True)
+        targets.extend((deployment_id, pod) for pod in (running_pods if all_pods else running_pods[:1]))
+    if not targets:
+        raise click.ClickException("No running pods found")
+    return targets
+
+
+def _prefixed_writer(label):
+    prefix = f"[{label}] "
+    # exec_session output ends with a blank line of its own, so blank lines
+    # are held back until more output follows them.
+    blank = []
+
+    def _write(text):
+        out = []
+        for line in text.splitlines(keepends=True):
+            if not line.strip("\r\n"):
+                blank.append(line)
+                continue
+            out.extend(prefix + held for held in blank)
+            blank.clear()
+            out.append(prefix + line)
+        if out:
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
+
+    return _write
+
+
+async def _exec_fanout(targets, token, command, shell_type, parallel, output_dir=None):  # pylint: disable=R0917
+    """Run a command on every (deployment id, pod) target, at most ``parallel`` at a time.
+
+    Output lines are prefixed with their target, or written to one file per
+    target in ``output_dir``. Returns (label, exit code) pairs in target order.
+    """
+    semaphore = asyncio.Semaphore(parallel)
+    several_deployments = len({deployment_id for deployment_id, _ in targets}) > 1
+
+    async def _run(deployment_id, pod):
+        label = f"{deployment_id}/{pod}" if several_deployments else pod
+        ws_url = build_ws_url(settings.CENTML_PLATFORM_API_URL, deployment_id, pod, shell_type)
+        async with semaphore:
+            try:
+                with _forget_pods_on_failure(deployment_id):
+                    if output_dir is None:
+                        return label, await exec_session(ws_url, token, command, write=_prefixed_writer(label))
+                    path = os.path.join(output_dir, f"{deployment_id}-{pod}.log")
+                    with open(path, "w", encoding="utf-8") as f:
+                        return label, await exec_session(ws_url, token, command, write=f.write)
+            except Exception as e:  # pylint: disable=broad-except
+                # One unreachable pod must not stop the others.
+                click.echo(f"[{label}] {e}", err=True)
+                return label, 1
+
+    return await asyncio.gather(*(_run(deployment_id, pod) for deployment_id, pod in targets))
+
+
+def _echo_summary(results):
+    for label, exit_code in results:
+        click.echo(f"{label}: {'ok' if exit_code == 0 else f'exit code {exit_code}'}", err=True)
+    succeeded = sum(1 for _, exit_code in results if exit_code == 0)
+    click.echo(f"{succeeded}/{len(results)} succeeded", err=True)
+
+
+def _echo_transfer_stats(stats):
+    megabytes = stats.bytes / 1024**2
+    click.echo(f"{megabytes:.1f} MB in {stats.seconds:.1f}s ({stats.bytes_per_second / 1024**2:.1f} MB/s)", err=True)
+
+
+@click.command(
+    help="Execute a command in a deployment pod. With --batch, run the commands of a file "
+    "(one per line, '-' for stdin) one after another in a single remote shell. Given several "
+    "comma-separated deployments or --all-pods, run the command on all targets concurrently.",
+    context_settings={"ignore_unknown_options": True},
+)
+@click.argument("deployment_ids", metavar="DEPLOYMENT[,DEPLOYMENT...]", type=DEPLOYMENTS)
+@click.argument("command", nargs=-1, type=click.UNPROCESSED)
+@click.option("--pod", default=None, shell_complete=complete_pod_name, help="Specific pod name")
+@click.option("--shell", "shell_type", default=None, type=click.Choice(["bash", "sh", "zsh"]), help="Shell type")
+@click.option(
+    "--first-pod", is_flag=True, default=False, help="Auto-select the first running pod (skip interactive selection)"
+)
+@click.option("--batch", type=click.File("r"), default=None, help="File of commands to run in one shell session")
+@click.option("--fail-fast", is_flag=True, default=False, help="With --batch, stop at the first failing command")
+@click.option("--all-pods", is_flag=True, default=False, help="Run on every running pod of the deployments")
+@click.option(
+    "--parallel", type=click.IntRange(min=1), default=8, show_default=True, help="Pods to run on at the same time"
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Write each pod's output to DEPLOYMENT-POD.log here instead of prefixing lines",
+)
+@click.option(
+    "--binary",
+    is_flag=True,
+    default=False,
+    help="Pass the command's stdout through byte-exact, e.g. to redirect an archive into a file",
+)
+@handle_exception
+def exec_cmd(  # pylint: disable=R0917
+    deployment_ids, command, pod, shell_type, first_pod, batch, fail_fast, all_pods, parallel, output_dir, binary
+):
+    if bool(command) == (batch is not None):
+        raise click.UsageError("Pass either a COMMAND or --batch")
+    if binary and batch is not None:
+        raise click.UsageError("--binary cannot be combined with --batch")
+
+    if all_pods or len(deployment_ids) > 1:
+        if pod is not None or batch is not None or binary:
+            raise click.UsageError("--pod, --batch and --binary take a single deployment and pod")
+        token = auth.get_centml_token()
+        targets = _fanout_targets(deployment_ids, all_pods, token)
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        results = asyncio.run(_exec_fanout(targets, token, shlex.join(command), shell_type, parallel, output_dir))
+        _echo_summary(results)
+        sys.exit(next((exit_code for _, exit_code in results if exit_code), 0))
+
+    commands = read_batch(batch) if batch is not None else None
+    ws_url, token = _connect_args(deployment_ids[0], pod, shell_type, first_pod)
+    with _forget_pods_on_failure(deployment_ids[0]):
+        if commands is not None:
+            exit_code = asyncio.run(_exec_batch(ws_url, token, commands, fail_fast))
+        elif binary:
+            sys.stdout.flush()
+            exit_code, stats = asyncio.run(exec_binary_session(ws_url, token, shlex.join(command)))
+            _echo_transfer_stats(stats)
+        else:
+            exit_code = asyncio.run(exec_session(ws_url, token, shlex.join(command)))
     sys.exit(exit_code)
 
 
-@click.command(help="Execute a command in a deployment pod", context_settings={"ignore_unknown_options": True})
-@click.argument("deployment_id", type=int)
-@click.argument("command", nargs=-1, required=True, type=click.UNPROCESSED)
-@click.option("--pod", default=None, help="Specific pod name")
+def split_remote_path(spec):
+    """(deployment, path) of a DEPLOYMENT:PATH argument, or None for a local path.
+
+    A path that exists locally is always local, so files with a colon in
+    their name can still be copied.
+    """
+    deployment, sep, path = spec.partition(":")
+    if not sep or not deployment or "/" in deployment or os.path.exists(spec):
+        return None
+    return deployment, path or "."
+
+
+@click.command(
+    help="Copy a file or directory between this machine and a deployment pod. Exactly one of SOURCE "
+    "and DESTINATION is DEPLOYMENT:PATH. Directories are copied recursively, and an existing "
+    "destination directory receives the source under its own name."
+)
+@click.argument("source")
+@click.argument("destination")
+@click.option("--pod", default=None, shell_complete=complete_pod_name, help="Specific pod name")
 @click.option("--shell", "shell_type", default=None, type=click.Choice(["bash", "sh", "zsh"]), help="Shell type")
 @click.option(
     "--first-pod", is_flag=True, default=False, help="Auto-select the first running pod (skip interactive selection)"
 )
 @handle_exception
-def exec_cmd(deployment_id, command, pod, shell_type, first_pod):
+def cp(source, destination, pod, shell_type, first_pod):
+    remote_source, remote_destination = split_remote_path(source), split_remote_path(destination)
+    if (remote_source is None) == (remote_destination is None):
+        raise click.UsageError("Exactly one of SOURCE and DESTINATION must be DEPLOYMENT:PATH")
+    if remote_destination is not None and not os.path.exists(source):
+        raise click.ClickException(f"{source}: no such file or directory")
+
+    deployment, remote_path = remote_source or remote_destination
+    deployment_id = DEPLOYMENT.convert(deployment, None, None)
     ws_url, token = _connect_args(deployment_id, pod, shell_type, first_pod)
-    exit_code = asyncio.run(exec_session(ws_url, token, shlex.join(command)))
-    sys.exit(exit_code)
+    try:
+        with _forget_pods_on_failure(deployment_id):
+            if remote_destination is not None:
+                stats = asyncio.run(copy_to_pod(ws_url, token, source, remote_path))
+            else:
+                stats = asyncio.run(copy_from_pod(ws_url, token, remote_path, destination))
+    except ShellError as e:
+        raise click.ClickException(str(e)) from e
+    _echo_transfer_stats(stats)
+
+
+def _format_bytes(size):
+    for threshold, unit in ((1024**3, "GB"), (1024**2, "MB"), (1024, "KB")):
+        if size >= threshold:
+            return f"{size / threshold:.1f} {unit}"
+    return f"{size} B"
+
+
+def _echo_sync_result(result, dry_run):
+    if dry_run:
+        for prefix, paths in (("+", result.new), ("~", result.changed), ("-", result.deleted)):
+            for path in paths:
+                click.echo(f"{prefix} {path}")
+    click.echo(
+        f"{len(result.new)} new, {len(result.changed)} changed, {len(result.deleted)} deleted, "
+        f"{result.unchanged} unchanged; {'would send' if dry_run else 'sent'} "
+        f"{_format_bytes(result.sent_bytes)} of {_format_bytes(result.total_bytes)}",
+        err=True,
+    )
+
+
+@click.command(
+    help="Make DEPLOYMENT:PATH in a pod match the local directory SOURCE, sending only the blocks of "
+    "files that changed. Files whose size and modification time match are skipped."
+)
+@click.argument("source", type=click.Path(exists=True, file_okay=False))
+@click.argument("destination", metavar="DEPLOYMENT:PATH")
+@click.option("--pod", default=None, shell_complete=complete_pod_name, help="Specific pod name")
+@click.option("--shell", "shell_type", default=None, type=click.Choice(["bash", "sh", "zsh"]), help="Shell type")
+@click.option(
+    "--first-pod", is_flag=True, default=False, help="Auto-select the first running pod (skip interactive selection)"
+)
+@click.option(
+    "--exclude", multiple=True, help="Skip paths matching this pattern, e.g. '.git' or 'data/*.bin' (repeatable)"
+)
+@click.option("--delete", is_flag=True, default=False, help="Delete files in the pod that are not in SOURCE")
+@click.option("--dry-run", is_flag=True, default=False, help="Only list what would change")
+@handle_exception
+def sync(source, destination, pod, shell_type, first_pod, exclude, delete, dry_run):  # pylint: disable=R0917
+    remote = split_remote_path(destination)
+    if remote is None:
+        raise click.UsageError("DESTINATION must be DEPLOYMENT:PATH")
+
+    deployment, remote_path = remote
+    deployment_id = DEPLOYMENT.convert(deployment, None, None)
+    ws_url, token = _connect_args(deployment_id, pod, shell_type, first_pod)
+    try:
+        with _forget_pods_on_failure(deployment_id):
+            result = asyncio.run(sync_to_pod(ws_url, token, source, remote_path, exclude, delete, dry_run))
+    except ShellError as e:
+        raise click.ClickException(str(e)) from e
+    _echo_sync_result(result, dry_run)
@@ -0,0 +1,142 @@
+"""CLI command showing live resource usage of all active deployments."""
+
+import math
+import sys
+import time
+
+import click
+from tabulate import tabulate
+
+from centml.cli.cluster import handle_exception
+from centml.cli.logs import parse_duration_seconds
+from centml.sdk import DeploymentStatus, Metric
+from centml.sdk.api import get_centml_client
+from centml.sdk.usage import UsageStore
+
+METRICS = (Metric.GPU, Metric.GPU_MEMORY, Metric.CPU, Metric.MEMORY)
+HEADERS = ["ID", "Name", "GPU", "GPU mem", "CPU", "Memory", "Credits/hr"]
+SORT_COLUMNS = {"gpu": "gpu", "gpu-memory": "gpu_memory", "cpu": "cpu", "memory": "memory", "cost": "cost"}
+STEP_SECONDS = 60
+
+# Alternate screen on/off and cursor hide/show, as used by full-screen tools like top.
+_ENTER_SCREEN = "\x1b[?1049h\x1b[?25l"
+_LEAVE_SCREEN = "\x1b[?25h\x1b[?1049l"
+
+
+def _latest(row):
+    for value in reversed(row):
+        if not math.isnan(value):
+            return float(value)
+    return math.nan
+
+
+def _format_value(value):
+    if math.isnan(value):
+        return "-"
+    for threshold, suffix in ((1e12, "T"), (1e9, "G"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return f"{value:.1f}"
+
+
+def collect_rows(cclient, store, window_seconds, hardware):
+    """Latest usage sample of every active deployment, as one dict per deployment."""
+    deployments = [d for d in cclient.get(None) if d.status == DeploymentStatus.ACTIVE]
+    if not deployments:
+        return []
+
+    end = int(time.time())
+    matrix = cclient.collect_deployment_usage(
+        [d.id for d in deployments], METRICS, end - window_seconds, end, step=STEP_SECONDS, cache=store
+    )
+    rows = []
+    for deployment in deployments:
+        row = {"id": deployment.id, "name": deployment.name}
+        for metric in METRICS:
+            row[metric.value] = _latest(matrix.row(deployment.id, metric))
+        hw = hardware.get(deployment.hardware_instance_id)
+        row["cost"] = hw.cost_per_hr / 100 if hw is not None else math.nan
+        rows.append(row)
+    return rows
+
+
+def format_table(rows, sort, limit=None):
+    """Render rows, hottest first, as a list of text lines."""
+    column = SORT_COLUMNS[sort]
+    rows = sorted(rows, key=lambda r: (math.isnan(r[column]), -r[column] if not math.isnan(r[column]) else 0))
+    if limit:
+        rows = rows[:limit]
+    table = [
+        [r["id"], r["name"]]
+        + [_format_value(r[metric.value]) for metric in METRICS]
+        + ["-" if math.isnan(r["cost"]) else f"{r['cost']:g}"]
+        for r in rows
+    ]
+    return tabulate(table, headers=HEADERS, tablefmt="simple", disable_numparse=True).splitlines()
+
+
+def diff_frame(previous, current):
+    """Terminal output turning the ``previous`` frame into ``current`` by rewriting only changed cells.
+
+    Both frames are lists of lines drawn from the top-left corner. For every
+    changed line only the span between its first and last differing
+    character is written, and anything left beyond a shortened line is cleared.
+    """
+    out = []
+    for row in range(max(len(previous), len(current))):
+        old = previous[row] if row < len(previous) else ""
+        new = current[row] if row < len(current) else ""
+        if old == new:
+            continue
+        first = next(i for i in range(max(len(old), len(new))) if old[i : i + 1] != new[i : i + 1])
+        # A common suffix stays in place on screen only when the line keeps its length.
+        last = 0
+        if len(old) == len(new):
+            while old[-1 - last] == new[-1 - last]:
+                last += 1
+        out.append(f"\x1b[{row + 1};{first + 1}H{new[first : len(new) - last]}")
+        if len(new) < len(old):
+            out.append(f"\x1b[{row + 1};{len(new) + 1}H\x1b[K")
+    return "".join(out)
+
+
+@click.command(help="Show live resource usage of active deployments, hottest first")
+@click.option("--interval", "-n", type=float, default=10.0, show_default=True, help="Seconds between refreshes")
+@click.option("--sort", type=click.Choice(list(SORT_COLUMNS)), default="gpu", show_default=True, help="Sort column")
+@click.option("--window", default="15m", show_default=True, help="Usage history to look back for the latest sample")
+@click.option("--limit", type=int, default=None, help="Only show this many deployments")
+@click.option("--once", is_flag=True, default=False, help="Print the table once and exit")
+@handle_exception
+def top(interval, sort, window, limit, once):  # pylint: disable=R0917
+    window_seconds = parse_duration_seconds(window)
+    # The most recent minutes are re-fetched on each refresh; older points come from the store.
+    store = UsageStore(settle_seconds=2 * STEP_SECONDS)
+
+    with get_centml_client() as cclient:
+        hardware = {hw.id: hw for hw in cclient.get_hardware_instances()}
+
+        def _frame():
+            rows = collect_rows(cclient, store, window_seconds, hardware)
+            stamp = time.strftime("%H:%M:%S")
+            return [f"ccluster top - {stamp} - {len(rows)} active deployments", ""] + format_table(rows, sort, limit)
+
+        if once:
+            click.echo("\n".join(_frame()))
+            return
+
+        out = sys.stdout
+        previous = []
+        out.write(_ENTER_SCREEN + "\x1b[2J")
+        try:
+            while True:
+                started = time.monotonic()
+                current = _frame()
+                out.write(diff_frame(previous, current))
+                out.flush()
+                previous = current
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.write(_LEAVE_SCREEN)
+            out.flush()
@@ -0,0 +1,4 @@
+from centml.sdk.agent.client import AgentClient, connect_agent
+from centml.sdk.agent.exceptions import AgentError
+
+__all__ = ["AgentClient", "AgentError", "connect_agent"]
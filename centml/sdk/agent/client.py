@@ -0,0 +1,107 @@
+import socket
+from typing import Optional
+
+from centml.sdk.agent.protocol import END, ERROR, ITEMS, decode_exception, identity, recv_frame, send_frame
+from centml.sdk.config import settings
+
+# Connecting to a local socket is near-instant; anything slower means the
+# agent is wedged and direct mode is the better option.
+CONNECT_TIMEOUT = 1.0
+
+
+class AgentClient:
+    """Drop-in stand-in for ``CentMLClient`` that forwards calls to the agent.
+
+    Each call uses its own connection, so an ``AgentClient`` can be shared
+    between threads just like the client it replaces.
+    """
+
+    def __init__(self, socket_path):
+        self._socket_path = socket_path
+        self.pid = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _call(*args, **kwargs):
+            return self._call(name, args, kwargs)
+
+        _call.__name__ = name
+        return _call
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(self._socket_path)
+        except OSError:
+            sock.close()
+            raise
+        # Calls may legitimately take as long as the API does.
+        sock.settimeout(None)
+        return sock
+
+    def request(self, *message):
+        """Send a control message (``ping``, ``reset``, ``shutdown``) and return the reply value."""
+        sock = self._connect()
+        try:
+            send_frame(sock, message)
+            reply = recv_frame(sock)
+        finally:
+            sock.close()
+        if reply[0] == ERROR:
+            raise decode_exception(reply[1])
+        return reply[1]
+
+    def get_centml_token(self):
+        return self.request("token")
+
+    def _call(self, name, args, kwargs):
+        sock = self._connect()
+        try:
+            send_frame(sock, ("call", name, args, kwargs))
+            reply = recv_frame(sock)
+        except BaseException:
+            sock.close()
+            raise
+        if reply[0] in (ITEMS, END):
+            return self._iter_items(sock, reply)
+        sock.close()
+        if reply[0] == ERROR:
+            raise decode_exception(reply[1])
+        return reply[1]
+
+    @staticmethod
+    def _iter_items(sock, reply):
+        try:
+            while reply[0] == ITEMS:
+                yield from reply[1]
+                reply = recv_frame(sock)
+            if reply[0] == ERROR:
+                raise decode_exception(reply[1])
+        finally:
+            sock.close()
+
+
+def connect_agent(socket_path=None, match_identity=True) -> Optional[AgentClient]:
+    """Return a client for the running agent, or None when no agent is reachable.
+
+    An empty ``CENTML_AGENT_SOCKET`` disables the agent entirely. Unless
+    ``match_identity`` is False, an agent using another API URL or other
+    credentials than this process is treated as unreachable, so calls never
+    run under someone else's identity.
+    """
+    socket_path = settings.CENTML_AGENT_SOCKET if socket_path is None else socket_path
+    if not socket_path:
+        return None
+
+    client = AgentClient(socket_path)
+    try:
+        info = client.request("ping")
+    except OSError:
+        return None
+    if match_identity and {key: info.get(key) for key in ("api_url", "principal")} != identity():
+        return None
+    client.pid = info["pid"]
+    return client
@@ -0,0 +1,2 @@
+class AgentError(Exception):
+    """An agent request failed with an error that cannot be re-raised locally."""
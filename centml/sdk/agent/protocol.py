@@ -0,0 +1,91 @@
+"""Wire format shared by the agent server and its clients.
+
+Every message is a pickled tuple prefixed with its 4-byte big-endian length.
+The socket is created with owner-only permissions, so only the user that
+started the agent can talk to it.
+"""
+
+import pickle
+import struct
+
+from platform_api_python_client import ApiException
+
+from centml.sdk.agent.exceptions import AgentError
+from centml.sdk.config import settings
+
+_HEADER = struct.Struct("!I")
+
+# Reply kinds. Calls returning an iterator reply with one or more ITEMS
+# frames followed by END, so streaming results never have to be
+# materialised on either side of the socket.
+RESULT = "result"
+ERROR = "error"
+ITEMS = "items"
+END = "end"
+
+
+def identity():
+    """API URL and principal this process calls the API as.
+
+    The agent reports its own in reply to ``ping``; clients only use an
+    agent whose identity matches theirs.
+    """
+    if settings.CENTML_SERVICE_ACCOUNT_ID and settings.CENTML_SERVICE_ACCOUNT_SECRET:
+        principal = ("service-account", settings.CENTML_SERVICE_ACCOUNT_ID)
+    else:
+        principal = ("credentials", settings.CENTML_CRED_FILE_PATH)
+    return {"api_url": settings.CENTML_PLATFORM_API_URL, "principal": principal}
+
+
+def send_frame(sock, message):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Agent closed the connection")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, length))
+
+
+# ApiException and SystemExit (raised by auth when credentials are missing)
+# are rebuilt on the client so callers keep their usual error handling, and
+# so are these builtin errors, e.g. a ValueError for invalid arguments.
+REBUILT_EXCEPTIONS = {exc_type.__name__: exc_type for exc_type in (ValueError, TypeError, KeyError, LookupError)}
+
+
+def encode_exception(exc):
+    if isinstance(exc, ApiException):
+        return ("api", exc.status, exc.reason, exc.body)
+    if isinstance(exc, SystemExit):
+        return ("exit", exc.code)
+    message = f"{type(exc).__name__}: {exc}"
+    # Subclasses, e.g. json.JSONDecodeError, come back as their builtin base.
+    base = next((cls.__name__ for cls in type(exc).__mro__ if cls in REBUILT_EXCEPTIONS.values()), None)
+    if base is None:
+        return ("other", type(exc).__name__, message, None)
+    simple = type(exc).__name__ == base and all(isinstance(arg, (str, int, float, type(None))) for arg in exc.args)
+    return ("other", base, message, exc.args if simple else (message,))
+
+
+def decode_exception(payload):
+    kind = payload[0]
+    if kind == "api":
+        exc = ApiException(status=payload[1], reason=payload[2])
+        exc.body = payload[3]
+        return exc
+    if kind == "exit":
+        return SystemExit(payload[1])
+    _, name, message, args = payload
+    if name in REBUILT_EXCEPTIONS and args is not None:
+        return REBUILT_EXCEPTIONS[name](*args)
+    return AgentError(message)
@@ -0,0 +1,261 @@
+"""Agent daemon that serves a warm ``CentMLClient`` over a Unix domain socket.
+
+Run with ``centml agent start`` (or ``python -m centml.sdk.agent.server``
+for a foreground agent). The daemon keeps one authenticated API client,
+so CLI invocations reuse its access token and pooled TLS connections
+instead of re-authenticating and re-connecting on every command.
+"""
+
+import logging
+import os
+import queue
+import select
+import socket
+import socketserver
+import threading
+import time
+from collections.abc import Iterator
+
+import jwt
+import platform_api_python_client
+
+from centml.sdk import auth
+from centml.sdk.agent.protocol import END, ERROR, ITEMS, RESULT, encode_exception, identity, recv_frame, send_frame
+from centml.sdk.api import CentMLClient
+from centml.sdk.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Catalog lookups that change rarely, with the number of seconds a cached
+# result stays valid. Everything else always goes to the API.
+CACHED_METHODS = {
+    "get_clusters": 300,
+    "get_hardware_instances": 300,
+    "get_prebuilt_images": 300,
+    "get_cserve_recipe": 300,
+    "get_cluster_id": 300,
+}
+# Same safety margin auth.get_centml_token applies before a token expires.
+TOKEN_REFRESH_MARGIN = 100
+# Tokens whose expiry cannot be decoded are re-fetched after this many seconds.
+OPAQUE_TOKEN_TTL = 300
+# Number of items sent per frame when a call returns an iterator.
+STREAM_BATCH_SIZE = 500
+# Streaming methods taking a ``stop`` event, which the agent sets when the
+# client goes away so they stop polling the API.
+STOPPABLE_METHODS = {"follow_deployment_logs"}
+# Seconds a stream waits for items before checking whether its client disconnected.
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class _TokenCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+
+    def get(self):
+        with self._lock:
+            if self._token is None or time.time() >= self._expires_at - TOKEN_REFRESH_MARGIN:
+                self._token = auth.get_centml_token()
+                self._expires_at = self._decode_expiry(self._token)
+            return self._token
+
+    def clear(self):
+        with self._lock:
+            self._token = None
+
+    @staticmethod
+    def _decode_expiry(token):
+        try:
+            return float(jwt.decode(token, options={"verify_signature": False})["exp"])
+        except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+            return time.time() + OPAQUE_TOKEN_TTL
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            message = recv_frame(self.request)
+        except (ConnectionError, EOFError):
+            return
+
+        kind = message[0]
+        try:
+            if kind == "call":
+                self._handle_call(*message[1:])
+                return
+            if kind == "ping":
+                result = {"pid": os.getpid(), **self.server.identity}
+            elif kind == "token":
+                result = self.server.tokens.get()
+            elif kind == "reset":
+                result = self.server.reset()
+            elif kind == "shutdown":
+                # shutdown() blocks until serve_forever returns, so it cannot
+                # run on a request thread of the same server.
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                result = None
+            else:
+                raise ValueError(f"Unknown agent request: {kind}")
+        except (Exception, SystemExit) as e:
+            send_frame(self.request, (ERROR, encode_exception(e)))
+            return
+        send_frame(self.request, (RESULT, result))
+
+    def _handle_call(self, name, args, kwargs):
+        stopped = threading.Event()
+        if name in STOPPABLE_METHODS:
+            kwargs = {**kwargs, "stop": stopped}
+        try:
+            result = self.server.call(name, args, kwargs)
+        except (Exception, SystemExit) as e:
+            send_frame(self.request, (ERROR, encode_exception(e)))
+            return
+
+        if not isinstance(result, Iterator):
+            send_frame(self.request, (RESULT, result))
+            return
+
+        self._stream(result, stopped)
+
+    def _client_gone(self):
+        """Whether the client closed its end; it sends nothing while a stream runs."""
+        readable, _, _ = select.select([self.request], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return not self.request.recv(1, socket.MSG_PEEK)
+        except OSError:
+            return True
+
+    def _stream(self, iterator, stopped):
+        # The iterator runs on its own thread so items can be forwarded as soon
+        # as they exist: a batch is sent whenever the producer has nothing more
+        # ready, which keeps followed log streams live while still batching
+        # bursts of items into few frames.
+        items = queue.Queue(maxsize=STREAM_BATCH_SIZE * 4)
+
+        def _put(entry):
+            while not stopped.is_set():
+                try:
+                    items.put(entry, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _produce():
+            try:
+                for item in iterator:
+                    if not _put((ITEMS, item)):
+                        break
+                else:
+                    _put((END, None))
+            except (Exception, SystemExit) as e:
+                _put((ERROR, e))
+            finally:
+                if hasattr(iterator, "close"):
+                    iterator.close()
+
+        threading.Thread(target=_produce, daemon=True).start()
+        try:
+            while True:
+                batch = []
+                try:
+                    kind, value = items.get(timeout=DISCONNECT_POLL_INTERVAL)
+                except queue.Empty:
+                    # A quiet stream would otherwise only notice a disconnect on its next write.
+                    if self._client_gone():
+                        return
+                    continue
+                while kind == ITEMS:
+                    batch.append(value)
+                    if len(batch) >= STREAM_BATCH_SIZE:
+                        break
+                    try:
+                        kind, value = items.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    send_frame(self.request, (ITEMS, batch))
+                if kind == END:
+                    send_frame(self.request, (END,))
+                    return
+                if kind == ERROR:
+                    send_frame(self.request, (ERROR, encode_exception(value)))
+                    return
+        except OSError:
+            # The client stopped reading (e.g. Ctrl-C on `logs --follow`).
+            pass
+        finally:
+            stopped.set()
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.tokens = _TokenCache()
+        self.identity = identity()
+        configuration = platform_api_python_client.Configuration(
+            host=settings.CENTML_PLATFORM_API_URL, access_token=self.tokens.get()
+        )
+        self._api_client = platform_api_python_client.ApiClient(configuration)
+        self.client = CentMLClient(platform_api_python_client.EXTERNALApi(self._api_client), self.tokens.get)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(socket_path) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def call(self, name, args, kwargs):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self.client, name)
+        self._api_client.configuration.access_token = self.tokens.get()
+
+        ttl = CACHED_METHODS.get(name)
+        if ttl is None:
+            return method(*args, **kwargs)
+
+        key = (name, repr(args), repr(sorted(kwargs.items())))
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        result = method(*args, **kwargs)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+        return result
+
+    def reset(self):
+        """Forget the cached token and catalog results, e.g. after a new login."""
+        self.tokens.clear()
+        with self._cache_lock:
+            self._cache.clear()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path=None):
+    server = AgentServer(socket_path or settings.CENTML_AGENT_SOCKET)
+    logger.info("CentML agent listening on %s", server.socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
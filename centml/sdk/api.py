@@ -1,4 +1,8 @@
+import itertools
+import json
 from contextlib import contextmanager
+from functools import partial
+from typing import Optional, Union
 
 import platform_api_python_client
 from platform_api_python_client import (
@@ -16,14 +20,27 @@ from platform_api_python_client import (
 )
 
 from centml.sdk import auth
+from centml.sdk.agent import connect_agent
 from centml.sdk.config import settings
+from centml.sdk.logs import LogSegmentStore, follow_logs, iter_log_pages, iter_sharded_events, iter_source_events
+from centml.sdk.usage import (
+    UsageSeries,
+    UsageStore,
+    collect_usage,
+    fetch_usage_chunked,
+    get_step_size,
+    stitch_usage_columns,
+)
+from centml.sdk.utils.rate_limit import RateLimiter
 
 STATUS_V3_DEPLOYMENT_TYPES = {DeploymentType.INFERENCE_V3, DeploymentType.CSERVE_V3}
 
 
 class CentMLClient:
-    def __init__(self, api):
+    def __init__(self, api, get_token=None):
         self._api: platform_api_python_client.EXTERNALApi = api
+        # Source of a new access token for long-running calls that outlive the current one.
+        self._get_token = get_token or auth.get_centml_token
 
     def get(self, depl_type):
         results = self._api.get_deployments_deployments_get(type=depl_type).results
@@ -158,9 +175,7 @@ class CentMLClient:
         return {i.key: i.value for i in items}
 
     # pylint: disable=R0917
-    def get_deployment_usage(
-        self, id: int, metric: Metric, start_time_in_seconds: int, end_time_in_seconds: int, step: int
-    ):
+    def _fetch_usage(self, id, metric, step, start_time_in_seconds, end_time_in_seconds):
         return self._api.get_usage_deployments_usage_deployment_id_get(
             deployment_id=id,
             metric=metric,
@@ -169,6 +184,105 @@ class CentMLClient:
             step=step,
         ).values
 
+    def _fetch_usage_columns(self, id, metric, step, start_time_in_seconds, end_time_in_seconds):
+        # Read the raw JSON body: building one pydantic model per sample is the slow part.
+        response = self._api.get_usage_deployments_usage_deployment_id_get_without_preload_content(
+            deployment_id=id,
+            metric=metric,
+            start_time_in_seconds=start_time_in_seconds,
+            end_time_in_seconds=end_time_in_seconds,
+            step=step,
+        )
+        body = response.data.decode("utf-8")
+        if not 200 <= response.status <= 299:
+            raise ApiException(status=response.status, reason=response.reason, body=body)
+        return [UsageSeries.from_json(series, step) for series in json.loads(body)["values"]]
+
+    # pylint: disable=R0917
+    def get_deployment_usage(
+        self,
+        id: int,
+        metric: Metric,
+        start_time_in_seconds: int,
+        end_time_in_seconds: int,
+        step: Optional[int] = None,
+        max_workers: int = 4,
+        columnar: bool = False,
+        cache: Union[bool, UsageStore] = False,
+    ):
+        """Fetch usage samples of a deployment, every ``step`` seconds.
+
+        Without a step, one is picked from the window length (see
+        centml.sdk.usage.get_step_size). Windows with more than MAX_DATA_POINTS
+        samples per series are split into chunks, fetched concurrently (at most
+        max_workers at a time) and stitched back into one series per metric.
+        With columnar=True the result is a list of UsageSeries, holding each
+        series' timestamps and values in flat NumPy (or array module) buffers.
+        If cache is True (or a UsageStore), samples are kept in a local store and
+        only the parts of the window not fetched before are requested; this
+        requires columnar=True.
+        """
+        if step is None:
+            step = get_step_size(start_time_in_seconds, end_time_in_seconds)
+        if cache:
+            if not columnar:
+                raise ValueError("cache=True requires columnar=True")
+            store = cache if isinstance(cache, UsageStore) else UsageStore()
+            fetch_chunk = partial(self._fetch_usage_columns, id, metric, step)
+            return store.get_usage(
+                fetch_chunk, id, metric, start_time_in_seconds, end_time_in_seconds, step, max_workers
+            )
+        if columnar:
+            fetch_chunk = partial(self._fetch_usage_columns, id, metric, step)
+            return fetch_usage_chunked(
+                fetch_chunk, start_time_in_seconds, end_time_in_seconds, step, max_workers, stitch_usage_columns
+            )
+        fetch_chunk = partial(self._fetch_usage, id, metric, step)
+        return fetch_usage_chunked(fetch_chunk, start_time_in_seconds, end_time_in_seconds, step, max_workers)
+
+    # pylint: disable=R0917
+    def collect_deployment_usage(
+        self,
+        deployment_ids,
+        metrics,
+        start_time_in_seconds: int,
+        end_time_in_seconds: int,
+        step: Optional[int] = None,
+        max_workers: int = 8,
+        requests_per_second: float = 10.0,
+        reduce: str = "mean",
+        cache: Union[bool, UsageStore] = False,
+    ):
+        """Fetch usage of several deployments and metrics concurrently as one UsageMatrix.
+
+        Requests share this client and are throttled to requests_per_second, with
+        at most max_workers in flight. The matrix is indexed as
+        values[deployment][metric][time] on a grid from start_time_in_seconds
+        every step seconds (picked from the window length when omitted); series
+        of one metric with several label sets are combined with reduce. With
+        cache, only points not fetched before are requested (see get_deployment_usage).
+        """
+        if step is None:
+            step = get_step_size(start_time_in_seconds, end_time_in_seconds)
+        store = None
+        if cache:
+            store = cache if isinstance(cache, UsageStore) else UsageStore()
+        limited_fetch = RateLimiter(requests_per_second).wrap(self._fetch_usage_columns)
+
+        def _fetch(deployment_id, metric):
+            fetch_chunk = partial(limited_fetch, deployment_id, metric, step)
+            if store is not None:
+                return store.get_usage(
+                    fetch_chunk, deployment_id, metric, start_time_in_seconds, end_time_in_seconds, step, 1
+                )
+            return fetch_usage_chunked(
+                fetch_chunk, start_time_in_seconds, end_time_in_seconds, step, 1, stitch_usage_columns
+            )
+
+        return collect_usage(
+            _fetch, deployment_ids, metrics, start_time_in_seconds, end_time_in_seconds, step, max_workers, reduce
+        )
+
     def get_credits(self):
         return self._api.get_credits_credits_get()
 
@@ -187,6 +301,31 @@ class CentMLClient:
             deployment_id=deployment_id
         ).results
 
+    def get_current_revision_number(self, deployment_id: int):
+        revisions = self.get_deployment_revisions(deployment_id)
+        if not revisions:
+            return None
+        return max(r.revision_number for r in revisions)
+
+    def _fetch_log_page(
+        self, deployment_id, revision_number, start_time, end_time, start_from_head, next_page_token, line_count
+    ):
+        return self._api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get(
+            deployment_id=deployment_id,
+            revision_number=revision_number,
+            start_time=start_time,
+            end_time=end_time,
+            next_page_token=next_page_token,
+            start_from_head=start_from_head,
+            line_count=line_count,
+        )
+
+    def _fetch_shard_log_page(self, deployment_id, revision_number, start_time, end_time, next_page_token, line_count):
+        # Shards are merged in ascending order, so each one is always read from its head.
+        return self._fetch_log_page(
+            deployment_id, revision_number, start_time, end_time, True, next_page_token, line_count
+        )
+
     def get_deployment_logs(
         self,
         deployment_id: int,
@@ -196,6 +335,11 @@ class CentMLClient:
         line_count: int = 100,
         start_from_head: bool = True,
         stream: bool = False,
+        prefetch: int = 0,
+        adaptive_line_count: bool = False,
+        shards: int = 1,
+        max_workers: int = 4,
+        cache: Union[bool, LogSegmentStore] = False,
     ):
         """Fetch logs for a deployment within a time window, handling pagination automatically.
 
@@ -204,35 +348,138 @@ class CentMLClient:
 
         If stream=True, returns a generator that yields events as each page is fetched.
         If stream=False (default), returns a flat list of all events.
+        prefetch=N keeps up to N pages requested ahead of the consumer on a background
+        thread (True means 1). adaptive_line_count=True doubles line_count while pages come
+        back full, so busy deployments need fewer round-trips.
+        If shards > 1, the window is split into that many time shards fetched concurrently
+        (at most max_workers requests in flight) and merged back in ascending timestamp
+        order; start_from_head and prefetch do not apply then.
+        If cache is True (or a LogSegmentStore), windows already fetched are read from the
+        local segment store and only the uncovered gaps are requested; results are then in
+        ascending timestamp order.
         """
 
-        def _iter_events():
-            next_page_token = None
-            while True:
-                response = self._api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get(
-                    deployment_id=deployment_id,
-                    revision_number=revision_number,
-                    start_time=start_time,
-                    end_time=end_time,
-                    next_page_token=next_page_token,
-                    start_from_head=start_from_head,
+        def _iter_window(window_start, window_end, from_head):
+            if shards > 1:
+                fetch_shard_page = partial(self._fetch_shard_log_page, deployment_id, revision_number)
+                yield from iter_sharded_events(
+                    fetch_shard_page,
+                    window_start,
+                    window_end,
+                    shards,
+                    max_workers,
                     line_count=line_count,
+                    adaptive=adaptive_line_count,
                 )
+                return
+
+            fetch_page = partial(
+                self._fetch_log_page, deployment_id, revision_number, window_start, window_end, from_head
+            )
+            for response in iter_log_pages(fetch_page, line_count, prefetch=prefetch, adaptive=adaptive_line_count):
                 yield from response.events
-                next_page_token = response.next_page_token
-                if not next_page_token:
-                    break
+
+        def _iter_events():
+            if cache:
+                store = cache if isinstance(cache, LogSegmentStore) else LogSegmentStore()
+                fetch_window = partial(_iter_window, from_head=True)
+                yield from store.iter_events(fetch_window, deployment_id, revision_number, start_time, end_time)
+                return
+            yield from _iter_window(start_time, end_time, start_from_head)
 
         if stream:
             return _iter_events()
 
         return list(_iter_events())
 
+    def get_merged_deployment_logs(
+        self,
+        sources,
+        start_time: int,
+        end_time: int,
+        line_count: int = 100,
+        adaptive_line_count: bool = False,
+        max_workers: int = 4,
+        stream: bool = False,
+    ):
+        """Fetch logs of several (deployment_id, revision_number) pairs as one timestamp-ordered stream.
+
+        The sources are fetched concurrently, with at most max_workers requests in
+        flight. Each event is returned as a copy with a "source" key holding its
+        deployment_id and revision_number, e.g. to follow a rollout across the old
+        and new revision or an incident across the deployments behind one product.
+        """
+
+        def _fetch_page(source, next_page_token, page_line_count):
+            deployment_id, revision_number = source
+            return self._fetch_log_page(
+                deployment_id, revision_number, start_time, end_time, True, next_page_token, page_line_count
+            )
+
+        def _iter_events():
+            merged = iter_source_events(
+                _fetch_page, sources, max_workers, line_count=line_count, adaptive=adaptive_line_count
+            )
+            try:
+                for (deployment_id, revision_number), event in merged:
+                    yield {**event, "source": {"deployment_id": deployment_id, "revision_number": revision_number}}
+            finally:
+                merged.close()
+
+        if stream:
+            return _iter_events()
+
+        return list(_iter_events())
+
+    def follow_deployment_logs(
+        self,
+        deployment_id: int,
+        revision_number: int,
+        start_time: int,
+        poll_interval: float = 2.0,
+        line_count: int = 100,
+        stop=None,
+    ):
+        """Yield log events from start_time onwards and keep polling for new ones, like ``tail -f``.
+
+        The generator never ends on its own; stop iterating, or set the
+        threading.Event ``stop``, to stop following.
+        A poll rejected with 401 because the access token expired is retried
+        once with a new token.
+        """
+
+        def _fetch_window(window_start, window_end):
+            def _events():
+                return self.get_deployment_logs(
+                    deployment_id, revision_number, window_start, window_end, line_count=line_count, stream=True
+                )
+
+            emitted = 0
+            try:
+                for event in _events():
+                    yield event
+                    emitted += 1
+            except ApiException as e:
+                if e.status != 401:
+                    raise
+                self._api.api_client.configuration.access_token = self._get_token()
+                # The retried window starts over; skip what was already emitted from it.
+                yield from itertools.islice(_events(), emitted, None)
+
+        return follow_logs(_fetch_window, start_time, poll_interval=poll_interval, stop=stop)
+
 
 @contextmanager
-def get_centml_client():
+def get_centml_client(token=None):
+    # A running `centml agent` already holds a token and warm connections.
+    agent_client = connect_agent()
+    if agent_client is not None:
+        yield agent_client
+        return
+
+    # Callers that already fetched a token pass it, so it is not fetched (and maybe refreshed) twice.
     configuration = platform_api_python_client.Configuration(
-        host=settings.CENTML_PLATFORM_API_URL, access_token=auth.get_centml_token()
+        host=settings.CENTML_PLATFORM_API_URL, access_token=token or auth.get_centml_token()
     )
 
     with platform_api_python_client.ApiClient(configuration) as api_client:
@@ -13,6 +13,12 @@ class Config(BaseSettings):
     CENTML_CRED_FILE: str = os.getenv("CENTML_CRED_FILE", default="credentials.json")
     CENTML_CRED_FILE_PATH: str = os.path.join(CENTML_CONFIG_PATH, CENTML_CRED_FILE)
 
+    # Local caches (shell completion, deployment lookups, log and usage stores)
+    CENTML_CACHE_PATH: str = os.getenv("CENTML_CACHE_PATH", default=os.path.join(CENTML_CONFIG_PATH, "cache"))
+
+    # Unix socket of the optional `centml agent` daemon; set to an empty string to never use it
+    CENTML_AGENT_SOCKET: str = os.getenv("CENTML_AGENT_SOCKET", default=os.path.join(CENTML_CONFIG_PATH, "agent.sock"))
+
     CENTML_PLATFORM_API_URL: str = os.getenv("CENTML_PLATFORM_API_URL", default="https://api.centml.com")
 
     CENTML_WORKOS_CLIENT_ID: str = os.getenv("CENTML_WORKOS_CLIENT_ID", default="client_01JP5TWW2997MF8AYQXHJEGYR0")
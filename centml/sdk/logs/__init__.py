@@ -0,0 +1,29 @@
+from centml.sdk.logs.events import event_key, event_message, event_timestamp, format_event
+from centml.sdk.logs.export import ExportProgress, export_events
+from centml.sdk.logs.filters import EventFilter, LogStats, aggregate_events, event_level, filter_events, project_event
+from centml.sdk.logs.follow import follow_logs
+from centml.sdk.logs.merge import iter_sharded_events, iter_source_events, merge_events, split_time_range
+from centml.sdk.logs.pages import iter_log_pages
+from centml.sdk.logs.store import LogSegmentStore
+
+__all__ = [
+    "EventFilter",
+    "ExportProgress",
+    "LogSegmentStore",
+    "LogStats",
+    "aggregate_events",
+    "event_key",
+    "event_level",
+    "event_message",
+    "event_timestamp",
+    "export_events",
+    "filter_events",
+    "follow_logs",
+    "format_event",
+    "iter_log_pages",
+    "iter_sharded_events",
+    "iter_source_events",
+    "merge_events",
+    "project_event",
+    "split_time_range",
+]
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Keys under which the log API reports an event's Unix timestamp in milliseconds.
+TIMESTAMP_KEYS = ("timestamp", "time", "ts")
+MESSAGE_KEYS = ("message", "msg", "log")
+
+
+def event_timestamp(event: Dict[str, Any]) -> Optional[int]:
+    for key in TIMESTAMP_KEYS:
+        value = event.get(key)
+        if value not in (None, ""):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def event_message(event: Dict[str, Any]) -> str:
+    for key in MESSAGE_KEYS:
+        value = event.get(key)
+        if value:
+            return str(value)
+    return str(event)
+
+
+def event_key(event: Dict[str, Any]) -> str:
+    """Stable identity of an event, used to drop duplicates at page and poll boundaries."""
+    return json.dumps(event, sort_keys=True, default=str)
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    timestamp_ms = event_timestamp(event)
+    message = event_message(event)
+    if timestamp_ms is not None:
+        ts = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat()
+        return f"[{ts}] {message}"
+    return message
@@ -0,0 +1,152 @@
+"""Write log event streams to compressed NDJSON files in constant memory."""
+
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from centml.sdk.logs.events import event_timestamp
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for compression="zstd"
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst", "none": ".ndjson"}
+# Encoded lines are handed to the compressor in batches of about this many bytes.
+WRITE_BATCH_BYTES = 256 * 1024
+
+
+@dataclass
+class ExportProgress:
+    events: int = 0
+    bytes_written: int = 0
+    files: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def events_per_second(self):
+        return self.events / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _CompressedFile:
+    def __init__(self, path, compression):
+        self._raw = open(path, "wb")  # pylint: disable=consider-using-with
+        if compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        elif compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, data):
+        self._stream.write(data)
+
+    def compressed_size(self):
+        return self._raw.tell()
+
+    def close(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+
+def export_path(path, compression, part=None):
+    """File name for an export; with rotation each part gets a zero-padded number."""
+    suffix = COMPRESSION_SUFFIXES[compression]
+    base = path[: -len(suffix)] if path.endswith(suffix) else path
+    if part is None:
+        return base + suffix
+    return f"{base}.{part:05d}{suffix}"
+
+
+def export_events(  # pylint: disable=R0917
+    events, path, compression="gzip", rotate_bytes=None, rotate_seconds=None, progress=None, progress_interval=1.0
+):
+    """Stream ``events`` into compressed NDJSON and return the final ExportProgress.
+
+    Events are encoded and written as they arrive, so memory use does not
+    depend on the number of events. With ``rotate_bytes`` a new file starts
+    once the current one reaches that compressed size; with
+    ``rotate_seconds`` a new file starts whenever an event falls into a
+    later window of that many seconds of *event* time (e.g. 3600 for one
+    file per hour of logs). ``progress(ExportProgress)`` is called at most
+    every ``progress_interval`` seconds and once at the end.
+    """
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression '{compression}'; expected one of {', '.join(COMPRESSION_SUFFIXES)}")
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+    rotating = bool(rotate_bytes or rotate_seconds)
+    stats = ExportProgress()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    current = None
+    closed_bytes = 0
+    current_window = None
+    size_reached = False
+    batch, batch_bytes = [], 0
+    last_report = stats.started_at
+
+    def _flush():
+        nonlocal batch, batch_bytes
+        if batch:
+            current.write(b"".join(batch))
+            batch, batch_bytes = [], 0
+
+    def _close_current():
+        nonlocal closed_bytes
+        _flush()
+        current.close()
+        closed_bytes += os.path.getsize(stats.files[-1])
+        stats.bytes_written = closed_bytes
+
+    def _open_next():
+        nonlocal current
+        if current is not None:
+            _close_current()
+        file_path = export_path(path, compression, len(stats.files) + 1 if rotating else None)
+        stats.files.append(file_path)
+        current = _CompressedFile(file_path, compression)
+
+    try:
+        _open_next()
+        for event in events:
+            # Rotate lazily so a stream ending exactly at the limit does not leave an empty file.
+            if size_reached:
+                _open_next()
+                size_reached = False
+            if rotate_seconds:
+                ts = event_timestamp(event)
+                window = ts // (rotate_seconds * 1000) if ts is not None else current_window
+                if current_window is not None and window != current_window:
+                    _open_next()
+                current_window = window
+
+            line = (json.dumps(event, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            batch.append(line)
+            batch_bytes += len(line)
+            stats.events += 1
+
+            if batch_bytes >= WRITE_BATCH_BYTES:
+                _flush()
+                size_reached = bool(rotate_bytes) and current.compressed_size() >= rotate_bytes
+
+            if progress is not None and time.monotonic() - last_report >= progress_interval:
+                last_report = time.monotonic()
+                stats.bytes_written = closed_bytes + current.compressed_size()
+                progress(stats)
+    finally:
+        if current is not None:
+            _close_current()
+
+    if progress is not None:
+        progress(stats)
+    return stats
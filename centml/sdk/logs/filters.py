@@ -0,0 +1,140 @@
+"""Incremental filtering and aggregation over log event streams."""
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from centml.sdk.logs.events import event_message, event_timestamp
+
+LEVEL_KEYS = ("level", "severity", "levelname")
+LEVEL_RANKS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+_LEVEL_ALIASES = {"WARN": "WARNING", "ERR": "ERROR", "FATAL": "CRITICAL", "NOTICE": "INFO"}
+_LEVEL_RE = re.compile(r"\b(TRACE|DEBUG|INFO|NOTICE|WARN(?:ING)?|ERR(?:OR)?|FATAL|CRITICAL)\b", re.IGNORECASE)
+# Levels are looked for near the start of a message only; further in they are usually prose.
+LEVEL_SEARCH_CHARS = 200
+MINUTE_MS = 60_000
+
+
+def _normalize_level(value: str) -> Optional[str]:
+    level = value.strip().upper()
+    level = _LEVEL_ALIASES.get(level, level)
+    return level if level in LEVEL_RANKS else None
+
+
+def event_level(event: Dict[str, Any]) -> Optional[str]:
+    """Severity of an event, from a structured level field or the start of its message."""
+    for key in LEVEL_KEYS:
+        value = event.get(key)
+        if isinstance(value, str) and value:
+            return _normalize_level(value)
+    match = _LEVEL_RE.search(event_message(event), 0, LEVEL_SEARCH_CHARS)
+    return _normalize_level(match.group(1)) if match else None
+
+
+def compile_patterns(patterns: Sequence[str], ignore_case: bool = False):
+    """Compile several regular expressions into one alternation, so each event is scanned once."""
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+def project_event(event: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only ``fields`` of an event; dotted names such as ``kubernetes.pod_name`` reach into nested dicts."""
+    projected = {}
+    for name in fields:
+        value: Any = event
+        for part in name.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        projected[name] = value
+    return projected
+
+
+class EventFilter:
+    """Predicate over log events: a regex match on the message plus a minimum level."""
+
+    def __init__(
+        self,
+        patterns: Sequence[str] = (),
+        ignore_case: bool = False,
+        invert: bool = False,
+        min_level: Optional[str] = None,
+    ):
+        self.regex = compile_patterns(patterns, ignore_case)
+        self.invert = invert
+        self.min_rank = None
+        if min_level is not None:
+            level = _normalize_level(min_level)
+            if level is None:
+                raise ValueError(f"Unknown log level '{min_level}'; expected one of {', '.join(LEVEL_RANKS)}")
+            self.min_rank = LEVEL_RANKS[level]
+
+    def __call__(self, event: Dict[str, Any]) -> bool:
+        if self.min_rank is not None:
+            level = event_level(event)
+            if level is None or LEVEL_RANKS[level] < self.min_rank:
+                return False
+        if self.regex is None:
+            return True
+        return (self.regex.search(event_message(event)) is not None) != self.invert
+
+
+def filter_events(  # pylint: disable=R0917
+    events: Iterable[Dict[str, Any]],
+    patterns: Sequence[str] = (),
+    ignore_case: bool = False,
+    invert: bool = False,
+    min_level: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    max_matches: Optional[int] = None,
+):
+    """Lazily yield the events that match, optionally projected to ``fields``.
+
+    The filter runs as events arrive, so it works on streamed and followed
+    logs alike. Once ``max_matches`` events have been yielded the upstream
+    iterator is closed, which stops any further page requests.
+    """
+    predicate = EventFilter(patterns, ignore_case, invert, min_level)
+    matched = 0
+    try:
+        if max_matches is not None and max_matches <= 0:
+            return
+        for event in events:
+            if not predicate(event):
+                continue
+            yield project_event(event, fields) if fields else event
+            matched += 1
+            if max_matches is not None and matched >= max_matches:
+                return
+    finally:
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+
+
+class LogStats:
+    """Running counts of log events: total, per level and per time bucket (one minute by default)."""
+
+    def __init__(self, bucket_ms: int = MINUTE_MS):
+        self.bucket_ms = bucket_ms
+        self.total = 0
+        self.by_level: Counter = Counter()
+        self.buckets: Counter = Counter()
+
+    def add(self, event: Dict[str, Any]):
+        self.total += 1
+        self.by_level[event_level(event) or "UNKNOWN"] += 1
+        ts = event_timestamp(event)
+        if ts is not None:
+            self.buckets[ts - ts % self.bucket_ms] += 1
+
+    def histogram(self):
+        """(bucket start in ms, count) pairs in time order."""
+        return sorted(self.buckets.items())
+
+
+def aggregate_events(events: Iterable[Dict[str, Any]], bucket_ms: int = MINUTE_MS) -> LogStats:
+    stats = LogStats(bucket_ms)
+    for event in events:
+        stats.add(event)
+    return stats
@@ -0,0 +1,59 @@
+import time
+
+from centml.sdk.logs.events import event_key, event_timestamp
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def follow_logs(fetch_window, start_time, poll_interval=2.0, sleep=time.sleep, clock=now_ms, *, stop=None):
+    """Yield events from ``start_time`` onwards, polling for new ones until ``stop`` is set.
+
+    ``fetch_window(start_time, end_time)`` returns the events of one window
+    in chronological order. Each poll restarts at the newest timestamp seen
+    so far (the API's windows are inclusive), and events already emitted at
+    that boundary timestamp are skipped so nothing is printed twice. Events
+    without a timestamp cannot be placed in a window, so they are remembered
+    by content and skipped while consecutive polls keep returning them; only
+    the previous poll's are kept, so memory stays bounded on long follows.
+
+    ``stop`` is an optional threading.Event; without one the generator
+    polls forever and ends only when the consumer stops iterating.
+    """
+    since = start_time
+    # Keys of events already emitted whose timestamp equals `since`.
+    boundary_keys = set()
+    # Keys of the events without a timestamp returned by the previous poll.
+    untimed_keys = set()
+    while stop is None or not stop.is_set():
+        newest = since
+        newest_keys = set()
+        polled_untimed_keys = set()
+        for event in fetch_window(since, clock()):
+            ts = event_timestamp(event)
+            if ts is None:
+                key = event_key(event)
+                seen = key in untimed_keys or key in polled_untimed_keys
+                polled_untimed_keys.add(key)
+                if seen:
+                    continue
+            elif ts <= since:
+                key = event_key(event)
+                if ts < since or key in boundary_keys:
+                    continue
+                boundary_keys.add(key)
+            else:
+                if ts > newest:
+                    newest, newest_keys = ts, set()
+                if ts == newest:
+                    newest_keys.add(event_key(event))
+            yield event
+
+        if newest > since:
+            since, boundary_keys = newest, newest_keys
+        untimed_keys = polled_untimed_keys
+        if stop is None:
+            sleep(poll_interval)
+        elif stop.wait(poll_interval):
+            return
@@ -0,0 +1,87 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from centml.sdk.logs.events import event_timestamp
+from centml.sdk.logs.pages import iter_log_pages
+from centml.sdk.utils.background import PooledIterator
+
+# Pages each shard may buffer ahead of the merge before its worker pauses.
+SHARD_BUFFERED_PAGES = 2
+
+
+def _merge_key(event):
+    ts = event_timestamp(event)
+    return ts if ts is not None else 0
+
+
+def merge_events(streams):
+    """Lazily merge event streams that are each in chronological order into one ordered stream."""
+    return heapq.merge(*streams, key=_merge_key)
+
+
+def split_time_range(start_time, end_time, shards):
+    """Split the inclusive millisecond range [start_time, end_time] into disjoint inclusive shards."""
+    shards = max(1, min(shards, end_time - start_time + 1))
+    step = (end_time - start_time + 1) / shards
+    bounds = [start_time + round(i * step) for i in range(shards)] + [end_time + 1]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(shards)]
+
+
+def _indexed_events(index, pages):
+    for page in pages:
+        for event in page.events:
+            yield index, event
+
+
+def _iter_merged_page_streams(page_fetchers, max_workers, line_count, adaptive):
+    """Walk each ``fetch_page(next_page_token, line_count)`` on a shared pool and merge the events.
+
+    Yields ``(index, event)`` pairs in timestamp order, where ``index`` is the
+    position of the fetcher the event came from. However many fetchers there
+    are, only ``max_workers`` threads fetch their pages.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    page_streams = [
+        PooledIterator(iter_log_pages(fetch_page, line_count, adaptive=adaptive), executor, SHARD_BUFFERED_PAGES)
+        for fetch_page in page_fetchers
+    ]
+    try:
+        yield from heapq.merge(
+            *[_indexed_events(index, pages) for index, pages in enumerate(page_streams)],
+            key=lambda item: _merge_key(item[1]),
+        )
+    finally:
+        for pages in page_streams:
+            pages.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_sharded_events(fetch_page, start_time, end_time, shards, max_workers=4, *, line_count=100, adaptive=False):
+    """Fetch a time window as concurrent shards and yield its events in timestamp order.
+
+    ``fetch_page(shard_start, shard_end, next_page_token, line_count)``
+    performs one API request. The shards' pages are fetched by a pool of
+    ``max_workers`` threads, so at most that many requests are in flight at
+    any time, and each shard buffers only a couple of pages ahead of the
+    k-way merge, so memory stays bounded regardless of the size of the window.
+    """
+    page_fetchers = [
+        partial(fetch_page, shard_start, shard_end)
+        for shard_start, shard_end in split_time_range(start_time, end_time, shards)
+    ]
+    for _, event in _iter_merged_page_streams(page_fetchers, max_workers, line_count, adaptive):
+        yield event
+
+
+def iter_source_events(fetch_page, sources, max_workers=4, *, line_count=100, adaptive=False):
+    """Fetch several log sources concurrently and yield ``(source, event)`` pairs in timestamp order.
+
+    ``fetch_page(source, next_page_token, line_count)`` performs one API
+    request for one source, e.g. a (deployment, revision) pair. Concurrency
+    and buffering are bounded the same way as in iter_sharded_events.
+    """
+    sources = list(sources)
+    page_fetchers = [partial(fetch_page, source) for source in sources]
+    for index, event in _iter_merged_page_streams(page_fetchers, max_workers, line_count, adaptive):
+        yield sources[index], event
@@ -0,0 +1,58 @@
+from centml.sdk.utils.background import BackgroundIterator
+
+# Upper bound for adaptive page sizes; the log API caps line_count on its side too.
+MAX_LOG_LINE_COUNT = 10_000
+# Consecutive short pages after which adaptive paging assumes the server caps the page size.
+SHORT_PAGES_BEFORE_CAP = 2
+
+
+def _walk_pages(fetch_page, line_count, adaptive, max_line_count):
+    requested = line_count
+    short_pages = 0
+    next_page_token = None
+    while True:
+        response = fetch_page(next_page_token, line_count)
+        yield response
+        next_page_token = response.next_page_token
+        if not next_page_token:
+            return
+        if adaptive:
+            returned = len(response.events)
+            if returned >= line_count:
+                # Full page: more data is waiting, so ask for bigger pages.
+                short_pages = 0
+                line_count = min(line_count * 2, max_line_count)
+            else:
+                # A single short page with a next token may just be a quiet
+                # stretch. Only repeated ones mean the server caps the page
+                # size; stop asking for more than it returns, but never for
+                # less than the caller did. A full page lets the size grow again.
+                short_pages += 1
+                if short_pages >= SHORT_PAGES_BEFORE_CAP:
+                    line_count = max(returned, requested)
+
+
+def iter_log_pages(fetch_page, line_count=100, prefetch=0, adaptive=False, max_line_count=MAX_LOG_LINE_COUNT):
+    """Yield log responses page by page, following ``next_page_token``.
+
+    ``fetch_page(next_page_token, line_count)`` performs one API request.
+
+    ``prefetch`` is the read-ahead depth: with N > 0 a worker thread keeps
+    requesting the following pages while the consumer processes the
+    current one, buffering up to N pages, so throughput is bound by
+    bandwidth instead of per-request latency. ``True`` means a depth of 1.
+
+    With ``adaptive`` the page size doubles, up to ``max_line_count``, for
+    as long as pages come back full, cutting the number of round-trips on
+    busy deployments.
+    """
+    pages = _walk_pages(fetch_page, line_count, adaptive, max_line_count)
+    if not prefetch:
+        yield from pages
+        return
+
+    pages = BackgroundIterator(pages, maxsize=int(prefetch))
+    try:
+        yield from pages
+    finally:
+        pages.close()
@@ -0,0 +1,171 @@
+"""On-disk cache of log windows that only fetches the parts it has not seen.
+
+Each fetched window is stored as a gzip-compressed NDJSON segment file
+under ``<CENTML_CACHE_PATH>/logs/<deployment>/<revision>/``. A single
+``index.json`` records every segment's inclusive millisecond range, size
+and last use, so a query is answered by reading the covering segments
+from disk and requesting only the uncovered gaps from the API.
+"""
+
+import fcntl
+import gzip
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from centml.sdk.config import settings
+from centml.sdk.logs.events import event_timestamp
+from centml.sdk.logs.follow import now_ms
+from centml.sdk.utils.ranges import subtract_ranges
+
+# Total size of segment files kept before least recently used ones are evicted.
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Logs younger than this may still be ingested, so windows reaching past it
+# are served from the API but never cached.
+SETTLE_MS = 5 * 60 * 1000
+
+
+class LogSegmentStore:
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, settle_ms=SETTLE_MS):
+        self.root = root or os.path.join(settings.CENTML_CACHE_PATH, "logs")
+        self.max_bytes = max_bytes
+        self.settle_ms = settle_ms
+        self._index_path = os.path.join(self.root, "index.json")
+
+    @contextmanager
+    def _locked_index(self):
+        """Yield the index for read-modify-write under an exclusive inter-process lock."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.lock"), "w", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {"segments": []}
+            yield index
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path)
+
+    def segments(self, deployment_id, revision_number):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return sorted(
+            (s for s in index["segments"] if s["deployment"] == deployment_id and s["revision"] == revision_number),
+            key=lambda s: s["start"],
+        )
+
+    def _touch(self, file_name):
+        with self._locked_index() as index:
+            for s in index["segments"]:
+                if s["file"] == file_name:
+                    s["last_used"] = time.time()
+
+    def _read_segment(self, segment, start, end):
+        # Opening (and so any FileNotFoundError) happens before the first event is yielded.
+        f = gzip.open(os.path.join(self.root, segment["file"]), "rt", encoding="utf-8")
+        self._touch(segment["file"])
+        with f:
+            for line in f:
+                event = json.loads(line)
+                ts = event_timestamp(event)
+                if ts is None or start <= ts <= end:
+                    yield event
+
+    def _fetch_gap(self, fetch_window, deployment_id, revision_number, start, end):
+        """Yield a gap's events from the API, saving them as a segment once fully read."""
+        directory = os.path.join(self.root, str(deployment_id), str(revision_number))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                for event in fetch_window(start, end):
+                    f.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+                    yield event
+            file_name = os.path.join(str(deployment_id), str(revision_number), f"{start}-{end}.ndjson.gz")
+            os.replace(tmp_path, os.path.join(self.root, file_name))
+        except BaseException:
+            # Abandoned or failed fetches never become segments.
+            os.unlink(tmp_path)
+            raise
+        self._add_segment(deployment_id, revision_number, start, end, file_name)
+
+    def _add_segment(self, deployment_id, revision_number, start, end, file_name):
+        size = os.path.getsize(os.path.join(self.root, file_name))
+        with self._locked_index() as index:
+            index["segments"] = [s for s in index["segments"] if s["file"] != file_name]
+            index["segments"].append(
+                {
+                    "deployment": deployment_id,
+                    "revision": revision_number,
+                    "start": start,
+                    "end": end,
+                    "file": file_name,
+                    "bytes": size,
+                    "last_used": time.time(),
+                }
+            )
+            self._evict(index)
+
+    def _evict(self, index):
+        total = sum(s["bytes"] for s in index["segments"])
+        by_age = sorted(index["segments"], key=lambda s: s["last_used"])
+        while total > self.max_bytes and by_age:
+            segment = by_age.pop(0)
+            total -= segment["bytes"]
+            index["segments"].remove(segment)
+            try:
+                os.unlink(os.path.join(self.root, segment["file"]))
+            except FileNotFoundError:
+                pass
+
+    def _plan(self, deployment_id, revision_number, start_time, end_time):
+        """Split a query into ordered (kind, start, end, segment) pieces."""
+        segments = self.segments(deployment_id, revision_number)
+        cacheable_until = now_ms() - self.settle_ms
+
+        pieces = []
+        cursor = start_time
+        for segment in segments:
+            # Clip so that segments written concurrently for overlapping ranges never repeat events.
+            piece_start, piece_end = max(segment["start"], cursor), min(segment["end"], end_time)
+            if piece_start <= piece_end:
+                pieces.append(("cached", piece_start, piece_end, segment))
+                cursor = piece_end + 1
+
+        for gap_start, gap_end in subtract_ranges(start_time, end_time, [(s["start"], s["end"]) for s in segments]):
+            if gap_end <= cacheable_until:
+                pieces.append(("store", gap_start, gap_end, None))
+            elif gap_start > cacheable_until:
+                pieces.append(("fetch", gap_start, gap_end, None))
+            else:
+                pieces.append(("store", gap_start, cacheable_until, None))
+                pieces.append(("fetch", cacheable_until + 1, gap_end, None))
+        return sorted(pieces, key=lambda p: p[1])
+
+    def iter_events(self, fetch_window, deployment_id, revision_number, start_time, end_time):
+        """Yield events of [start_time, end_time] in ascending order, fetching only uncached gaps.
+
+        ``fetch_window(start, end)`` returns the events of an inclusive
+        window from the API in ascending timestamp order.
+        """
+        for kind, piece_start, piece_end, segment in self._plan(deployment_id, revision_number, start_time, end_time):
+            if kind == "cached":
+                try:
+                    yield from self._read_segment(segment, piece_start, piece_end)
+                    continue
+                except FileNotFoundError:
+                    # Evicted by another process since the index was read.
+                    kind = "fetch"
+            if kind == "store":
+                yield from self._fetch_gap(fetch_window, deployment_id, revision_number, piece_start, piece_end)
+            else:
+                yield from fetch_window(piece_start, piece_end)
@@ -1,12 +1,31 @@
 from centml.sdk.shell.exceptions import NoPodAvailableError, PodNotFoundError, ShellError
-from centml.sdk.shell.session import build_ws_url, exec_session, get_running_pods, interactive_session
+from centml.sdk.shell.session import (
+    ExecResult,
+    ExecSession,
+    TransferStats,
+    build_ws_url,
+    exec_binary_session,
+    exec_session,
+    get_running_pods,
+    interactive_session,
+)
+from centml.sdk.shell.sync import SyncResult, sync_to_pod
+from centml.sdk.shell.transfer import copy_from_pod, copy_to_pod
 
 __all__ = [
+    "ExecResult",
+    "ExecSession",
     "NoPodAvailableError",
     "PodNotFoundError",
     "ShellError",
+    "SyncResult",
+    "TransferStats",
     "build_ws_url",
+    "copy_from_pod",
+    "copy_to_pod",
+    "exec_binary_session",
     "exec_session",
     "get_running_pods",
     "interactive_session",
+    "sync_to_pod",
 ]
@@ -1,17 +1,23 @@
 import asyncio
+import binascii
 import json
 import logging
+import os
+import re
+import secrets
 import shutil
 import signal
 import sys
 import termios
+import time
 import tty
 import urllib.parse
+from dataclasses import dataclass
 
-import pyte
 import websockets
 
 from centml.sdk import PodStatus
+from centml.sdk.shell.exceptions import ShellError
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +26,25 @@ logger = logging.getLogger(__name__)
 BEGIN_MARKER = "__CENTML_BEGIN_5f3a__"
 END_MARKER = "__CENTML_END_5f3a__"
 
-# printf octal \137 = underscore. The decoded output matches BEGIN/END_MARKER,
-# but the literal command text does NOT, so shell echo won't trigger false matches.
-PRINTF_BEGIN = BEGIN_MARKER.replace("__", r"\137\137")
-PRINTF_END = END_MARKER.replace("__", r"\137\137")
+
+def _printf_marker(marker):
+    # printf octal \137 = underscore. The decoded output matches the marker,
+    # but the literal command text does NOT, so shell echo won't trigger false matches.
+    return marker.replace("__", r"\137\137")
+
+
+PRINTF_BEGIN = _printf_marker(BEGIN_MARKER)
+PRINTF_END = _printf_marker(END_MARKER)
+# Separates the base64 stdout of a binary exec from its base64 stderr.
+STDERR_MARKER = "__CENTML_STDERR_5f3a__"
+# Characters per line of binary exec output; a multiple of 4, so every line decodes on its own.
+_BINARY_LINE_LENGTH = 16384
+
+# Turns off echo and bracketed paste, so the shell only prints command output.
+_QUIET_SHELL = "stty -echo 2>/dev/null; printf '\\033[?2004l'"
+
+# Bytes read from stdin per readiness callback of the interactive session.
+STDIN_READ_SIZE = 65536
 
 
 def build_ws_url(api_url, deployment_id, pod_name, shell_type=None):
@@ -46,6 +67,12 @@ def get_running_pods(cclient, deployment_id) -> list[str]:
     return running_pods
 
 
+def _flush_stdout(chunks):
+    if chunks:
+        sys.stdout.buffer.write("".join(chunks).encode("utf-8", errors="replace"))
+        sys.stdout.buffer.flush()
+
+
 async def forward_io(ws, term_size, shutdown):
     """Bidirectional forwarding between local stdin/stdout and WebSocket.
 
@@ -55,6 +82,11 @@ async def forward_io(ws, term_size, shutdown):
     The platform API proxy sends a close frame (code=1000) when the
     remote shell exits, so _read_ws terminates via ConnectionClosed.
 
+    The loop is purely event-driven: an idle session waits on the socket,
+    stdin readiness and the shutdown event without any timers. Input that
+    becomes available within the same loop iteration is sent as one frame,
+    and output messages already received are written to stdout together.
+
     Args:
         ws: WebSocket connection.
         term_size: Mutable list ``[cols, rows]`` kept up-to-date by the
@@ -66,63 +98,96 @@ async def forward_io(ws, term_size, shutdown):
     """
     loop = asyncio.get_running_loop()
     stdin_fd = sys.stdin.fileno()
-    stdin_closed = asyncio.Event()
+
+    def _write_output(messages):
+        """Write a batch of received messages with one stdout write; False once the socket closed."""
+        pending = []
+        for raw_msg in messages:
+            if raw_msg is None:
+                break
+            if isinstance(raw_msg, Exception):
+                raise raw_msg
+            msg = json.loads(raw_msg)
+            data = msg.get("data", "")
+            if data:
+                pending.append(data)
+            elif msg.get("error"):
+                # Keep errors in order with the output around them.
+                _flush_stdout(pending)
+                pending = []
+                sys.stderr.buffer.write(f"Error: {msg['error']}\r\n".encode())
+                sys.stderr.buffer.flush()
+        _flush_stdout(pending)
+        return messages[-1] is not None
 
     async def _read_ws():
+        received = asyncio.Queue()
+
+        async def _receive():
+            try:
+                while True:
+                    received.put_nowait(await ws.recv())
+            except websockets.ConnectionClosed:
+                received.put_nowait(None)
+            except Exception as e:  # pylint: disable=broad-except
+                received.put_nowait(e)
+
+        receiver = asyncio.create_task(_receive())
         try:
             while True:
-                raw_msg = await ws.recv()
-                msg = json.loads(raw_msg)
-                data = msg.get("data", "")
-                if data:
-                    sys.stdout.buffer.write(data.encode("utf-8", errors="replace"))
-                    sys.stdout.buffer.flush()
-                elif msg.get("error"):
-                    sys.stderr.buffer.write(f"Error: {msg['error']}\r\n".encode())
-                    sys.stderr.buffer.flush()
-        except websockets.ConnectionClosed:
-            return
+                messages = [await received.get()]
+                # Let the receiver take everything the socket already holds,
+                # then write it all at once.
+                await asyncio.sleep(0)
+                while not received.empty():
+                    messages.append(received.get_nowait())
+                if not _write_output(messages):
+                    return
+        finally:
+            receiver.cancel()
 
     async def _read_stdin():
         read_queue = asyncio.Queue()
 
         def _on_stdin_ready():
-            data = sys.stdin.buffer.read1(4096)
-            if data:
-                read_queue.put_nowait(data)
-            else:
-                stdin_closed.set()
+            data = sys.stdin.buffer.read1(STDIN_READ_SIZE)
+            if not data:
+                # EOF: queue it too, so the sender wakes up and stops.
+                loop.remove_reader(stdin_fd)
+            read_queue.put_nowait(data)
 
         loop.add_reader(stdin_fd, _on_stdin_ready)
         try:
-            while not stdin_closed.is_set() and not shutdown.is_set():
-                try:
-                    data = await asyncio.wait_for(read_queue.get(), timeout=0.5)
-                except asyncio.TimeoutError:
-                    continue
-                try:
-                    await ws.send(
-                        json.dumps(
-                            {
-                                "operation": "stdin",
-                                "data": data.decode("utf-8", errors="replace"),
-                                "rows": term_size[1],
-                                "cols": term_size[0],
-                            }
+            while True:
+                chunks = [await read_queue.get()]
+                # Give the reader one more loop iteration, then send everything
+                # that arrived as a single frame (pastes, fast typing).
+                await asyncio.sleep(0)
+                while not read_queue.empty():
+                    chunks.append(read_queue.get_nowait())
+                data = b"".join(chunks)
+                if data:
+                    try:
+                        await ws.send(
+                            json.dumps(
+                                {
+                                    "operation": "stdin",
+                                    "data": data.decode("utf-8", errors="replace"),
+                                    "rows": term_size[1],
+                                    "cols": term_size[0],
+                                }
+                            )
                         )
-                    )
-                except websockets.ConnectionClosed:
+                    except websockets.ConnectionClosed:
+                        return
+                if not chunks[-1]:
                     return
         finally:
             loop.remove_reader(stdin_fd)
 
-    async def _watch_shutdown():
-        while not shutdown.is_set():
-            await asyncio.sleep(0.2)
-
     task_ws = asyncio.create_task(_read_ws())
     task_stdin = asyncio.create_task(_read_stdin())
-    task_shutdown = asyncio.create_task(_watch_shutdown())
+    task_shutdown = asyncio.create_task(shutdown.wait())
     tasks = [task_ws, task_stdin, task_shutdown]
 
     done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
@@ -193,48 +258,116 @@ async def interactive_session(ws_url, token):
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
 
-def _pyte_extract_text(line_stream, line_screen, text):
-    """Feed text through a single-row pyte screen and return visible characters.
+# Escape sequences (CSI, OSC, DCS/SOS/PM/APC strings, charset selection and
+# other two-byte escapes) and C0 control characters other than tab.
+_ESCAPE_RE = re.compile(
+    r"\x1b\[[0-?]*[ -/]*[@-~]"
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"
+    r"|\x1b[PX^_][^\x1b]*\x1b\\"
+    r"|\x1b[ -/]*[0-~]"
+    r"|[\x00-\x08\x0a-\x1f\x7f]"
+)
 
-    More robust than regex ANSI stripping: pyte interprets all VT100/VT220
-    sequences including OSC, cursor repositioning, and truecolor escapes.
+
+def _exit_code_re(end_marker):
+    return re.compile(re.escape(end_marker) + r":\s*(-?\d+)")
+
+
+_EXIT_CODE_RE = _exit_code_re(END_MARKER)
+
+
+def strip_escapes(text):
+    """Remove terminal escape sequences and control characters, keeping the printable text.
+
+    Unlike rendering into a terminal screen, this does not depend on the
+    terminal width, so markers after arbitrarily long output are still found.
     """
-    line_screen.reset()
-    line_stream.feed(text)
-    return "".join(line_screen.buffer[0][col].data for col in range(line_screen.columns)).rstrip()
+    if "\x1b" not in text and text.isprintable():
+        return text
+    return _ESCAPE_RE.sub("", text)
 
 
-def _parse_exit_code(clean):
-    parts = clean.split(END_MARKER + ":")
-    if len(parts) > 1:
-        try:
-            return int(parts[1].strip())
-        except ValueError:
-            pass
-    return 0
+def _parse_exit_code(clean, pattern=_EXIT_CODE_RE):
+    match = pattern.search(clean)
+    return int(match.group(1)) if match else 0
+
 
+def _write_stdout(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
 
-def _process_line(clean, raw_line, is_capturing, exit_code):
-    if BEGIN_MARKER in clean:
-        return True, False, exit_code
-    if END_MARKER in clean:
-        return is_capturing, True, _parse_exit_code(clean)
-    if is_capturing:
-        sys.stdout.write(raw_line + "\n")
-        sys.stdout.flush()
-    return is_capturing, False, exit_code
 
+class _ExecOutputParser:
+    """Incremental line splitter for exec output that tracks the BEGIN/END markers.
 
-async def exec_session(ws_url, token, command):
+    Each chunk is scanned once for newlines and a partial trailing line is
+    kept as a list of fragments, so the cost is linear in the output size.
+    Markers are matched on the line with escape sequences stripped, which
+    works for lines of any length. Captured lines of a chunk are passed to
+    ``write`` (stdout by default) together.
+    """
+
+    def __init__(self, begin_marker=BEGIN_MARKER, end_marker=END_MARKER, write=None):
+        self._begin_marker = begin_marker
+        self._end_marker = end_marker
+        self._exit_code_re = _EXIT_CODE_RE if end_marker == END_MARKER else _exit_code_re(end_marker)
+        self._write_output = write or _write_stdout
+        self._pending = []
+        self.is_capturing = False
+        self.is_done = False
+        self.exit_code = 0
+
+    def _process(self, line, captured):
+        clean = strip_escapes(line.rstrip("\r"))
+        if self._begin_marker in clean:
+            self.is_capturing = True
+        elif self._end_marker in clean:
+            self.is_done = True
+            self.exit_code = _parse_exit_code(clean, self._exit_code_re)
+        elif self.is_capturing:
+            captured.append(line)
+            captured.append("\n")
+
+    def _write(self, captured):
+        if captured:
+            self._write_output("".join(captured))
+
+    def feed(self, data):
+        captured = []
+        start = 0
+        while not self.is_done:
+            end = data.find("\n", start)
+            if end < 0:
+                break
+            line = data[start:end]
+            if self._pending:
+                self._pending.append(line)
+                line = "".join(self._pending)
+                self._pending.clear()
+            self._process(line, captured)
+            start = end + 1
+        if not self.is_done and start < len(data):
+            self._pending.append(data[start:])
+        self._write(captured)
+
+    def finish(self):
+        """Process an unterminated last line once the stream has ended."""
+        line = "".join(self._pending)
+        self._pending.clear()
+        if not self.is_done and line.rstrip("\r"):
+            captured = []
+            self._process(line, captured)
+            self._write(captured)
+
+
+async def exec_session(ws_url, token, command, write=None):
     """Execute a command in a pod and return its exit code.
 
     Does not enter raw mode -- output is pipe-friendly.
-    Suppresses shell echo and uses markers to capture only command output.
+    Suppresses shell echo and uses markers to capture only command output,
+    which is passed to ``write`` in chunks of whole lines (stdout by default).
     """
     cols, rows = shutil.get_terminal_size(fallback=(80, 24))
-    # Single-row screen for interpreting escape sequences in marker detection.
-    line_screen = pyte.Screen(cols, 1)
-    line_stream = pyte.Stream(line_screen)
     headers = {"Authorization": f"Bearer {token}"}
 
     async with websockets.connect(ws_url, additional_headers=headers, close_timeout=2) as ws:
@@ -245,7 +378,7 @@ async def exec_session(ws_url, token, command):
         # Markers use printf octal escapes so the literal marker string
         # doesn't appear in the command echo.
         wrapped = (
-            f"stty -echo 2>/dev/null; printf '\\033[?2004l';"
+            f"{_QUIET_SHELL};"
             f" printf '{PRINTF_BEGIN}\\n';"
             f" {command};"
             f" __ec=$?;"
@@ -255,38 +388,22 @@ async def exec_session(ws_url, token, command):
 
         await ws.send(json.dumps({"operation": "stdin", "data": wrapped}))
 
-        exit_code = 0
-        buffer = ""
-        is_capturing = False
-        is_done = False
+        parser = _ExecOutputParser(write=write)
         try:
             async for raw_msg in ws:
                 msg = json.loads(raw_msg)
                 if msg.get("data"):
-                    buffer += msg["data"]
-                    while "\n" in buffer:
-                        line, buffer = buffer.split("\n", 1)
-                        clean = _pyte_extract_text(line_stream, line_screen, line.rstrip("\r"))
-                        is_capturing, is_done, exit_code = _process_line(clean, line, is_capturing, exit_code)
-                        if is_done:
-                            break
+                    parser.feed(msg["data"])
                 elif msg.get("error"):
                     sys.stderr.write(f"Error: {msg['error']}\n")
                     return 1
-                if is_done:
+                if parser.is_done:
                     break
         except websockets.ConnectionClosed:
             pass
 
-        if not is_done and buffer:
-            for remaining in buffer.split("\n"):
-                remaining = remaining.rstrip("\r")
-                if not remaining:
-                    continue
-                clean = _pyte_extract_text(line_stream, line_screen, remaining)
-                is_capturing, is_done, exit_code = _process_line(clean, remaining, is_capturing, exit_code)
-                if is_done:
-                    break
+        parser.finish()
+        exit_code, is_done = parser.exit_code, parser.is_done
 
         if not is_done:
             exit_code = 1
@@ -298,3 +415,225 @@ async def exec_session(ws_url, token, command):
                 pass
 
         return exit_code
+
+
+@dataclass
+class TransferStats:
+    """Bytes moved by a transfer and the seconds it took."""
+
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+class _BinaryOutputDecoder:
+    """Decodes the base64 output of a binary exec, captured between the BEGIN/END markers.
+
+    Base64 lines before the STDERR marker hold the command's stdout, the
+    ones after it its stderr. The parser hands over whole lines, and every
+    full base64 line encodes a whole number of bytes, so each chunk decodes
+    on its own.
+    """
+
+    def __init__(self):
+        self.stdout = []
+        self.stderr = []
+        self._in_stderr = False
+
+    def __call__(self, text):
+        if not self._in_stderr:
+            text, marker, rest = text.partition(STDERR_MARKER)
+            self.stdout.append(binascii.a2b_base64(text))
+            if not marker:
+                return
+            self._in_stderr = True
+            text = rest
+        self.stderr.append(binascii.a2b_base64(text))
+
+    def take(self):
+        """Decoded (stdout, stderr) bytes since the last call."""
+        stdout, stderr = b"".join(self.stdout), b"".join(self.stderr)
+        self.stdout.clear()
+        self.stderr.clear()
+        return stdout, stderr
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+async def _write_stdout_bytes(data):
+    # A blocking write in a worker thread keeps the event loop (and the
+    # connection's keepalive) running while a slow reader holds us back.
+    await asyncio.to_thread(_write_all, sys.stdout.fileno(), data)
+
+
+async def exec_binary_session(ws_url, token, command, write=None):
+    """Execute a command in a pod and pass its stdout byte-exact to ``write``.
+
+    The remote wrapper base64-encodes the command's stdout, so binary
+    output survives the terminal, and sends its stderr separately at the
+    end. ``write`` is an async callable receiving the decoded bytes (the
+    process' stdout by default). It is awaited before the next message is
+    read, so a slow consumer slows the transfer down instead of letting
+    output pile up in memory.
+
+    Returns:
+        (exit code, TransferStats of the bytes written).
+    """
+    write = write or _write_stdout_bytes
+    cols, rows = shutil.get_terminal_size(fallback=(80, 24))
+    headers = {"Authorization": f"Bearer {token}"}
+    stats = TransferStats()
+
+    async with websockets.connect(ws_url, additional_headers=headers, close_timeout=2) as ws:
+        await ws.send(json.dumps({"operation": "resize", "rows": rows, "cols": cols}))
+
+        # The command runs in a subshell so that it may call exit; its exit
+        # code and stderr are kept in temp files while stdout is encoded.
+        # base64 wraps at 76 columns; refolding into long lines cuts the
+        # per-line parsing cost on this side.
+        wrapped = (
+            f"{_QUIET_SHELL}; __err=$(mktemp);"
+            f" printf '{PRINTF_BEGIN}\\n';"
+            f" {{ ( {command} ) </dev/null 2>\"$__err\"; echo $? >\"$__err.ec\"; }}"
+            f" | base64 | tr -d '\\n' | fold -w {_BINARY_LINE_LENGTH};"
+            f" printf '\\n{_printf_marker(STDERR_MARKER)}\\n'; base64 <\"$__err\"; read __ec <\"$__err.ec\";"
+            f" rm -f \"$__err\" \"$__err.ec\";"
+            f" printf '\\n{PRINTF_END}:%d\\n' \"$__ec\";"
+            f" exit $__ec\n"
+        )
+        await ws.send(json.dumps({"operation": "stdin", "data": wrapped}))
+
+        decoder = _BinaryOutputDecoder()
+        parser = _ExecOutputParser(write=decoder)
+        started = time.monotonic()
+        try:
+            async for raw_msg in ws:
+                msg = json.loads(raw_msg)
+                if msg.get("data"):
+                    parser.feed(msg["data"])
+                elif msg.get("error"):
+                    sys.stderr.write(f"Error: {msg['error']}\n")
+                    return 1, stats
+                stdout, stderr = decoder.take()
+                if stdout:
+                    await write(stdout)
+                    stats.bytes += len(stdout)
+                if stderr:
+                    sys.stderr.buffer.write(stderr)
+                    sys.stderr.buffer.flush()
+                if parser.is_done:
+                    break
+        except websockets.ConnectionClosed:
+            pass
+        stats.seconds = time.monotonic() - started
+
+        if not parser.is_done:
+            return 1, stats
+        try:
+            while True:
+                await asyncio.wait_for(ws.recv(), timeout=5)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            pass
+        return parser.exit_code, stats
+
+
+@dataclass
+class ExecResult:
+    """Output and exit code of one command run in an ExecSession."""
+
+    command: str
+    output: str
+    exit_code: int
+
+
+class ExecSession:
+    """A remote shell kept open to run commands one after another.
+
+    Connecting, spawning the shell and turning off echo happen once, so a
+    script running many commands pays for them once instead of per command.
+    Each command is framed by BEGIN/END markers unique to the session and
+    the command, so late output of an earlier command is never mistaken for
+    the current one. Commands read stdin from /dev/null, while shell state
+    such as the working directory carries over between them::
+
+        async with ExecSession(ws_url, token) as session:
+            result = await session.run("nvidia-smi")
+            print(result.exit_code, result.output)
+    """
+
+    def __init__(self, ws_url, token):
+        self.ws_url = ws_url
+        self.token = token
+        self._connection = None
+        self._ws = None
+        self._session_id = secrets.token_hex(4)
+        self._commands = 0
+
+    async def __aenter__(self):
+        cols, rows = shutil.get_terminal_size(fallback=(80, 24))
+        headers = {"Authorization": f"Bearer {self.token}"}
+        self._connection = websockets.connect(self.ws_url, additional_headers=headers, close_timeout=2)
+        self._ws = await self._connection.__aenter__()
+        await self._ws.send(json.dumps({"operation": "resize", "rows": rows, "cols": cols}))
+        await self._send(f"{_QUIET_SHELL}\n")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._send("exit\n")
+        except websockets.ConnectionClosed:
+            pass
+        return await self._connection.__aexit__(exc_type, exc, tb)
+
+    async def _send(self, data):
+        await self._ws.send(json.dumps({"operation": "stdin", "data": data}))
+
+    async def run(self, command, write=None):
+        """Run ``command`` and return its ExecResult once it finished.
+
+        ``write``, if given, receives the output as it arrives. Line endings
+        are normalized to ``\\n`` in both the streamed and the returned output.
+
+        Raises:
+            ShellError: the terminal reported an error or the shell exited
+                before the command finished.
+        """
+        self._commands += 1
+        tag = f"{self._session_id}_{self._commands}"
+        begin_marker, end_marker = f"__CENTML_BEGIN_{tag}__", f"__CENTML_END_{tag}__"
+        chunks = []
+
+        def _collect(text):
+            # The parser hands over whole lines. The last newline is held back
+            # until more output arrives: the END marker is printed on a line of
+            # its own, so the final newline was added by the wrapper, not the command.
+            text = ("\n" if chunks else "") + text.replace("\r\n", "\n")[:-1]
+            chunks.append(text)
+            if write is not None and text:
+                write(text)
+
+        parser = _ExecOutputParser(begin_marker, end_marker, write=_collect)
+        await self._send(
+            f"printf '{_printf_marker(begin_marker)}\\n';"
+            f" {{ {command}; }} </dev/null;"
+            f" printf '\\n{_printf_marker(end_marker)}:%d\\n' \"$?\"\n"
+        )
+        try:
+            while not parser.is_done:
+                msg = json.loads(await self._ws.recv())
+                if msg.get("data"):
+                    parser.feed(msg["data"])
+                elif msg.get("error"):
+                    raise ShellError(f"Error running '{command}': {msg['error']}")
+        except websockets.ConnectionClosed as e:
+            parser.finish()
+            raise ShellError(f"The remote shell exited before '{command}' finished") from e
+
+        return ExecResult(command, "".join(chunks), parser.exit_code)
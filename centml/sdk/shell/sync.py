@@ -0,0 +1,333 @@
+"""Push a local directory to a pod, sending only the blocks that changed.
+
+Like rsync, files whose size and modification time match on both sides are
+skipped. For the others both sides hash fixed-size blocks with sha256:
+locally in Python, in the pod with ``dd | sha256sum`` over an ExecSession.
+Only local blocks the pod does not already have are sent. They go up
+through the cp upload path in a tar archive, together with a generated
+POSIX shell script that rebuilds each file next to the original from old
+and new blocks, renames it into place and sets its mode and modification
+time, so the next sync skips it.
+
+Blocks are compared at block boundaries. An edit costs the blocks it
+touches. Inserting or removing bytes costs every block after that point,
+as no rolling checksum can be computed in the pod without extra tools.
+"""
+
+import fnmatch
+import hashlib
+import io
+import os
+import shlex
+import stat
+import tarfile
+import time
+from dataclasses import dataclass, field
+
+from centml.sdk.shell.session import ExecSession, TransferStats
+from centml.sdk.shell.transfer import _PART_SUFFIX, _receive_command, _tar_blocks, _upload, quote_remote_path
+
+BLOCK_SIZE = 64 * 1024
+# Larger files use larger blocks, which bounds the processes hashing them in the pod.
+MAX_BLOCKS = 256
+# Block hashing commands are batched up to this length; terminal lines hold up to 4095 characters.
+_COMMAND_LENGTH = 3000
+# Staging directory of the uploaded blocks, inside the destination so renames stay on one filesystem.
+_STAGING_PREFIX = ".centml-sync."
+_SCRIPT_NAME = "apply.sh"
+
+_LISTING_COMMAND = (
+    f"find . -type f ! -name '*{_PART_SUFFIX}' ! -path './{_STAGING_PREFIX}*'" " -exec stat -c '%s %Y %n' {} +"
+)
+
+
+@dataclass
+class SyncResult:
+    """Paths a sync created, rewrote and deleted, relative to the synced directory, and the bytes it moved."""
+
+    new: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    unchanged: int = 0
+    # Size of the new and changed files, and of the blocks of them that were sent.
+    total_bytes: int = 0
+    sent_bytes: int = 0
+    # None when nothing had to be uploaded, e.g. in a dry run.
+    stats: TransferStats = None
+
+
+def block_size(size):
+    """Block size used for a file of ``size`` bytes: BLOCK_SIZE, doubled until MAX_BLOCKS cover it."""
+    block = BLOCK_SIZE
+    while size > block * MAX_BLOCKS:
+        block *= 2
+    return block
+
+
+def is_excluded(path, patterns):
+    """Whether ``path`` matches a pattern, like rsync's --exclude.
+
+    A pattern with a slash matches the whole relative path, one without
+    matches any of its components.
+    """
+    parts = path.split("/")
+    return any(
+        fnmatch.fnmatch(path, pattern) if "/" in pattern else any(fnmatch.fnmatch(part, pattern) for part in parts)
+        for pattern in patterns
+    )
+
+
+def scan_local(root, exclude=()):
+    """Regular files under ``root`` as {relative path: os.stat_result}, and its directories.
+
+    Symbolic links are followed; paths use ``/`` separators.
+    """
+    files, dirs = {}, []
+    for current, subdirs, names in os.walk(root):
+        rel_dir = os.path.relpath(current, root)
+        prefix = "" if rel_dir == "." else rel_dir.replace(os.sep, "/") + "/"
+        subdirs[:] = [d for d in subdirs if not is_excluded(prefix + d, exclude)]
+        dirs.extend(prefix + d for d in subdirs)
+        for name in names:
+            path = prefix + name
+            if is_excluded(path, exclude):
+                continue
+            try:
+                st = os.stat(os.path.join(current, name))
+            except OSError:
+                # A dangling symlink, or a file deleted while scanning.
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files[path] = st
+    return files, sorted(dirs)
+
+
+def parse_listing(output):
+    """{relative path: (size, mtime)} from the output of the pod's listing command."""
+    remote = {}
+    for line in output.splitlines():
+        try:
+            size, mtime, name = line.split(" ", 2)
+            if name.startswith("./"):
+                remote[name[2:]] = (int(size), int(mtime))
+        except ValueError:
+            continue
+    return remote
+
+
+def local_block_hashes(path, block):
+    hashes = []
+    with open(path, "rb") as f:
+        while data := f.read(block):
+            hashes.append(hashlib.sha256(data).hexdigest())
+    return hashes
+
+
+def _hash_command(index, path, size, block):
+    count = -(-size // block)
+    return (
+        f"printf 'F %d\\n' {index}; __i=0; while [ $__i -lt {count} ]; do"
+        f" dd if={shlex.quote(path)} bs={block} skip=$__i count=1 2>/dev/null | sha256sum; __i=$((__i+1)); done"
+    )
+
+
+async def _remote_block_hashes(session, jobs):
+    """Block hashes of the pod's files, for (path, size, block size) jobs, in job order."""
+    hashes = [[] for _ in jobs]
+    batch = []
+
+    async def _flush():
+        result = await session.run("; ".join(batch))
+        batch.clear()
+        current = None
+        for line in result.output.splitlines():
+            if line.startswith("F "):
+                current = hashes[int(line[2:])]
+            elif current is not None and line.strip():
+                current.append(line.split()[0])
+
+    for index, (path, size, block) in enumerate(jobs):
+        command = _hash_command(index, path, size, block)
+        if batch and sum(len(c) + 2 for c in batch) + len(command) > _COMMAND_LENGTH:
+            await _flush()
+        batch.append(command)
+    if batch:
+        await _flush()
+    return hashes
+
+
+def delta(local_hashes, remote_hashes):
+    """Rebuild a file from the pod's copy of it and the blocks it lacks.
+
+    Returns:
+        (instructions, indices of the local blocks to send). Instructions
+        are ("old", first, count) for blocks of the pod's copy and ("new",
+        first, count) for blocks in the order they are sent.
+    """
+    where = {}
+    for index, digest in enumerate(remote_hashes):
+        where.setdefault(digest, index)
+    instructions, missing = [], []
+    for index, digest in enumerate(local_hashes):
+        if digest in where:
+            source, first = "old", where[digest]
+        else:
+            source, first = "new", len(missing)
+            missing.append(index)
+        if instructions and instructions[-1][0] == source and sum(instructions[-1][1:]) == first:
+            instructions[-1] = (source, instructions[-1][1], instructions[-1][2] + 1)
+        else:
+            instructions.append((source, first, 1))
+    return instructions, missing
+
+
+class _BlockReader:
+    """Reads the given blocks of a file one after another, as tarfile's file object."""
+
+    def __init__(self, f, blocks, block):
+        self._file = f
+        self._blocks = iter(blocks)
+        self._block = block
+        self._data = b""
+        self._offset = 0
+
+    def read(self, size=-1):
+        chunks = []
+        while size != 0:
+            if self._offset == len(self._data):
+                index = next(self._blocks, None)
+                if index is None:
+                    break
+                self._file.seek(index * self._block)
+                self._data, self._offset = self._file.read(self._block), 0
+                continue
+            end = len(self._data) if size < 0 else min(len(self._data), self._offset + size)
+            chunks.append(self._data[self._offset : end])
+            size = size if size < 0 else size - (end - self._offset)
+            self._offset = end
+        return b"".join(chunks)
+
+
+@dataclass
+class _Update:
+    path: str
+    st: os.stat_result
+    block: int = 0
+    # None for files sent whole.
+    instructions: list = None
+    blocks: list = field(default_factory=list)
+    # False when the pod's copy has the same content and only its mode and time are updated.
+    rewrite: bool = True
+
+    @property
+    def sent_bytes(self):
+        if self.instructions is None:
+            return self.st.st_size
+        return sum(min(self.block, self.st.st_size - index * self.block) for index in self.blocks)
+
+
+def _apply_script(dirs, updates, deleted):
+    """POSIX shell script applying a sync in the destination directory, given the staging directory as $1."""
+    lines = ["set -e", 'S="$1"']
+    lines.extend(f"[ -d {shlex.quote(d)} ] || mkdir -p -- {shlex.quote(d)}" for d in dirs)
+    for number, update in enumerate(updates):
+        path = shlex.quote(update.path)
+        if update.instructions is None:
+            lines.append(f'mv -f -- "$S/{number}" {path}')
+        elif update.rewrite:
+            sources = {"old": path, "new": f'"$S/{number}"'}
+            copies = "; ".join(
+                f"dd if={sources[source]} bs={update.block} skip={first} count={count} 2>/dev/null"
+                for source, first, count in update.instructions
+            )
+            copies = copies or ":"
+            part = shlex.quote(update.path + _PART_SUFFIX)
+            lines.append(f"{{ {copies}; }} >{part}")
+            lines.append(f"mv -f -- {part} {path}")
+        stamp = time.strftime("%Y%m%d%H%M.%S", time.gmtime(int(update.st.st_mtime)))
+        lines.append(f"chmod {stat.S_IMODE(update.st.st_mode):o} -- {path}")
+        lines.append(f"TZ=UTC0 touch -t {stamp} -- {path}")
+    lines.extend(f"rm -f -- {shlex.quote(path)}" for path in deleted)
+    return "\n".join(lines) + "\n"
+
+
+def _add_updates(root, dirs, updates, deleted):
+    """Fills a tar archive with the apply script and, per update, the data it needs."""
+
+    def _add(tar):
+        script = _apply_script(dirs, updates, deleted).encode()
+        info = tarfile.TarInfo(_SCRIPT_NAME)
+        info.size = len(script)
+        tar.addfile(info, io.BytesIO(script))
+        for number, update in enumerate(updates):
+            if update.instructions is not None and not update.blocks:
+                continue
+            info = tarfile.TarInfo(str(number))
+            info.size = update.sent_bytes
+            with open(os.path.join(root, update.path), "rb") as f:
+                reader = f if update.instructions is None else _BlockReader(f, update.blocks, update.block)
+                tar.addfile(info, reader)
+
+    return _add
+
+
+async def sync_to_pod(  # pylint: disable=R0917
+    ws_url, token, source, destination, exclude=(), delete=False, dry_run=False
+):
+    """Make ``destination`` in the pod match the local directory ``source``.
+
+    Files only in the pod are kept unless ``delete`` is set. Paths matching
+    an ``exclude`` pattern (see is_excluded) are neither sent nor deleted.
+    With ``dry_run`` the pod is inspected but nothing is changed.
+
+    Returns:
+        SyncResult of what changed.
+
+    Raises:
+        ShellError: the pod could not be inspected or the changes not applied.
+    """
+    files, dirs = scan_local(source, exclude)
+    result = SyncResult()
+
+    async with ExecSession(ws_url, token) as session:
+        # A destination that does not exist yet simply has no files.
+        in_destination = await session.run(f"cd {quote_remote_path(destination)}")
+        remote = {}
+        if in_destination.exit_code == 0:
+            remote = parse_listing((await session.run(_LISTING_COMMAND)).output)
+
+        stale = sorted(
+            path for path, st in files.items() if path in remote and remote[path] != (st.st_size, int(st.st_mtime))
+        )
+        blocks = {path: block_size(max(files[path].st_size, remote[path][0])) for path in stale}
+        jobs = [(path, remote[path][0], blocks[path]) for path in stale]
+        remote_hashes = await _remote_block_hashes(session, jobs) if jobs else []
+
+    updates = [_Update(path, files[path]) for path in sorted(files) if path not in remote]
+    result.new = [update.path for update in updates]
+    for path, hashes in zip(stale, remote_hashes):
+        instructions, missing = delta(local_block_hashes(os.path.join(source, path), blocks[path]), hashes)
+        # Blocks all found in place: only the modification time or mode differs.
+        rewrite = bool(missing) or instructions != ([("old", 0, len(hashes))] if hashes else [])
+        updates.append(_Update(path, files[path], blocks[path], instructions, missing, rewrite))
+        if rewrite:
+            result.changed.append(path)
+    result.unchanged = len(files) - len(result.new) - len(result.changed)
+    if delete:
+        result.deleted = sorted(path for path in remote if path not in files and not is_excluded(path, exclude))
+    changed = set(result.new) | set(result.changed)
+    result.total_bytes = sum(files[path].st_size for path in changed)
+    result.sent_bytes = sum(update.sent_bytes for update in updates if update.path in changed)
+
+    if dry_run or not (updates or result.deleted):
+        return result
+
+    quoted = quote_remote_path(destination)
+    command = _receive_command(
+        f"mkdir -p {quoted} && cd {quoted} && __d=$(mktemp -d ./{_STAGING_PREFIX}XXXXXX)",
+        'gunzip | tar xf - -C "$__d"',
+        f' [ $__ec = 0 ] && {{ sh "$__d/{_SCRIPT_NAME}" "$__d"; __ec=$?; }}; rm -rf "$__d";',
+    )
+    archive = _tar_blocks(_add_updates(source, dirs, updates, result.deleted))
+    result.stats = await _upload(ws_url, token, archive, command, f"Syncing {source} to {destination}")
+    return result
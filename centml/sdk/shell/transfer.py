@@ -0,0 +1,474 @@
+"""Copy files and directories to and from pods over the terminal WebSocket.
+
+Both directions move one gzip stream: the file itself, or a tar archive of
+a directory. gzip's CRC32 and length trailer check the whole stream end to
+end, so a transfer that lost or mangled data fails instead of leaving a
+corrupt copy behind. Downloads are written to a ``.centml-part`` file or
+directory next to the destination and only moved into place once the stream
+checked out.
+
+Downloads run the compressor in the pod through exec_binary_session, whose
+awaited writes throttle the pod when the local disk falls behind. Uploads
+type the stream into the terminal as base64 lines: chunks end with ^D, which
+makes the pod's ``base64 -d`` see end of file, and the pod acknowledges each
+chunk with its sha256. At most ``window`` chunks are unacknowledged at a
+time, so a slow pod throttles the upload the same way.
+"""
+
+import asyncio
+import binascii
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shlex
+import shutil
+import tarfile
+import threading
+import time
+import zlib
+
+import websockets
+
+from centml.sdk.shell.exceptions import ShellError
+from centml.sdk.shell.session import (
+    PRINTF_BEGIN,
+    PRINTF_END,
+    _QUIET_SHELL,
+    TransferStats,
+    _ExecOutputParser,
+    _write_all,
+    exec_binary_session,
+)
+from centml.sdk.utils.background import BackgroundIterator
+
+# Compressed bytes per acknowledged upload chunk. The pod spawns a few
+# processes per chunk, so chunks are large enough for that to be noise.
+CHUNK_SIZE = 4 * 1024 * 1024
+# Upload chunks in flight before waiting for the pod's acknowledgements.
+WINDOW = 4
+# Fast compression keeps up with the link; level 6 would be the bottleneck.
+COMPRESS_LEVEL = 1
+
+_READ_SIZE = 1024 * 1024
+# base64 characters per terminal input line, below the 4095 character limit of canonical mode.
+_LINE_LENGTH = 4000
+# Characters per stdin message, so no single WebSocket frame gets large.
+_FRAME_SIZE = 64 * 1024
+# Ends an upload chunk: at the start of a line, the terminal turns it into end of file.
+_EOF = "\x04"
+_PART_SUFFIX = ".centml-part"
+# Prefixes the download stream, telling whether a file or a tar archive follows.
+_FILE, _DIRECTORY = b"F", b"D"
+
+_ACK_RE = re.compile(r"^ACK (\d+) ([0-9a-f]{64})\b")
+_NAK_RE = re.compile(r"^NAK (\d+)")
+
+
+def quote_remote_path(path):
+    """Quote a path for the pod's shell, keeping a leading ``~`` pointing at the home directory."""
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+def _file_blocks(path):
+    with open(path, "rb") as f:
+        while block := f.read(_READ_SIZE):
+            yield block
+
+
+def _tar_blocks(add):
+    """Blocks of an uncompressed tar archive, which ``add(tar)`` fills on a helper thread."""
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def _write_archive():
+        try:
+            with os.fdopen(write_fd, "wb") as out, tarfile.open(fileobj=out, mode="w|") as tar:
+                add(tar)
+        except BrokenPipeError:
+            # The reader stopped early; nobody is left to report to.
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    thread = threading.Thread(target=_write_archive, daemon=True)
+    thread.start()
+    with os.fdopen(read_fd, "rb") as archive:
+        while block := archive.read(_READ_SIZE):
+            yield block
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+class _GzipChunks:
+    """Iterates the gzip stream of ``blocks`` in chunks of ``chunk_size`` bytes, counting the input bytes."""
+
+    def __init__(self, blocks, chunk_size):
+        self._blocks = blocks
+        self._chunk_size = chunk_size
+        self.raw_bytes = 0
+
+    def __iter__(self):
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        pending = bytearray()
+        for block in self._blocks:
+            self.raw_bytes += len(block)
+            pending += compressor.compress(block)
+            while len(pending) >= self._chunk_size:
+                yield bytes(pending[: self._chunk_size])
+                del pending[: self._chunk_size]
+        pending += compressor.flush()
+        for start in range(0, len(pending), self._chunk_size):
+            yield bytes(pending[start : start + self._chunk_size])
+
+
+def _encode_chunk(chunk):
+    """Terminal input carrying one upload chunk: base64 lines, then end of file."""
+    encoded = binascii.b2a_base64(chunk, newline=False).decode("ascii")
+    lines = [encoded[start : start + _LINE_LENGTH] for start in range(0, len(encoded), _LINE_LENGTH)]
+    return "\n".join(lines) + "\n" + _EOF
+
+
+def _receive_command(setup, sink, finish=""):
+    """Shell line receiving upload chunks and piping the decoded stream into ``sink``.
+
+    ``setup`` runs first, ``finish`` after the stream ended, with the sink's
+    exit code in ``$__ec``. Each chunk is decoded into a temp file, appended
+    to the sink and acknowledged with its sha256 on fd 3, the terminal. An
+    empty chunk ends the loop. Chunks that cannot be written are answered
+    with NAK but still read, so none of them reach the shell as commands.
+    """
+    return (
+        f"{_QUIET_SHELL}; {setup}; __c=$(mktemp);"
+        f" printf '{PRINTF_BEGIN}\\n';"
+        " { { __i=0; while :; do"
+        ' if base64 -d >"$__c" 2>/dev/null; then [ -s "$__c" ] || break;'
+        ' if cat "$__c"; then printf \'ACK %d \' $__i >&3; sha256sum <"$__c" >&3;'
+        " else printf 'NAK %d\\n' $__i >&3; fi;"
+        " else printf 'NAK %d\\n' $__i >&3; fi;"
+        " __i=$((__i+1)); done; }"
+        f" | {{ {sink}; }}; }} 3>&1; __ec=$?;"
+        f'{finish} rm -f "$__c";'
+        f" printf '\\n{PRINTF_END}:%d\\n' \"$__ec\";"
+        " exit $__ec\n"
+    )
+
+
+def _upload_command(destination, name, is_dir):
+    """Shell line receiving an upload into ``destination``, like ``cp -r``."""
+    setup = f'__d={quote_remote_path(destination)}; [ -d "$__d" ] && __d="$__d"/{shlex.quote(name)}'
+    if is_dir:
+        return _receive_command(setup, 'mkdir -p "$__d" && gunzip | tar xf - -C "$__d"')
+    return _receive_command(
+        setup,
+        f'gunzip >"$__d{_PART_SUFFIX}"',
+        f' if [ $__ec = 0 ]; then mv -f "$__d{_PART_SUFFIX}" "$__d"; __ec=$?;' f' else rm -f "$__d{_PART_SUFFIX}"; fi;',
+    )
+
+
+async def _upload(  # pylint: disable=R0917
+    ws_url, token, blocks, command, description, chunk_size=CHUNK_SIZE, window=WINDOW
+):
+    """Send the gzip stream of ``blocks`` to the pod, where ``command`` (see _receive_command) takes it.
+
+    Returns:
+        TransferStats of the bytes of ``blocks`` sent.
+
+    Raises:
+        ShellError: the pod rejected a chunk or its command failed.
+    """
+    stream = _GzipChunks(blocks, chunk_size)
+    cols, rows = shutil.get_terminal_size(fallback=(80, 24))
+    headers = {"Authorization": f"Bearer {token}"}
+    stats = TransferStats()
+    digests, output = [], []
+    # One entry per acknowledgement: True if the chunk arrived intact, else False.
+    # None means the pod stopped answering.
+    acks = asyncio.Queue()
+    ready = asyncio.Event()
+
+    def _on_lines(text):
+        for line in text.splitlines():
+            line = line.strip()
+            if match := _ACK_RE.match(line):
+                index = int(match.group(1))
+                acks.put_nowait(index < len(digests) and digests[index] == match.group(2))
+            elif _NAK_RE.match(line):
+                acks.put_nowait(False)
+            elif line:
+                output.append(line)
+
+    async def _send(ws, data):
+        for start in range(0, len(data), _FRAME_SIZE):
+            await ws.send(json.dumps({"operation": "stdin", "data": data[start : start + _FRAME_SIZE]}))
+
+    async def _receive(ws, parser):
+        try:
+            while not parser.is_done:
+                msg = json.loads(await ws.recv())
+                if msg.get("data"):
+                    parser.feed(msg["data"])
+                    if parser.is_capturing:
+                        ready.set()
+                elif msg.get("error"):
+                    output.append(msg["error"])
+                    break
+        except websockets.ConnectionClosed:
+            parser.finish()
+        finally:
+            ready.set()
+            acks.put_nowait(None)
+
+    async def _send_chunks(ws, receiver):
+        await ready.wait()
+        # Without the receiving loop in place, chunks would reach the shell as commands.
+        if receiver.done():
+            return False
+        chunks = BackgroundIterator(stream, maxsize=window)
+        sent = acked = 0
+        intact = True
+        try:
+            while intact and (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                # Acknowledgements already in are checked too, so a failure stops the upload early.
+                while intact and (sent - acked >= window or not acks.empty()):
+                    intact = await acks.get()
+                    acked += 1
+                if not intact:
+                    break
+                digests.append(hashlib.sha256(chunk).hexdigest())
+                await _send(ws, _encode_chunk(chunk))
+                sent += 1
+        finally:
+            chunks.close()
+        await _send(ws, _EOF)
+        while intact and acked < sent:
+            intact = await acks.get()
+            acked += 1
+        return intact
+
+    async with websockets.connect(ws_url, additional_headers=headers, close_timeout=2) as ws:
+        await ws.send(json.dumps({"operation": "resize", "rows": rows, "cols": cols}))
+        await _send(ws, command)
+
+        parser = _ExecOutputParser(write=_on_lines)
+        started = time.monotonic()
+        receiver = asyncio.create_task(_receive(ws, parser))
+        try:
+            intact = await _send_chunks(ws, receiver)
+            await receiver
+        except websockets.ConnectionClosed:
+            intact = False
+        finally:
+            receiver.cancel()
+        stats.seconds = time.monotonic() - started
+        stats.bytes = stream.raw_bytes
+
+    if not intact or not parser.is_done or parser.exit_code:
+        detail = "; ".join(output[-5:]) or "the connection closed"
+        raise ShellError(f"{description} failed: {detail}")
+    return stats
+
+
+async def copy_to_pod(  # pylint: disable=R0917
+    ws_url, token, source, destination, chunk_size=CHUNK_SIZE, window=WINDOW
+):
+    """Copy the local file or directory ``source`` to ``destination`` in the pod.
+
+    Like ``cp -r``, an existing destination directory receives the source
+    under its own name.
+
+    Returns:
+        TransferStats of the source bytes sent.
+
+    Raises:
+        ShellError: the pod rejected a chunk or could not write the copy.
+    """
+    source = os.path.normpath(source)
+    is_dir = os.path.isdir(source)
+    blocks = _tar_blocks(lambda tar: tar.add(source, arcname=".")) if is_dir else _file_blocks(source)
+    command = _upload_command(destination, os.path.basename(source), is_dir)
+    return await _upload(ws_url, token, blocks, command, f"Copying {source} to {destination}", chunk_size, window)
+
+
+def _download_command(source):
+    """Shell command writing the type byte and the file or tar archive of ``source``, gzipped, to stdout."""
+    path = quote_remote_path(source)
+    gzip = f"gzip -{COMPRESS_LEVEL} -c"
+    return (
+        f"if [ -d {path} ]; then {{ printf {_DIRECTORY.decode()}; tar cf - -C {path} .; }} | {gzip};"
+        f" elif [ -f {path} ] && [ -r {path} ]; then {{ printf {_FILE.decode()}; cat {path}; }} | {gzip};"
+        f" else echo {shlex.quote(f'{source}: no such file or directory')} >&2; exit 1; fi"
+    )
+
+
+class _FileSink:
+    def __init__(self, path):
+        self.path = path
+        self._part = path + _PART_SUFFIX
+        self._fd = os.open(self._part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    async def write(self, data):
+        await asyncio.to_thread(_write_all, self._fd, data)
+
+    def close(self):
+        os.close(self._fd)
+        os.replace(self._part, self.path)
+
+    def abort(self):
+        os.close(self._fd)
+        os.remove(self._part)
+
+
+def _checked_member(member, root):
+    """``member`` if extracting it stays inside ``root``, like tarfile's "data" filter.
+
+    Raises:
+        ShellError: the member is a device or would write or link outside ``root``.
+    """
+    root = os.path.realpath(root)
+
+    def _inside(path):
+        return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+    target = os.path.join(root, member.name)
+    if os.path.isabs(member.name) or not _inside(target):
+        raise ShellError(f"Refusing to extract {member.name!r} outside {root}")
+    if member.issym():
+        link = os.path.join(os.path.dirname(target), member.linkname)
+    elif member.islnk():
+        link = os.path.join(root, member.linkname)
+    elif member.isfile() or member.isdir():
+        link = None
+    else:
+        raise ShellError(f"Refusing to extract special file {member.name!r}")
+    if link is not None and (os.path.isabs(member.linkname) or not _inside(link)):
+        raise ShellError(f"Refusing to extract {member.name!r} linking outside {root}")
+    member.mode &= 0o777
+    return member
+
+
+def _merge_tree(source, destination):
+    """Move the contents of directory ``source`` into ``destination``, like ``cp -r`` onto an existing directory."""
+    for entry in os.scandir(source):
+        target = os.path.join(destination, entry.name)
+        if entry.is_dir(follow_symlinks=False) and os.path.isdir(target) and not os.path.islink(target):
+            _merge_tree(entry.path, target)
+        else:
+            os.replace(entry.path, target)
+
+
+class _TarSink:
+    """Extracts a tar stream next to ``path`` on a helper thread, fed through a pipe; close() moves it into place."""
+
+    def __init__(self, path):
+        self.path = path
+        self._part = os.path.normpath(path) + _PART_SUFFIX
+        shutil.rmtree(self._part, ignore_errors=True)
+        os.makedirs(self._part)
+        read_fd, self._fd = os.pipe()
+        self._errors = []
+        self._thread = threading.Thread(target=self._extract, args=(read_fd,), daemon=True)
+        self._thread.start()
+
+    def _extract(self, read_fd):
+        try:
+            with os.fdopen(read_fd, "rb") as archive, tarfile.open(fileobj=archive, mode="r|") as tar:
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(self._part, filter="data")
+                else:
+                    # Pythons before 3.10.12 and 3.11.4 have no extraction filters.
+                    for member in tar:
+                        tar.extract(_checked_member(member, self._part), self._part)
+        except Exception as e:  # pylint: disable=broad-except
+            self._errors.append(e)
+
+    async def write(self, data):
+        try:
+            await asyncio.to_thread(_write_all, self._fd, data)
+        except BrokenPipeError as e:
+            # The extractor closes the pipe before recording why it stopped.
+            await asyncio.to_thread(self._thread.join)
+            reason = self._errors[0] if self._errors else "the archive ended before the stream did"
+            raise ShellError(f"Extracting into {self.path} failed: {reason}") from e
+
+    def close(self):
+        os.close(self._fd)
+        self._thread.join()
+        try:
+            if self._errors:
+                raise ShellError(f"Extracting into {self.path} failed: {self._errors[0]}")
+            if os.path.isdir(self.path):
+                _merge_tree(self._part, self.path)
+            else:
+                os.replace(self._part, self.path)
+        except OSError as e:
+            raise ShellError(f"Moving the copy into {self.path} failed: {e}") from e
+        finally:
+            shutil.rmtree(self._part, ignore_errors=True)
+
+    def abort(self):
+        os.close(self._fd)
+        self._thread.join()
+        shutil.rmtree(self._part, ignore_errors=True)
+
+
+def _local_target(destination, name):
+    """Where a copy named ``name`` lands, like ``cp -r``: inside ``destination`` if that is a directory."""
+    if os.path.isdir(destination) and name not in ("", ".", "..", "/"):
+        return os.path.join(destination, name)
+    return destination
+
+
+async def copy_from_pod(ws_url, token, source, destination):
+    """Copy the file or directory ``source`` in the pod to the local ``destination``.
+
+    Returns:
+        TransferStats of the bytes received, before compression.
+
+    Raises:
+        ShellError: the pod could not read the source, or the stream arrived
+            truncated or corrupt.
+    """
+    name = posixpath.basename(posixpath.normpath(source))
+    decompressor = zlib.decompressobj(31)
+    sink = None
+    stats = TransferStats()
+
+    async def _write(data):
+        nonlocal sink
+        while data:
+            try:
+                raw = decompressor.decompress(data, _READ_SIZE)
+            except zlib.error as e:
+                raise ShellError(f"Copying {source} from the pod failed: corrupt stream ({e})") from e
+            data = decompressor.unconsumed_tail
+            if sink is None and raw:
+                kind, raw = raw[:1], raw[1:]
+                target = _local_target(destination, name)
+                sink = _TarSink(target) if kind == _DIRECTORY else _FileSink(target)
+            if raw:
+                await sink.write(raw)
+                stats.bytes += len(raw)
+
+    started = time.monotonic()
+    try:
+        exit_code, _ = await exec_binary_session(ws_url, token, _download_command(source), write=_write)
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+    stats.seconds = time.monotonic() - started
+
+    if exit_code or not decompressor.eof or sink is None:
+        if sink is not None:
+            sink.abort()
+        reason = f"exit code {exit_code}" if exit_code else "the stream was truncated"
+        raise ShellError(f"Copying {source} from the pod failed: {reason}")
+    sink.close()
+    return stats
@@ -0,0 +1,23 @@
+from centml.sdk.usage.batch import UsageMatrix, collect_usage
+from centml.sdk.usage.chunks import (
+    MAX_DATA_POINTS,
+    fetch_usage_chunked,
+    get_step_size,
+    split_usage_window,
+    stitch_usage_series,
+)
+from centml.sdk.usage.series import UsageSeries, stitch_usage_columns
+from centml.sdk.usage.store import UsageStore
+
+__all__ = [
+    "MAX_DATA_POINTS",
+    "UsageMatrix",
+    "UsageSeries",
+    "UsageStore",
+    "collect_usage",
+    "fetch_usage_chunked",
+    "get_step_size",
+    "split_usage_window",
+    "stitch_usage_columns",
+    "stitch_usage_series",
+]
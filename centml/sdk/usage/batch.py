@@ -0,0 +1,82 @@
+"""Collect usage for many deployments and metrics into one aligned matrix."""
+
+import math
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List
+
+from centml.sdk.usage.series import numpy
+
+_REDUCTIONS = ("mean", "sum", "max")
+
+
+@dataclass
+class UsageMatrix:
+    """Usage values indexed as ``values[deployment][metric][time]``, NaN where there is no sample.
+
+    ``values`` is a NumPy array of shape (deployments, metrics, timestamps)
+    when NumPy is installed, nested lists of ``array('d')`` rows otherwise.
+    """
+
+    deployment_ids: List[int]
+    metrics: List[Any]
+    timestamps: Any
+    values: Any
+
+    def row(self, deployment_id, metric):
+        return self.values[self.deployment_ids.index(deployment_id)][self.metrics.index(metric)]
+
+
+def _reduce_series(series_list, start, step, length, reduce):
+    """Combine several label sets of one metric (e.g. one series per GPU) into one row on the grid."""
+    if numpy is not None:
+        totals = numpy.full(length, -numpy.inf if reduce == "max" else 0.0)
+        counts = numpy.zeros(length, dtype=numpy.int64)
+        for series in series_list:
+            index = numpy.rint((numpy.asarray(series.timestamps) - start) / step).astype(numpy.int64)
+            values = numpy.asarray(series.values, dtype=numpy.float64)
+            keep = (index >= 0) & (index < length) & ~numpy.isnan(values)
+            (numpy.maximum if reduce == "max" else numpy.add).at(totals, index[keep], values[keep])
+            numpy.add.at(counts, index[keep], 1)
+        if reduce == "mean":
+            totals = totals / numpy.maximum(counts, 1)
+        return numpy.where(counts > 0, totals, numpy.nan)
+
+    totals = [0.0] * length
+    counts = [0] * length
+    for series in series_list:
+        for ts, value in zip(series.timestamps, series.values):
+            i = round((ts - start) / step)
+            if 0 <= i < length and not math.isnan(value):
+                totals[i] = max(totals[i], value) if reduce == "max" and counts[i] else totals[i] + value
+                counts[i] += 1
+    if reduce == "mean":
+        return [total / count if count else math.nan for total, count in zip(totals, counts)]
+    return [total if count else math.nan for total, count in zip(totals, counts)]
+
+
+def collect_usage(  # pylint: disable=R0917
+    fetch_usage, deployment_ids, metrics, start_time_in_seconds, end_time_in_seconds, step, max_workers=8, reduce="mean"
+):
+    """Fetch every (deployment, metric) pair concurrently and align the results on one time grid.
+
+    ``fetch_usage(deployment_id, metric)`` returns a list of UsageSeries for
+    the window. Series sharing a metric (one per GPU, for instance) are
+    combined with ``reduce`` ("mean", "sum" or "max"). The grid runs from
+    the window start every ``step`` seconds; samples snap to the nearest slot.
+    """
+    if reduce not in _REDUCTIONS:
+        raise ValueError(f"Unknown reduction '{reduce}'; expected one of {', '.join(_REDUCTIONS)}")
+    deployment_ids, metrics = list(deployment_ids), list(metrics)
+    pairs = [(deployment_id, metric) for deployment_id in deployment_ids for metric in metrics]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pairs)))) as pool:
+        results = list(pool.map(lambda pair: fetch_usage(*pair), pairs))
+
+    grid = range(start_time_in_seconds, end_time_in_seconds + 1, step)
+    rows = iter(_reduce_series(series_list, start_time_in_seconds, step, len(grid), reduce) for series_list in results)
+    if numpy is not None:
+        values = numpy.array(list(rows), dtype=numpy.float64).reshape(len(deployment_ids), len(metrics), len(grid))
+        return UsageMatrix(deployment_ids, metrics, numpy.asarray(grid, dtype=numpy.int64), values)
+    values = [[array("d", next(rows)) for _ in metrics] for _ in deployment_ids]
+    return UsageMatrix(deployment_ids, metrics, array("q", grid), values)
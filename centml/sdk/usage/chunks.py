@@ -0,0 +1,84 @@
+"""Pick step sizes for usage queries and split windows that exceed the API's point limit."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+HOUR_IN_SECONDS = 60 * 60
+DAY_IN_SECONDS = 24 * HOUR_IN_SECONDS
+# The usage API returns at most this many samples per series and request.
+MAX_DATA_POINTS = 10_000
+
+# (longest window in seconds, step in seconds), matching the platform UI's resolution tiers.
+STEP_SIZES = (
+    (2 * DAY_IN_SECONDS, 60),
+    (7 * DAY_IN_SECONDS, 5 * 60),
+    (14 * DAY_IN_SECONDS, 10 * 60),
+    (30 * DAY_IN_SECONDS, 30 * 60),
+    (60 * DAY_IN_SECONDS, HOUR_IN_SECONDS),
+    (90 * DAY_IN_SECONDS, 2 * HOUR_IN_SECONDS),
+)
+LONGEST_STEP = 3 * HOUR_IN_SECONDS
+
+
+def get_step_size(start_time_in_seconds: int, end_time_in_seconds: int) -> int:
+    """Default step for a window: coarser the longer the window is."""
+    time_delta_in_seconds = end_time_in_seconds - start_time_in_seconds
+    for max_window, step in STEP_SIZES:
+        if time_delta_in_seconds <= max_window:
+            return step
+    return LONGEST_STEP
+
+
+def split_usage_window(start_time_in_seconds, end_time_in_seconds, step, max_points=MAX_DATA_POINTS):
+    """Split an inclusive window into chunks of at most ``max_points`` samples each.
+
+    Chunk boundaries stay on the ``start + k * step`` grid and consecutive
+    chunks start one step apart, so stitching them yields the same samples
+    as one unbounded request would.
+    """
+    if step <= 0:
+        raise ValueError("step must be positive")
+    span = (max_points - 1) * step
+    chunks = []
+    chunk_start = start_time_in_seconds
+    while chunk_start <= end_time_in_seconds:
+        chunk_end = min(chunk_start + span, end_time_in_seconds)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + step
+    return chunks
+
+
+def stitch_usage_series(chunk_results):
+    """Join per-chunk lists of DeploymentUsage into one series per metric label set.
+
+    Samples are ordered by timestamp, and a timestamp reported by two
+    adjacent chunks is kept once.
+    """
+    stitched = {}
+    for series_list in chunk_results:
+        for series in series_list:
+            key = tuple(sorted((series.metric or {}).items()))
+            if key not in stitched:
+                stitched[key] = (series, {})
+            for value in series.values or []:
+                stitched[key][1].setdefault(value.timestamp, value)
+
+    return [
+        first.model_copy(update={"values": [values[ts] for ts in sorted(values)]})
+        for first, values in stitched.values()
+    ]
+
+
+def fetch_usage_chunked(  # pylint: disable=R0917
+    fetch_chunk, start_time_in_seconds, end_time_in_seconds, step, max_workers=4, stitch=stitch_usage_series
+):
+    """Fetch a usage window in point-limited chunks, concurrently, and stitch the results.
+
+    ``fetch_chunk(chunk_start, chunk_end)`` performs one API request and
+    returns its list of series; ``stitch`` joins the per-chunk lists.
+    """
+    chunks = split_usage_window(start_time_in_seconds, end_time_in_seconds, step)
+    if len(chunks) == 1:
+        return fetch_chunk(*chunks[0])
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        results = list(pool.map(lambda chunk: fetch_chunk(*chunk), chunks))
+    return stitch(results)
@@ -0,0 +1,162 @@
+"""Columnar usage time series with vectorized analysis helpers.
+
+A UsageSeries keeps timestamps and values in two flat buffers: NumPy
+arrays when NumPy is installed, ``array('q')``/``array('d')`` otherwise.
+The helpers use vectorized NumPy operations when available and fall back
+to plain Python over the buffers, with identical results.
+"""
+
+import itertools
+import statistics
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:  # optional dependency, the array module is used instead
+    numpy = None
+
+_AGGREGATIONS = ("mean", "sum", "min", "max")
+
+
+def _columns(timestamps, values):
+    if numpy is not None:
+        return numpy.asarray(timestamps, dtype=numpy.int64), numpy.asarray(values, dtype=numpy.float64)
+    return array("q", timestamps), array("d", values)
+
+
+def _percentile(sorted_values, q):
+    # Linear interpolation between closest ranks, as numpy.percentile does by default.
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+@dataclass
+class UsageSeries:
+    """Samples of one usage metric series; ``metric`` holds its labels (e.g. the GPU index)."""
+
+    metric: Dict[str, str]
+    timestamps: Any
+    values: Any
+    step: Optional[int] = None
+
+    @classmethod
+    def from_points(cls, metric, points, step=None):
+        """Build a series from ``(timestamp, value)`` pairs, sorted by timestamp."""
+        points = sorted(points)
+        timestamps = [ts for ts, _ in points]
+        values = [value for _, value in points]
+        return cls(dict(metric or {}), *_columns(timestamps, values), step=step)
+
+    @classmethod
+    def from_json(cls, series, step=None):
+        """Build a series from the API's JSON form: ``{"metric": {...}, "values": [{"timestamp", "value"}]}``."""
+        points = ((point["timestamp"], point["value"]) for point in series.get("values") or [])
+        return cls.from_points(series.get("metric"), points, step)
+
+    @classmethod
+    def from_model(cls, series, step=None):
+        """Build a series from a generated DeploymentUsage model."""
+        return cls.from_points(series.metric, ((v.timestamp, v.value) for v in series.values or []), step)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def resample(self, step: int, how: str = "mean") -> "UsageSeries":
+        """Aggregate samples into buckets of ``step`` seconds, labelled by bucket start."""
+        if how not in _AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{how}'; expected one of {', '.join(_AGGREGATIONS)}")
+        if len(self) == 0:
+            return UsageSeries(self.metric, *_columns([], []), step=step)
+
+        if numpy is not None:
+            buckets = self.timestamps - self.timestamps % step
+            starts = numpy.flatnonzero(numpy.diff(buckets, prepend=buckets[0] - 1))
+            if how == "mean":
+                counts = numpy.diff(numpy.append(starts, len(buckets)))
+                values = numpy.add.reduceat(self.values, starts) / counts
+            else:
+                ufunc = {"sum": numpy.add, "min": numpy.minimum, "max": numpy.maximum}[how]
+                values = ufunc.reduceat(self.values, starts)
+            return UsageSeries(self.metric, buckets[starts], values, step=step)
+
+        reduce = {"mean": statistics.fmean, "sum": sum, "min": min, "max": max}[how]
+        timestamps, values = [], []
+        pairs = zip(self.timestamps, self.values)
+        for bucket, group in itertools.groupby(pairs, key=lambda pair: pair[0] - pair[0] % step):
+            timestamps.append(bucket)
+            values.append(reduce([value for _, value in group]))
+        return UsageSeries(self.metric, *_columns(timestamps, values), step=step)
+
+    def rolling_mean(self, window: int) -> "UsageSeries":
+        """Mean over each run of ``window`` consecutive samples, labelled by the run's last timestamp."""
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if len(self) < window:
+            return UsageSeries(self.metric, *_columns([], []), step=self.step)
+
+        if numpy is not None:
+            sums = numpy.cumsum(numpy.concatenate(([0.0], self.values)))
+            values = (sums[window:] - sums[:-window]) / window
+            return UsageSeries(self.metric, self.timestamps[window - 1 :], values, step=self.step)
+
+        sums = list(itertools.accumulate(self.values, initial=0.0))
+        values = [(sums[i + window] - sums[i]) / window for i in range(len(self) - window + 1)]
+        return UsageSeries(self.metric, *_columns(self.timestamps[window - 1 :], values), step=self.step)
+
+    def percentiles(self, qs: Sequence[float]) -> List[float]:
+        """Value percentiles (0-100), linearly interpolated; NaN for an empty series."""
+        if len(self) == 0:
+            return [float("nan")] * len(qs)
+        if numpy is not None:
+            return [float(p) for p in numpy.percentile(self.values, qs)]
+        sorted_values = sorted(self.values)
+        return [_percentile(sorted_values, q) for q in qs]
+
+    def gaps(self, step: Optional[int] = None, tolerance: float = 1.5):
+        """(last timestamp before, first timestamp after) for every hole in the series.
+
+        A hole is a distance between neighbouring samples above ``tolerance``
+        times the step; the step defaults to the series' own step, or the
+        median sample distance when that is unknown.
+        """
+        if len(self) < 2:
+            return []
+        if numpy is not None:
+            deltas = numpy.diff(self.timestamps)
+            step = step or self.step or float(numpy.median(deltas))
+            holes = numpy.flatnonzero(deltas > step * tolerance)
+            return [(int(self.timestamps[i]), int(self.timestamps[i + 1])) for i in holes]
+
+        deltas = [b - a for a, b in zip(self.timestamps, self.timestamps[1:])]
+        step = step or self.step or statistics.median(deltas)
+        return [
+            (self.timestamps[i], self.timestamps[i + 1]) for i, delta in enumerate(deltas) if delta > step * tolerance
+        ]
+
+
+def _concatenate(parts):
+    first = parts[0]
+    if numpy is not None:
+        timestamps = numpy.concatenate([part.timestamps for part in parts])
+        values = numpy.concatenate([part.values for part in parts])
+        timestamps, first_index = numpy.unique(timestamps, return_index=True)
+        return UsageSeries(first.metric, timestamps, values[first_index], step=first.step)
+
+    points = {}
+    for part in parts:
+        for ts, value in zip(part.timestamps, part.values):
+            points.setdefault(ts, value)
+    return UsageSeries.from_points(first.metric, points.items(), first.step)
+
+
+def stitch_usage_columns(chunk_results):
+    """Join per-chunk lists of UsageSeries into one series per label set, dropping repeated timestamps."""
+    grouped = {}
+    for series_list in chunk_results:
+        for series in series_list:
+            grouped.setdefault(tuple(sorted(series.metric.items())), []).append(series)
+    return [_concatenate(parts) for parts in grouped.values()]
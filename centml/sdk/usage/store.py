@@ -0,0 +1,151 @@
+"""Local SQLite store of usage samples that only fetches what it has not seen.
+
+Samples are kept per deployment, metric and step in
+``<CENTML_CACHE_PATH>/usage.sqlite3``, together with the time ranges that
+were already fetched. A query reads stored samples and requests only the
+uncovered parts of its window from the API: normally just the points
+newer than the last refresh, plus any older gaps (backfill).
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+from centml.sdk.config import settings
+from centml.sdk.usage.chunks import fetch_usage_chunked
+from centml.sdk.usage.series import UsageSeries, stitch_usage_columns
+from centml.sdk.utils.ranges import merge_ranges, subtract_ranges
+
+# Samples older than this are deleted on the next query.
+DEFAULT_RETENTION_SECONDS = 90 * 24 * 60 * 60
+# The most recent samples may still change, so ranges reaching into this
+# window are fetched every time and never marked as covered.
+SETTLE_SECONDS = 5 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    deployment_id INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (deployment_id, metric, step, labels, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    deployment_id INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_key ON coverage (deployment_id, metric, step);
+"""
+
+
+def _metric_name(metric):
+    return getattr(metric, "value", metric)
+
+
+class UsageStore:
+    """Persistent usage samples with the fetched ranges they cover, trimmed to ``retention_seconds``."""
+
+    def __init__(self, path=None, retention_seconds=DEFAULT_RETENTION_SECONDS, settle_seconds=SETTLE_SECONDS):
+        self.path = path or os.path.join(settings.CENTML_CACHE_PATH, "usage.sqlite3")
+        self.retention_seconds = retention_seconds
+        self.settle_seconds = settle_seconds
+
+    @contextmanager
+    def _connect(self):
+        """Yield a connection inside one transaction; SQLite serializes concurrent writers across processes."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            with db:
+                db.executescript(_SCHEMA)
+                yield db
+
+    def coverage(self, deployment_id, metric, step):
+        """Inclusive (start, end) second ranges already fetched for this series."""
+        with self._connect() as db:
+            return self._coverage(db, deployment_id, _metric_name(metric), step)
+
+    @staticmethod
+    def _coverage(db, deployment_id, metric, step):
+        rows = db.execute(
+            "SELECT start_ts, end_ts FROM coverage WHERE deployment_id = ? AND metric = ? AND step = ?",
+            (deployment_id, metric, step),
+        )
+        return [tuple(row) for row in rows]
+
+    def _prune(self, db, now):
+        cutoff = now - self.retention_seconds
+        db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+        db.execute("DELETE FROM coverage WHERE end_ts < ?", (cutoff,))
+        db.execute("UPDATE coverage SET start_ts = ? WHERE start_ts < ?", (cutoff, cutoff))
+
+    def _plan(self, deployment_id, metric, step, start, end):
+        """Gaps of [start, end] to fetch, aligned to the step grid."""
+        with self._connect() as db:
+            covered = self._coverage(db, deployment_id, metric, step)
+        gaps = []
+        for gap_start, gap_end in subtract_ranges(start, end, covered):
+            gap_start = -(-gap_start // step) * step
+            gap_end -= gap_end % step
+            if gap_start <= gap_end:
+                gaps.append((gap_start, gap_end))
+        return gaps
+
+    def _save(self, db, deployment_id, metric, step, fetched):
+        rows = []
+        for series in fetched:
+            labels = json.dumps(series.metric, sort_keys=True)
+            rows.extend(
+                (deployment_id, metric, step, labels, int(ts), float(value))
+                for ts, value in zip(series.timestamps, series.values)
+            )
+        db.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def _cover(self, db, deployment_id, metric, step, ranges):
+        ranges = merge_ranges(self._coverage(db, deployment_id, metric, step) + ranges, adjacent=step)
+        key = (deployment_id, metric, step)
+        db.execute("DELETE FROM coverage WHERE deployment_id = ? AND metric = ? AND step = ?", key)
+        db.executemany("INSERT INTO coverage VALUES (?, ?, ?, ?, ?)", [key + r for r in ranges])
+
+    def _read(self, db, deployment_id, metric, step, start, end):  # pylint: disable=R0917
+        rows = db.execute(
+            "SELECT labels, ts, value FROM samples WHERE deployment_id = ? AND metric = ? AND step = ?"
+            " AND ts BETWEEN ? AND ? ORDER BY labels, ts",
+            (deployment_id, metric, step, start, end),
+        )
+        points = {}
+        for labels, ts, value in rows:
+            points.setdefault(labels, []).append((ts, value))
+        return [UsageSeries.from_points(json.loads(labels), series, step) for labels, series in points.items()]
+
+    def get_usage(self, fetch_chunk, deployment_id, metric, start, end, step, max_workers=4):  # pylint: disable=R0917
+        """Return UsageSeries for the inclusive window, fetching only the parts not stored yet.
+
+        ``fetch_chunk(chunk_start, chunk_end)`` requests one window from the
+        API and returns a list of UsageSeries; gaps too large for one request
+        are chunked and fetched concurrently.
+        """
+        metric = _metric_name(metric)
+        now = int(time.time())
+        settled_until = now - self.settle_seconds
+
+        fetched_ranges, fetched = [], []
+        for gap_start, gap_end in self._plan(deployment_id, metric, step, start, end):
+            fetched.extend(
+                fetch_usage_chunked(fetch_chunk, gap_start, gap_end, step, max_workers, stitch_usage_columns)
+            )
+            if gap_start <= settled_until:
+                fetched_ranges.append((gap_start, min(gap_end, settled_until)))
+
+        with self._connect() as db:
+            self._save(db, deployment_id, metric, step, fetched)
+            self._cover(db, deployment_id, metric, step, fetched_ranges)
+            usage = self._read(db, deployment_id, metric, step, start, end)
+            self._prune(db, now)
+        return usage
@@ -0,0 +1,141 @@
+import collections
+import queue
+import threading
+
+
+class BackgroundIterator:
+    """Iterate ``iterable`` on a daemon thread, keeping at most ``maxsize`` items buffered.
+
+    The producer blocks once the buffer is full, so memory stays bounded
+    however far ahead it could run. Exceptions raised by the iterable are
+    re-raised to the consumer, and ``close()`` (or exhausting the iterator)
+    lets the producer thread exit.
+    """
+
+    # How often a producer blocked on a full buffer checks whether it was closed.
+    _STOP_POLL_INTERVAL = 0.1
+
+    def __init__(self, iterable, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stopped = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, args=(iterable,), daemon=True)
+        self._thread.start()
+
+    def _put(self, entry):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(entry, timeout=self._STOP_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, iterable):
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not self._put((True, item)):
+                    return
+            self._put((False, None))
+        except Exception as e:  # pylint: disable=broad-except
+            self._put((False, e))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        has_item, value = self._queue.get()
+        if has_item:
+            return value
+        self.close()
+        if value is not None:
+            raise value
+        raise StopIteration
+
+    def close(self):
+        self._finished = True
+        self._stopped.set()
+
+
+class PooledIterator:
+    """Iterate ``iterable`` ahead of the consumer on a shared executor, keeping at most ``maxsize`` items buffered.
+
+    Unlike BackgroundIterator no thread is dedicated to the iterable: one
+    ``next()`` call at a time is submitted to ``executor``, so any number of
+    these iterators share the executor's workers. Exceptions raised by the
+    iterable are re-raised to the consumer after the items buffered before
+    them, and ``close()`` stops further work.
+    """
+
+    def __init__(self, iterable, executor, maxsize=1):
+        self._iterator = iter(iterable)
+        self._executor = executor
+        self._maxsize = maxsize
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        self._running = False
+        self._finished = False
+        self._closed = False
+        self._error = None
+        with self._condition:
+            self._schedule()
+
+    def _schedule(self):
+        # Called with the condition held.
+        if self._running or self._finished or self._closed or len(self._buffer) >= self._maxsize:
+            return
+        self._running = True
+        self._executor.submit(self._advance)
+
+    def _advance(self):
+        item, finished, error = None, False, None
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            finished = True
+        except Exception as e:  # pylint: disable=broad-except
+            finished, error = True, e
+        with self._condition:
+            self._running = False
+            if finished:
+                self._finished, self._error = True, error
+            else:
+                self._buffer.append(item)
+            if self._closed:
+                self._close_iterator()
+            self._schedule()
+            self._condition.notify_all()
+
+    def _close_iterator(self):
+        if hasattr(self._iterator, "close"):
+            self._iterator.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            while not self._buffer and not self._finished and not self._closed:
+                self._condition.wait()
+            if self._buffer:
+                item = self._buffer.popleft()
+                self._schedule()
+                return item
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        raise StopIteration
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._buffer.clear()
+            if not self._running:
+                self._close_iterator()
+            self._condition.notify_all()
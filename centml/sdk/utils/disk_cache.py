@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional, Tuple
+
+from centml.sdk.config import settings
+
+
+def _cache_file(name: str) -> str:
+    return os.path.join(settings.CENTML_CACHE_PATH, f"{name}.json")
+
+
+# Read a JSON cache entry written by write_cache. Returns (data, age in
+# seconds), or (None, None) when the entry is missing or unreadable; callers
+# decide themselves whether an old entry is still good enough to use.
+def read_cache(name: str) -> Tuple[Optional[Any], Optional[float]]:
+    path = _cache_file(name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        age = time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None, None
+    return data, max(age, 0.0)
+
+
+# Entries are written to a temp file and renamed into place so concurrent
+# readers (e.g. shell completion) never observe a half-written file.
+def write_cache(name: str, data: Any) -> None:
+    os.makedirs(settings.CENTML_CACHE_PATH, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.CENTML_CACHE_PATH, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, _cache_file(name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def invalidate_cache(name: str) -> None:
+    try:
+        os.unlink(_cache_file(name))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,26 @@
+def subtract_ranges(start, end, covered):
+    """Return the parts of the inclusive range [start, end] not covered by any of ``covered``."""
+    gaps = []
+    cursor = start
+    for seg_start, seg_end in sorted(covered):
+        if seg_end < cursor or seg_start > end:
+            continue
+        if seg_start > cursor:
+            gaps.append((cursor, seg_start - 1))
+        cursor = max(cursor, seg_end + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_ranges(ranges, adjacent=1):
+    """Merge inclusive ranges that overlap or are at most ``adjacent`` apart into sorted disjoint ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + adjacent:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
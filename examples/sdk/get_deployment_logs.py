@@ -1,32 +1,14 @@
 from datetime import datetime, timezone, timedelta
 
 from centml.sdk.api import get_centml_client
+from centml.sdk.logs import format_event
 
 # --- Configuration ---
 DEPLOYMENT_ID = 1234  # Replace with your deployment ID
-REVISION_NUMBER = 10
+REVISION_NUMBER = None  # None uses the deployment's current revision
 HOURS_BACK = 1  # Fetch logs from the last N hours
 
 
-def format_event(event: dict) -> str:
-    timestamp_ms = (
-        event.get("timestamp")
-        or event.get("time")
-        or event.get("ts")
-        or ""
-    )
-    message = (
-        event.get("message")
-        or event.get("msg")
-        or event.get("log")
-        or str(event)
-    )
-    if timestamp_ms:
-        ts = datetime.fromtimestamp(int(timestamp_ms) / 1000, tz=timezone.utc).isoformat()
-        return f"[{ts}] {message}"
-    return message
-
-
 def main():
     stream = True
     end_time = int(datetime.now(timezone.utc).timestamp() * 1000)
@@ -41,11 +23,12 @@ def main():
     print()
 
     with get_centml_client() as cclient:
+        revision_number = REVISION_NUMBER or cclient.get_current_revision_number(DEPLOYMENT_ID)
         if stream:
             # Streaming: print events as each page arrives
             for event in cclient.get_deployment_logs(
                 deployment_id=DEPLOYMENT_ID,
-                revision_number=REVISION_NUMBER,
+                revision_number=revision_number,
                 start_time=start_time,
                 end_time=end_time,
                 start_from_head=False,
@@ -56,7 +39,7 @@ def main():
             # Batch: collect all events then process
             events = cclient.get_deployment_logs(
                 deployment_id=DEPLOYMENT_ID,
-                revision_number=REVISION_NUMBER,
+                revision_number=revision_number,
                 start_time=start_time,
                 end_time=end_time,
                 start_from_head=False,
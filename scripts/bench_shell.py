@@ -0,0 +1,200 @@
+"""Measure shell session performance against a local stand-in for the terminal WebSocket.
+
+The server speaks the platform's terminal protocol. In ``exec`` mode it
+waits for the wrapped command on stdin, then streams ``--size-mb`` of
+output lines between the exec markers and closes the connection. In
+``latency`` mode it echoes stdin back, and an interactive session running
+in a child process (stdin and stdout are pipes) is timed per keystroke.
+In ``interactive`` mode the server floods such a session with output and
+the rate at which it reaches the child's stdout is measured.
+
+    python scripts/bench_shell.py exec --size-mb 200
+    python scripts/bench_shell.py exec --size-mb 50 --ansi
+    python scripts/bench_shell.py latency --keystrokes 2000
+    python scripts/bench_shell.py interactive --size-mb 100 --lines-per-message 1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+
+import websockets
+
+from centml.sdk.shell.session import BEGIN_MARKER, END_MARKER, exec_session, forward_io
+
+
+def _payload(line_length, lines_per_message, ansi):
+    text = "x" * max(1, line_length - 2)
+    if ansi:
+        text = f"\x1b[32m{text[:-9]}\x1b[0m"
+    return (text + "\r\n") * lines_per_message
+
+
+async def _serve_exec(ws, total_bytes, payload):
+    async for raw in ws:
+        if json.loads(raw).get("operation") == "stdin":
+            break
+    await ws.send(json.dumps({"data": f"prompt$ \r\n{BEGIN_MARKER}\r\n"}))
+    message = json.dumps({"data": payload})
+    sent = 0
+    while sent < total_bytes:
+        await ws.send(message)
+        sent += len(payload)
+    await ws.send(json.dumps({"data": f"\r\n{END_MARKER}:0\r\n"}))
+    await ws.close()
+    return sent
+
+
+async def bench_exec(size_mb, line_length, lines_per_message, ansi):
+    payload = _payload(line_length, lines_per_message, ansi)
+    total_bytes = int(size_mb * 1024 * 1024)
+    sent = []
+
+    async def _handler(ws):
+        sent.append(await _serve_exec(ws, total_bytes, payload))
+
+    async with websockets.serve(_handler, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            exit_code = await exec_session(f"ws://127.0.0.1:{port}", "token", "cat big-file")
+            elapsed = time.perf_counter() - started
+
+    megabytes = sent[0] / (1024 * 1024)
+    print(f"exec: {megabytes:.1f} MB in {elapsed:.2f}s = {megabytes / elapsed:.1f} MB/s (exit code {exit_code})")
+
+
+async def _serve_echo(ws):
+    async for raw in ws:
+        msg = json.loads(raw)
+        if msg.get("operation") == "stdin":
+            await ws.send(json.dumps({"data": msg["data"]}))
+
+
+async def run_client(ws_url):
+    """Child process side: an interactive session on this process' stdin and stdout."""
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        await forward_io(ws, [80, 24], asyncio.Event())
+
+
+async def _start_client(port):
+    return await asyncio.create_subprocess_exec(
+        sys.executable,
+        os.path.abspath(__file__),
+        "client",
+        f"ws://127.0.0.1:{port}",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+    )
+
+
+def _wakeups(pid):
+    """Voluntary context switches of a process so far, from /proc (None where unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("voluntary_ctxt_switches:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def bench_latency(keystrokes, idle_seconds):
+    async with websockets.serve(_serve_echo, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        proc = await _start_client(port)
+        # The first echo also waits for the child to start up and connect.
+        proc.stdin.write(b"!")
+        await proc.stdout.readexactly(1)
+
+        samples = []
+        for _ in range(keystrokes):
+            started = time.perf_counter()
+            proc.stdin.write(b"k")
+            await proc.stdin.drain()
+            await proc.stdout.readexactly(1)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        wakeups_before = _wakeups(proc.pid)
+        await asyncio.sleep(idle_seconds)
+        wakeups_after = _wakeups(proc.pid)
+
+        proc.stdin.close()
+        await proc.wait()
+
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"latency: {keystrokes} keystrokes, median {statistics.median(samples):.3f} ms, "
+        f"p99 {p99:.3f} ms, max {samples[-1]:.3f} ms"
+    )
+    if wakeups_before is not None:
+        print(f"idle: {wakeups_after - wakeups_before} wakeups in {idle_seconds:g}s")
+
+
+async def bench_interactive(size_mb, line_length, lines_per_message):
+    payload = _payload(line_length, lines_per_message, ansi=False)
+    total_bytes = int(size_mb * 1024 * 1024)
+
+    async def _flood(ws):
+        await ws.recv()
+        message = json.dumps({"data": payload})
+        sent = 0
+        while sent < total_bytes:
+            await ws.send(message)
+            sent += len(payload)
+        await ws.close()
+
+    async with websockets.serve(_flood, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        proc = await _start_client(port)
+        # Output starts once the session has connected and sent its first input.
+        proc.stdin.write(b"!")
+        received = len(await proc.stdout.read(65536))
+        started = time.perf_counter()
+        while chunk := await proc.stdout.read(1024 * 1024):
+            received += len(chunk)
+        elapsed = time.perf_counter() - started
+        await proc.wait()
+
+    megabytes = received / (1024 * 1024)
+    print(f"interactive: {megabytes:.1f} MB in {elapsed:.2f}s = {megabytes / elapsed:.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    modes = parser.add_subparsers(dest="mode", required=True)
+    exec_parser = modes.add_parser("exec", help="throughput of exec_session output parsing")
+    exec_parser.add_argument("--size-mb", type=float, default=100)
+    exec_parser.add_argument("--line-length", type=int, default=120)
+    exec_parser.add_argument("--lines-per-message", type=int, default=256)
+    exec_parser.add_argument("--ansi", action="store_true", help="color every line, forcing escape handling")
+    latency_parser = modes.add_parser("latency", help="keystroke round trip through an interactive session")
+    latency_parser.add_argument("--keystrokes", type=int, default=1000)
+    latency_parser.add_argument("--idle-seconds", type=float, default=3, help="idle time to count wakeups over")
+    interactive_parser = modes.add_parser("interactive", help="output throughput of an interactive session")
+    interactive_parser.add_argument("--size-mb", type=float, default=100)
+    interactive_parser.add_argument("--line-length", type=int, default=120)
+    interactive_parser.add_argument("--lines-per-message", type=int, default=1)
+    client_parser = modes.add_parser("client", help=argparse.SUPPRESS)
+    client_parser.add_argument("ws_url")
+    args = parser.parse_args()
+
+    if args.mode == "exec":
+        asyncio.run(bench_exec(args.size_mb, args.line_length, args.lines_per_message, args.ansi))
+    elif args.mode == "latency":
+        asyncio.run(bench_latency(args.keystrokes, args.idle_seconds))
+    elif args.mode == "interactive":
+        asyncio.run(bench_interactive(args.size_mb, args.line_length, args.lines_per_message))
+    else:
+        asyncio.run(run_client(args.ws_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Tests for centml.cli.completion -- cached shell completion."""
+
+import os
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from centml.cli import completion
+from centml.sdk import DeploymentStatus, DeploymentType
+from centml.sdk.utils.disk_cache import read_cache, write_cache
+
+
+@pytest.fixture(name="cache_dir", autouse=True)
+def fixture_cache_dir(tmp_path):
+    with patch("centml.sdk.utils.disk_cache.settings") as disk_settings, patch(
+        "centml.cli.completion.settings"
+    ) as completion_settings:
+        disk_settings.CENTML_CACHE_PATH = str(tmp_path)
+        completion_settings.CENTML_CACHE_PATH = str(tmp_path)
+        yield tmp_path
+
+
+@pytest.fixture(name="popen")
+def fixture_popen():
+    with patch("centml.cli.completion.subprocess.Popen") as mock_popen:
+        yield mock_popen
+
+
+def _age(cache_dir, name, seconds):
+    path = os.path.join(cache_dir, f"{name}.json")
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_completes_deployment_ids_from_fresh_cache(popen):
+    write_cache("deployments", [{"id": 12, "name": "llama"}, {"id": 34, "name": "qwen"}, {"id": 15, "name": "x"}])
+
+    items = completion.complete_deployment(None, None, "1")
+
+    assert [(i.value, i.help) for i in items] == [("12", "llama"), ("15", "x")]
+    popen.assert_not_called()
+
+
+def test_stale_cache_is_served_and_refreshed_once(cache_dir, popen):
+    write_cache("deployments", [{"id": 12, "name": "llama"}])
+    _age(cache_dir, "deployments", completion.DEPLOYMENTS_TTL + 1)
+
+    assert [i.value for i in completion.complete_deployment(None, None, "")] == ["12"]
+    assert [i.value for i in completion.complete_deployment(None, None, "")] == ["12"]
+
+    popen.assert_called_once()
+    assert popen.call_args[0][0][-1] == "deployments"
+
+
+def test_missing_cache_returns_nothing_and_refreshes(popen):
+    assert not completion.complete_deployment(None, None, "")
+    popen.assert_called_once()
+
+
+def test_completes_pods_for_deployment_in_context(popen):
+    write_cache("pods-7", ["pod-a", "pod-b", "other"])
+    ctx = SimpleNamespace(params={"deployment_id": 7})
+
+    assert [i.value for i in completion.complete_pod_name(ctx, None, "pod")] == ["pod-a", "pod-b"]
+    popen.assert_not_called()
+
+
+def test_refresh_pods_writes_cache_and_releases_lock(cache_dir):
+    client = MagicMock()
+    context = MagicMock()
+    context.__enter__.return_value = client
+    with open(os.path.join(cache_dir, ".pods-7.refresh"), "w", encoding="utf-8"):
+        pass
+
+    with patch("centml.cli.completion.get_centml_client", return_value=context), patch(
+        "centml.cli.completion.get_running_pods", return_value=["pod-a"]
+    ):
+        completion.main("pods-7", "7")
+
+    assert read_cache("pods-7")[0] == ["pod-a"]
+    assert not os.path.exists(os.path.join(cache_dir, ".pods-7.refresh"))
+
+
+def test_store_deployments_records_ids_and_names():
+    deployment = SimpleNamespace(
+        id=5,
+        name="web",
+        type=DeploymentType.COMPUTE_V2,
+        status=DeploymentStatus.ACTIVE,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+    completion.store_deployments([deployment])
+
+    assert read_cache("deployments")[0] == [{"id": 5, "name": "web", "type": "compute_v2", "status": "active"}]
@@ -0,0 +1,129 @@
+"""Tests for centml.cli.logs."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from centml.cli.logs import logs, parse_time
+
+NOW = 1_700_000_000_000
+
+
+class TestParseTime:
+    def test_durations(self):
+        assert parse_time("30s", NOW) == NOW - 30_000
+        assert parse_time("2h", NOW) == NOW - 2 * 3_600_000
+        assert parse_time("1d", NOW) == NOW - 86_400_000
+
+    def test_iso_timestamp_defaults_to_utc(self):
+        assert parse_time("1970-01-01T00:00:01", NOW) == 1000
+        assert parse_time("1970-01-01T01:00:00+01:00", NOW) == 0
+
+    def test_epoch_milliseconds(self):
+        assert parse_time("1234", NOW) == 1234
+
+    def test_rejects_garbage(self):
+        with pytest.raises(click.BadParameter):
+            parse_time("yesterday", NOW)
+
+
+@contextmanager
+def _patch_client():
+    client = MagicMock()
+    context = MagicMock()
+    context.__enter__.return_value = client
+    context.__exit__.return_value = False
+    with patch("centml.cli.logs.get_centml_client", return_value=context), patch(
+        "centml.cli.logs.now_ms", return_value=NOW
+    ):
+        yield client
+
+
+def test_logs_uses_current_revision_and_prefetch():
+    with _patch_client() as client:
+        client.get_current_revision_number.return_value = 4
+        client.get_deployment_logs.return_value = iter([{"timestamp": 0, "message": "hello"}])
+
+        result = CliRunner().invoke(logs, ["12", "--since", "1h"])
+
+    assert result.exit_code == 0
+    assert "hello" in result.output
+    client.get_deployment_logs.assert_called_once_with(
+        12, 4, NOW - 3_600_000, NOW, stream=True, prefetch=2, adaptive_line_count=True, cache=False
+    )
+
+
+def test_logs_ndjson_output():
+    event = {"timestamp": 5, "message": "hello"}
+    with _patch_client() as client:
+        client.get_deployment_logs.return_value = iter([event])
+
+        result = CliRunner().invoke(logs, ["12", "--revision", "1", "-o", "ndjson"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output.strip()) == event
+    client.get_current_revision_number.assert_not_called()
+
+
+def test_follow_rejects_until():
+    result = CliRunner().invoke(logs, ["12", "--follow", "--until", "5m"])
+
+    assert result.exit_code != 0
+    assert "--until" in result.output
+
+
+def test_logs_grep_with_field_projection():
+    events = [
+        {"timestamp": 0, "message": "INFO ready", "pod": "a"},
+        {"timestamp": 1, "message": "ERROR oom", "pod": "b"},
+        {"timestamp": 2, "message": "ERROR oom again", "pod": "c"},
+    ]
+    with _patch_client() as client:
+        client.get_deployment_logs.return_value = iter(events)
+        result = CliRunner().invoke(
+            logs, ["12", "--revision", "1", "-e", "oom", "--field", "pod", "--field", "message", "--max-matches", "1"]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "b\tERROR oom\n"
+
+
+def test_logs_count():
+    events = [{"timestamp": 0, "message": "INFO a"}, {"timestamp": 61_000, "message": "ERROR b"}]
+    with _patch_client() as client:
+        client.get_deployment_logs.return_value = iter(events)
+        result = CliRunner().invoke(logs, ["12", "--revision", "1", "--count"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == [
+        "2 events",
+        "  INFO       1",
+        "  ERROR      1",
+        "1970-01-01 00:00  1",
+        "1970-01-01 00:01  1",
+    ]
+
+
+def test_logs_merges_several_sources():
+    with _patch_client() as client:
+        client.get_current_revision_number.return_value = 9
+        client.get_merged_deployment_logs.return_value = iter(
+            [{"timestamp": 0, "message": "hi", "source": {"deployment_id": 12, "revision_number": 3}}]
+        )
+        result = CliRunner().invoke(logs, ["12:3", "15", "--since", "1h"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "12:3 [1970-01-01T00:00:00+00:00] hi\n"
+    args, kwargs = client.get_merged_deployment_logs.call_args
+    assert args == ([(12, 3), (15, 9)], NOW - 3_600_000, NOW)
+    assert kwargs["stream"] is True
+
+
+def test_logs_rejects_follow_with_several_sources():
+    with _patch_client():
+        result = CliRunner().invoke(logs, ["12", "15", "--follow"])
+    assert result.exit_code == 2
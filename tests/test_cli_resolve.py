@@ -0,0 +1,93 @@
+"""Tests for centml.cli.resolve -- deployment name arguments."""
+
+from unittest.mock import patch
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from centml.cli.resolve import DEPLOYMENT, DEPLOYMENTS, resolve_deployment_name
+from centml.sdk.utils.disk_cache import write_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path):
+    with patch("centml.sdk.utils.disk_cache.settings") as disk_settings:
+        disk_settings.CENTML_CACHE_PATH = str(tmp_path)
+        yield tmp_path
+
+
+@pytest.fixture(name="refresh")
+def fixture_refresh():
+    with patch("centml.cli.resolve.refresh_deployments") as mock_refresh:
+        yield mock_refresh
+
+
+@click.command()
+@click.argument("deployment_id", type=DEPLOYMENT)
+def _echo_id(deployment_id):
+    click.echo(repr(deployment_id))
+
+
+def test_numeric_values_are_ids_without_lookup(refresh):
+    result = CliRunner().invoke(_echo_id, ["42"])
+
+    assert result.output.strip() == "42"
+    refresh.assert_not_called()
+
+
+def test_name_resolved_from_cached_index(refresh):
+    write_cache("deployments", [{"id": 7, "name": "web", "status": "active"}])
+
+    result = CliRunner().invoke(_echo_id, ["web"])
+
+    assert result.output.strip() == "7"
+    refresh.assert_not_called()
+
+
+def test_unknown_name_refreshes_index_once(refresh):
+    write_cache("deployments", [{"id": 7, "name": "web", "status": "active"}])
+    refresh.side_effect = lambda: write_cache("deployments", [{"id": 8, "name": "new", "status": "active"}])
+
+    assert resolve_deployment_name("new") == 8
+    refresh.assert_called_once()
+
+
+def test_missing_name_fails(refresh):
+    result = CliRunner().invoke(_echo_id, ["nope"])
+
+    assert result.exit_code != 0
+    assert "No deployment named 'nope'" in result.output
+
+
+def test_live_deployment_preferred_over_deleted(refresh):
+    write_cache(
+        "deployments", [{"id": 1, "name": "web", "status": "deleted"}, {"id": 2, "name": "web", "status": "active"}]
+    )
+
+    assert resolve_deployment_name("web") == 2
+    refresh.assert_not_called()
+
+
+def test_ambiguous_live_names_are_rejected(refresh):
+    write_cache(
+        "deployments", [{"id": 1, "name": "web", "status": "paused"}, {"id": 2, "name": "web", "status": "active"}]
+    )
+
+    with pytest.raises(click.UsageError, match="ambiguous"):
+        resolve_deployment_name("web")
+
+
+def test_deployment_list_mixes_ids_and_names(refresh):
+    write_cache("deployments", [{"id": 7, "name": "web", "status": "active"}])
+
+    assert DEPLOYMENTS.convert("3, web,", None, None) == (3, 7)
+    refresh.assert_not_called()
+
+
+def test_deployment_list_completes_last_entry(refresh):
+    write_cache("deployments", [{"id": 7, "name": "web", "status": "active"}])
+
+    items = DEPLOYMENTS.shell_complete(None, None, "3,w")
+
+    assert [item.value for item in items] == ["3,web"]
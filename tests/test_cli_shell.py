@@ -1,8 +1,10 @@
 """Tests for centml.cli.shell -- thin Click command wrappers."""
 
+import asyncio
+import tempfile
 from contextlib import ExitStack, contextmanager
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 def _mock_client_ctx():
@@ -19,10 +21,12 @@ def _patch_deps(*, pods=None, tty=True):
 
     If *pods* is provided, ``get_running_pods`` is also patched with that
     return value.  Yields a namespace exposing the mock objects that tests
-    most often assert against.
+    most often assert against.  The running-pod cache lives in a fresh
+    temporary directory.
     """
     with ExitStack() as stack:
         e = stack.enter_context
+        e(patch("centml.sdk.utils.disk_cache.settings")).CENTML_CACHE_PATH = e(tempfile.TemporaryDirectory())
         e(patch("centml.cli.shell.get_centml_client", new_callable=_mock_client_ctx))
         if pods is not None:
             e(patch("centml.cli.shell.get_running_pods", return_value=pods))
@@ -34,6 +38,10 @@ def _patch_deps(*, pods=None, tty=True):
             build_ws_url=e(patch("centml.cli.shell.build_ws_url")),
             interactive_session=e(patch("centml.cli.shell.interactive_session", new_callable=MagicMock)),
             exec_session=e(patch("centml.cli.shell.exec_session", new_callable=MagicMock)),
+            exec_binary_session=e(patch("centml.cli.shell.exec_binary_session", new_callable=MagicMock)),
+            copy_to_pod=e(patch("centml.cli.shell.copy_to_pod", new_callable=MagicMock)),
+            copy_from_pod=e(patch("centml.cli.shell.copy_from_pod", new_callable=MagicMock)),
+            sync_to_pod=e(patch("centml.cli.shell.sync_to_pod", new_callable=MagicMock)),
         )
         ns.auth.get_centml_token.return_value = "token"
         ns.settings.CENTML_PLATFORM_API_URL = "https://api.centml.com"
@@ -196,3 +204,311 @@ class TestExecCommand:
             assert "Select a pod" not in result.output
             m.build_ws_url.assert_called_once()
             assert "pod-a" in m.build_ws_url.call_args[0]
+
+    def test_batch_reads_commands_from_stdin(self):
+        from centml.cli.shell import exec_cmd
+        from click.testing import CliRunner
+
+        with (
+            _patch_deps(pods=["pod-a"]) as m,
+            patch("centml.cli.shell._exec_batch", new_callable=MagicMock) as exec_batch,
+        ):
+            result = CliRunner().invoke(exec_cmd, ["123", "--batch", "-"], input="uptime\n\n# gpus\nnvidia-smi\n")
+            assert result.exit_code == 0
+            exec_batch.assert_called_once_with("wss://test/ws", "token", ["uptime", "nvidia-smi"], False)
+            m.exec_session.assert_not_called()
+
+    def test_binary_mode_reports_throughput(self):
+        from centml.cli.shell import exec_cmd
+        from centml.sdk.shell import TransferStats
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.return_value = (0, TransferStats(bytes=3 * 1024**2, seconds=2.0))
+            result = CliRunner().invoke(exec_cmd, ["123", "--binary", "--", "tar", "cz", "/data"])
+
+            m.exec_binary_session.assert_called_once_with("wss://test/ws", "token", "tar cz /data")
+            m.exec_session.assert_not_called()
+            assert "3.0 MB in 2.0s (1.5 MB/s)" in result.output
+            m.sys.exit.assert_called_once_with(0)
+
+    def test_binary_mode_takes_a_single_target(self):
+        from centml.cli.shell import exec_cmd
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]):
+            assert CliRunner().invoke(exec_cmd, ["1,2", "--binary", "--", "cat", "f"]).exit_code == 2
+
+    def test_batch_and_command_are_exclusive(self):
+        from centml.cli.shell import exec_cmd
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]):
+            assert CliRunner().invoke(exec_cmd, ["123"]).exit_code == 2
+            assert CliRunner().invoke(exec_cmd, ["123", "--batch", "-", "--", "ls"], input="ls\n").exit_code == 2
+
+
+class TestExecBatch:
+    def _run(self, exit_codes, fail_fast):
+        from centml.cli.shell import _exec_batch
+        from centml.sdk.shell import ExecResult
+
+        session = MagicMock()
+        session.run = AsyncMock(side_effect=[ExecResult(f"cmd{i}", "", code) for i, code in enumerate(exit_codes)])
+        with patch("centml.cli.shell.ExecSession") as exec_session_cls:
+            exec_session_cls.return_value.__aenter__ = AsyncMock(return_value=session)
+            exec_session_cls.return_value.__aexit__ = AsyncMock(return_value=False)
+            commands = [f"cmd{i}" for i in range(len(exit_codes))]
+            exit_code = asyncio.run(_exec_batch("wss://test/ws", "token", commands, fail_fast))
+        return exit_code, [call.args[0] for call in session.run.call_args_list]
+
+    def test_runs_all_commands_and_returns_first_failure(self):
+        assert self._run([0, 2, 5], fail_fast=False) == (2, ["cmd0", "cmd1", "cmd2"])
+
+    def test_fail_fast_stops_at_first_failure(self):
+        assert self._run([0, 2, 5], fail_fast=True) == (2, ["cmd0", "cmd1"])
+
+
+class TestRunningPodCache:
+    def test_repeated_connects_reuse_the_pod_list(self):
+        from centml.cli.shell import _connect_args
+
+        with _patch_deps() as m, patch("centml.cli.shell.get_running_pods", return_value=["pod-a"]) as lookup:
+            assert _connect_args(123, None, None) == ("wss://test/ws", "token")
+            assert _connect_args(123, None, None) == ("wss://test/ws", "token")
+
+        lookup.assert_called_once()
+        assert m.auth.get_centml_token.call_count == 2
+
+    def test_token_is_fetched_once_and_used_for_the_lookup(self):
+        from centml.cli.shell import _connect_args
+
+        with _patch_deps(pods=["pod-a"]) as m, patch("centml.cli.shell.get_centml_client") as client:
+            client.return_value.__enter__.return_value = MagicMock()
+            _connect_args(123, None, None)
+
+        m.auth.get_centml_token.assert_called_once()
+        client.assert_called_once_with("token")
+
+    def test_expired_list_is_looked_up_again(self):
+        from centml.cli.shell import _connect_args
+
+        with (
+            _patch_deps(),
+            patch("centml.cli.shell.get_running_pods", return_value=["pod-a"]) as lookup,
+            patch("centml.cli.shell.RUNNING_PODS_TTL", -1),
+        ):
+            _connect_args(123, None, None)
+            _connect_args(123, None, None)
+
+        assert lookup.call_count == 2
+
+    def test_pod_missing_from_cached_list_is_looked_up(self):
+        from centml.cli.shell import _connect_args
+
+        with (
+            _patch_deps() as m,
+            patch("centml.cli.shell.get_running_pods", side_effect=[["pod-a"], ["pod-a", "pod-b"]]),
+        ):
+            _connect_args(123, None, None)
+            _connect_args(123, "pod-b", None)
+
+        assert m.build_ws_url.call_args.args[2] == "pod-b"
+
+    def test_connection_failure_forgets_the_list(self):
+        from centml.cli.shell import _connect_args, exec_cmd
+        from click.testing import CliRunner
+
+        with _patch_deps() as m, patch("centml.cli.shell.get_running_pods", return_value=["pod-a"]) as lookup:
+            _connect_args(123, None, None)
+            m.asyncio.run.side_effect = ConnectionRefusedError("refused")
+            result = CliRunner().invoke(exec_cmd, ["123", "--", "ls"])
+            assert result.exit_code != 0
+            _connect_args(123, None, None)
+
+        assert lookup.call_count == 2
+
+
+class TestExecFanout:
+    def test_all_pods_targets_every_running_pod(self):
+        from centml.cli.shell import exec_cmd
+        from click.testing import CliRunner
+
+        pods = {1: ["web-a", "web-b"], 2: ["gpu-x", "gpu-y"], 3: []}
+        with (
+            _patch_deps() as m,
+            patch("centml.cli.shell.get_running_pods", side_effect=lambda _, d: pods[d]),
+            patch("centml.cli.shell._exec_fanout", new_callable=MagicMock) as exec_fanout,
+        ):
+            m.asyncio.run.return_value = [("1/web-a", 0), ("1/web-b", 2)]
+            result = CliRunner().invoke(exec_cmd, ["1,2,3", "--all-pods", "--parallel", "3", "--", "df", "-h"])
+
+        targets, token, command, _, parallel, _ = exec_fanout.call_args.args
+        assert targets == [(1, "web-a"), (1, "web-b"), (2, "gpu-x"), (2, "gpu-y")]
+        assert (token, command, parallel) == ("token", "df -h", 3)
+        assert "No running pods found for deployment 3" in result.output
+        assert "1/web-b: exit code 2" in result.output and "1/2 succeeded" in result.output
+        m.sys.exit.assert_called_once_with(2)
+
+    def test_several_deployments_use_first_pod_each(self):
+        from centml.cli.shell import _fanout_targets
+
+        pods = {1: ["web-a", "web-b"], 2: ["gpu-x"]}
+        with _patch_deps(), patch("centml.cli.shell.get_running_pods", side_effect=lambda _, d: pods[d]):
+            assert _fanout_targets((1, 2), False, "token") == [(1, "web-a"), (2, "gpu-x")]
+
+    def test_pod_option_is_rejected(self):
+        from centml.cli.shell import exec_cmd
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["web-a"]):
+            result = CliRunner().invoke(exec_cmd, ["1", "--all-pods", "--pod", "web-a", "--", "ls"])
+            assert result.exit_code == 2
+
+    def _fanout(self, targets, exit_codes, parallel=2, output_dir=None):
+        from centml.cli.shell import _exec_fanout
+
+        running = []
+        peak = []
+
+        async def _exec_session(ws_url, token, command, write):
+            running.append(ws_url)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            write(f"out of {ws_url}\r\nsecond\r\n")
+            write("\r\n")
+            running.remove(ws_url)
+            if isinstance(exit_codes[ws_url], Exception):
+                raise exit_codes[ws_url]
+            return exit_codes[ws_url]
+
+        with (
+            patch("centml.cli.shell.exec_session", new=_exec_session),
+            patch("centml.cli.shell.build_ws_url", side_effect=lambda _, d, pod, __: f"{d}:{pod}"),
+            patch("centml.cli.shell.settings"),
+        ):
+            results = asyncio.run(_exec_fanout(targets, "token", "ls", None, parallel, output_dir))
+        return results, max(peak)
+
+    def test_runs_concurrently_up_to_the_cap_with_prefixed_lines(self, capsys):
+        targets = [(1, "a"), (1, "b"), (1, "c")]
+        results, peak = self._fanout(targets, {"1:a": 0, "1:b": 4, "1:c": OSError("refused")})
+
+        assert results == [("a", 0), ("b", 4), ("c", 1)]
+        assert peak == 2
+        captured = capsys.readouterr()
+        assert "[a] out of 1:a\r\n[a] second\r\n" in captured.out
+        assert "[a] \r\n" not in captured.out
+        assert "[c] refused" in captured.err
+
+    def test_output_dir_gets_one_file_per_pod(self, tmp_path):
+        results, _ = self._fanout([(1, "a"), (2, "b")], {"1:a": 0, "2:b": 0}, output_dir=str(tmp_path))
+
+        assert results == [("1/a", 0), ("2/b", 0)]
+        assert (tmp_path / "2-b.log").read_text(encoding="utf-8") == "out of 2:b\nsecond\n\n"
+
+
+# ===========================================================================
+# cp -- file transfer
+# ===========================================================================
+
+
+class TestCpCommand:
+    def test_split_remote_path(self, tmp_path):
+        from centml.cli.shell import split_remote_path
+
+        local = tmp_path / "a:b"
+        local.write_text("x", encoding="utf-8")
+        assert split_remote_path("my-llm:/data/ckpt") == ("my-llm", "/data/ckpt")
+        assert split_remote_path("123:") == ("123", ".")
+        assert split_remote_path("./dir/file") is None
+        assert split_remote_path("dir/a:b") is None
+        assert split_remote_path(str(local)) is None
+
+    def test_upload(self, tmp_path):
+        from centml.cli.shell import cp
+        from centml.sdk.shell import TransferStats
+        from click.testing import CliRunner
+
+        source = tmp_path / "config.yaml"
+        source.write_text("a: 1\n", encoding="utf-8")
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.return_value = TransferStats(bytes=1024**2, seconds=0.5)
+            result = CliRunner().invoke(cp, [str(source), "123:/etc/app/"])
+
+            assert result.exit_code == 0, result.output
+            m.copy_to_pod.assert_called_once_with("wss://test/ws", "token", str(source), "/etc/app/")
+            m.copy_from_pod.assert_not_called()
+            assert "1.0 MB in 0.5s (2.0 MB/s)" in result.output
+
+    def test_download(self):
+        from centml.cli.shell import cp
+        from centml.sdk.shell import TransferStats
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.return_value = TransferStats()
+            result = CliRunner().invoke(cp, ["123:/data/ckpt", "."])
+
+            assert result.exit_code == 0, result.output
+            m.copy_from_pod.assert_called_once_with("wss://test/ws", "token", "/data/ckpt", ".")
+
+    def test_exactly_one_side_is_remote(self):
+        from centml.cli.shell import cp
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            assert CliRunner().invoke(cp, ["1:/a", "2:/b"]).exit_code == 2
+            assert CliRunner().invoke(cp, [".", "/tmp"]).exit_code == 2
+            m.asyncio.run.assert_not_called()
+
+    def test_transfer_failure_is_reported(self, tmp_path):
+        from centml.cli.shell import cp
+        from centml.sdk.shell import ShellError
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.side_effect = ShellError("Copying x failed: disk full")
+            result = CliRunner().invoke(cp, [str(tmp_path), "123:/data"])
+
+            assert result.exit_code == 1
+            assert "disk full" in result.output
+
+
+class TestSyncCommand:
+    def test_sync_reports_what_changed(self, tmp_path):
+        from centml.cli.shell import sync
+        from centml.sdk.shell import SyncResult
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.return_value = SyncResult(
+                new=["a.py"], changed=["b.py"], unchanged=7, total_bytes=3 * 1024**2, sent_bytes=2048
+            )
+            result = CliRunner().invoke(sync, [str(tmp_path), "123:~/app", "--exclude", ".git", "--delete"])
+
+            assert result.exit_code == 0, result.output
+            m.sync_to_pod.assert_called_once_with(
+                "wss://test/ws", "token", str(tmp_path), "~/app", (".git",), True, False
+            )
+            assert "1 new, 1 changed, 0 deleted, 7 unchanged; sent 2.0 KB of 3.0 MB" in result.output
+
+    def test_dry_run_lists_paths(self, tmp_path):
+        from centml.cli.shell import sync
+        from centml.sdk.shell import SyncResult
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            m.asyncio.run.return_value = SyncResult(new=["a.py"], deleted=["old.py"])
+            result = CliRunner().invoke(sync, [str(tmp_path), "123:/app", "--dry-run"])
+
+            assert "+ a.py" in result.output and "- old.py" in result.output
+            assert "would send 0 B of 0 B" in result.output
+
+    def test_destination_must_be_remote(self, tmp_path):
+        from centml.cli.shell import sync
+        from click.testing import CliRunner
+
+        with _patch_deps(pods=["pod-a"]) as m:
+            assert CliRunner().invoke(sync, [str(tmp_path), str(tmp_path)]).exit_code == 2
+            m.asyncio.run.assert_not_called()
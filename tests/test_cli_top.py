@@ -0,0 +1,82 @@
+"""Tests for centml.cli.top."""
+
+import math
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from centml.cli.top import METRICS, diff_frame, format_table, top
+from centml.sdk import DeploymentStatus
+from centml.sdk.usage import UsageMatrix
+
+
+def _render(*frames):
+    """Apply diff_frame output to a 5-line screen, understanding only the cursor moves and erases it emits."""
+    screen = [[" "] * 40 for _ in range(5)]
+    previous = []
+    for frame in frames:
+        for row, col, erase, text in re.findall(r"\x1b\[(\d+);(\d+)H(\x1b\[K)?([^\x1b]*)", diff_frame(previous, frame)):
+            line, col = screen[int(row) - 1], int(col) - 1
+            if erase:
+                line[col:] = [" "] * (40 - col)
+            line[col : col + len(text)] = text
+        previous = frame
+    return ["".join(line).rstrip() for line in screen]
+
+
+def test_diff_frame_only_writes_changed_cells():
+    assert diff_frame(["abc", "def"], ["abc", "def"]) == ""
+    assert diff_frame(["gpu 10.0 x"], ["gpu 12.5 x"]) == "\x1b[1;6H2.5"
+
+
+def test_diff_frame_reproduces_frames():
+    frames = (["header", "a  1.0", "b  2.0"], ["header", "b  30.0", "a"], ["head", "b  30.5"])
+    assert _render(*frames) == ["head", "b  30.5", "", "", ""]
+    assert _render(frames[0], frames[1]) == ["header", "b  30.0", "a", "", ""]
+
+
+def test_format_table_sorts_hottest_first():
+    rows = [
+        {"id": 1, "name": "idle", "gpu": 5.0, "gpu_memory": 1e9, "cpu": 0.1, "memory": 2e9, "cost": 1.5},
+        {"id": 2, "name": "hot", "gpu": 95.0, "gpu_memory": 7e10, "cpu": 3.0, "memory": 8e9, "cost": 4.0},
+        {
+            "id": 3,
+            "name": "new",
+            "gpu": math.nan,
+            "gpu_memory": math.nan,
+            "cpu": math.nan,
+            "memory": math.nan,
+            "cost": math.nan,
+        },
+    ]
+
+    lines = format_table(rows, "gpu")
+
+    assert [line.split()[1] for line in lines[2:]] == ["hot", "idle", "new"]
+    assert "70.0G" in lines[2] and lines[4].split()[2:] == ["-"] * 5
+    assert [line.split()[1] for line in format_table(rows, "cost", limit=1)[2:]] == ["hot"]
+
+
+def test_top_once_prints_table():
+    client = MagicMock()
+    client.get_hardware_instances.return_value = [SimpleNamespace(id=7, cost_per_hr=250)]
+    client.get.return_value = [
+        SimpleNamespace(id=1, name="llm", status=DeploymentStatus.ACTIVE, hardware_instance_id=7),
+        SimpleNamespace(id=2, name="old", status=DeploymentStatus.PAUSED, hardware_instance_id=7),
+    ]
+    client.collect_deployment_usage.return_value = UsageMatrix(
+        [1], list(METRICS), [0, 60], [[[42.0, math.nan], [1.0, 2.0], [0.5, 0.5], [3.0, 4.0]]]
+    )
+    context = MagicMock()
+    context.__enter__.return_value = client
+
+    with patch("centml.cli.top.get_centml_client", return_value=context):
+        result = CliRunner().invoke(top, ["--once"])
+
+    assert result.exit_code == 0, result.output
+    assert "1 active deployments" in result.output
+    assert ["1", "llm", "42.0", "2.0", "0.5", "4.0", "2.5"] in [line.split() for line in result.output.splitlines()]
+    args, kwargs = client.collect_deployment_usage.call_args
+    assert args[0] == [1] and kwargs["cache"] is not None
@@ -0,0 +1,180 @@
+"""Tests for the CentML agent daemon and its client proxy."""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from centml.sdk import ApiException
+from centml.sdk.agent import AgentError, connect_agent
+from centml.sdk.agent.server import AgentServer
+from centml.sdk.config import settings
+from centml.sdk.logs.follow import follow_logs
+
+
+class _FakeClient:
+    def __init__(self):
+        self.cluster_calls = 0
+        self.follow_polls = 0
+        self.follow_stop = None
+
+    def get_clusters(self):
+        self.cluster_calls += 1
+        return ["cluster-a"]
+
+    def get_status(self, id):
+        return {"id": id}
+
+    def get_deployment_logs(self, deployment_id, count):
+        return iter({"n": i} for i in range(count))
+
+    def pause(self, id):
+        raise ApiException(status=404, reason="Not Found")
+
+    def resume(self, id):
+        raise RuntimeError("boom")
+
+    def get_deployment_usage(self, id, cache=False):
+        if cache:
+            raise ValueError("cache=True requires columnar=True")
+        raise json.JSONDecodeError("bad", "{", 0)
+
+    def get_cluster_id(self, name):
+        raise KeyError(name)
+
+    def follow_deployment_logs(self, deployment_id, stop=None):
+        def _fetch_window(start_time, end_time):
+            self.follow_polls += 1
+            # One event, then a quiet stream.
+            return [{"timestamp": 1, "message": "hello"}]
+
+        self.follow_stop = stop
+        return follow_logs(_fetch_window, 0, poll_interval=0.01, stop=stop)
+
+
+@pytest.fixture(name="agent_server")
+def fixture_agent_server():
+    # Unix socket paths are limited to ~100 bytes, so avoid pytest's long tmp_path.
+    socket_dir = tempfile.mkdtemp(prefix="centml-agent-")
+    socket_path = os.path.join(socket_dir, "agent.sock")
+    with patch("centml.sdk.agent.server.auth.get_centml_token", return_value="token"):
+        server = AgentServer(socket_path)
+        server.client = _FakeClient()
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        try:
+            yield server
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def test_connect_agent_returns_none_without_socket(tmp_path):
+    assert connect_agent(str(tmp_path / "missing.sock")) is None
+    assert connect_agent("") is None
+
+
+def test_socket_is_owner_only(agent_server):
+    assert os.stat(agent_server.socket_path).st_mode & 0o077 == 0
+
+
+def test_forwards_method_calls(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    assert client.get_status(7) == {"id": 7}
+
+
+def test_streams_iterator_results(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    events = client.get_deployment_logs(1, count=1200)
+
+    assert not isinstance(events, list)
+    assert [e["n"] for e in events] == list(range(1200))
+
+
+def test_caches_catalog_calls(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    assert client.get_clusters() == ["cluster-a"]
+    assert client.get_clusters() == ["cluster-a"]
+    assert agent_server.client.cluster_calls == 1
+
+    client.request("reset")
+    client.get_clusters()
+    assert agent_server.client.cluster_calls == 2
+
+
+def test_reraises_api_exceptions(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    with pytest.raises(ApiException) as exc_info:
+        client.pause(1)
+    assert exc_info.value.status == 404
+
+
+def test_wraps_other_exceptions(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    with pytest.raises(AgentError, match="boom"):
+        client.resume(1)
+
+
+def test_reraises_builtin_exceptions_as_the_same_type(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    with pytest.raises(ValueError, match="requires columnar"):
+        client.get_deployment_usage(1, cache=True)
+    with pytest.raises(KeyError) as exc_info:
+        client.get_cluster_id("gpu")
+    assert exc_info.value.args == ("gpu",)
+    with pytest.raises(ValueError, match="JSONDecodeError"):
+        client.get_deployment_usage(1)
+
+
+def test_serves_cached_token(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    assert client.get_centml_token() == "token"
+
+
+def test_streams_empty_iterators(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    assert not list(client.get_deployment_logs(1, count=0))
+
+
+def test_stops_following_when_the_client_disconnects(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    events = client.follow_deployment_logs(1)
+    assert next(events)["message"] == "hello"
+    events.close()
+
+    assert agent_server.client.follow_stop.wait(5)
+    polls = agent_server.client.follow_polls
+    time.sleep(0.1)
+    assert agent_server.client.follow_polls <= polls + 1
+
+
+def test_reports_its_identity(agent_server):
+    client = connect_agent(agent_server.socket_path)
+
+    assert client.pid == os.getpid()
+    assert client.request("ping")["api_url"] == settings.CENTML_PLATFORM_API_URL
+
+
+def test_ignores_agent_with_other_identity(agent_server):
+    with patch.object(settings, "CENTML_PLATFORM_API_URL", "https://other.example.com"):
+        assert connect_agent(agent_server.socket_path) is None
+        assert connect_agent(agent_server.socket_path, match_identity=False) is not None
+
+    with patch.multiple(settings, CENTML_SERVICE_ACCOUNT_ID="sa-other", CENTML_SERVICE_ACCOUNT_SECRET="secret"):
+        assert connect_agent(agent_server.socket_path) is None
@@ -0,0 +1,404 @@
+"""Tests for centml.sdk.logs and the log methods of CentMLClient."""
+
+import itertools
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from centml.sdk import ApiException
+from centml.sdk.api import CentMLClient
+from centml.sdk.logs import (
+    EventFilter,
+    aggregate_events,
+    event_level,
+    event_timestamp,
+    filter_events,
+    follow_logs,
+    format_event,
+    iter_log_pages,
+    iter_sharded_events,
+    iter_source_events,
+    merge_events,
+    split_time_range,
+)
+
+
+def _page(events, token=None):
+    return SimpleNamespace(events=events, next_page_token=token)
+
+
+def _paged_api(pages):
+    """Mock generated API returning *pages* in order, keyed by next_page_token."""
+    api = MagicMock()
+    by_token = {None: pages[0]}
+    for i, page in enumerate(pages[:-1]):
+        by_token[page.next_page_token] = pages[i + 1]
+
+    def _get(**kwargs):
+        return by_token[kwargs["next_page_token"]]
+
+    api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.side_effect = _get
+    return api
+
+
+class TestEvents:
+    def test_timestamp_from_alternative_keys(self):
+        assert event_timestamp({"timestamp": 5}) == 5
+        assert event_timestamp({"ts": "7"}) == 7
+        assert event_timestamp({"message": "x"}) is None
+
+    def test_format_event(self):
+        assert format_event({"timestamp": 0, "message": "hi"}) == "[1970-01-01T00:00:00+00:00] hi"
+        assert format_event({"log": "plain"}) == "plain"
+
+
+class TestIterLogPages:
+    @pytest.mark.parametrize("prefetch", [False, True])
+    def test_follows_page_tokens(self, prefetch):
+        pages = {None: _page([1], "a"), "a": _page([2], "b"), "b": _page([3])}
+        tokens = []
+
+        def _fetch(token, line_count):
+            tokens.append(token)
+            return pages[token]
+
+        result = [e for page in iter_log_pages(_fetch, prefetch=prefetch) for e in page.events]
+
+        assert result == [1, 2, 3]
+        assert tokens == [None, "a", "b"]
+
+    def test_prefetch_requests_next_page_before_current_is_consumed(self):
+        second_requested = threading.Event()
+
+        def _fetch(token, line_count):
+            if token is None:
+                return _page([1], "a")
+            second_requested.set()
+            return _page([2])
+
+        pages = iter_log_pages(_fetch, prefetch=True)
+        next(pages)
+        assert second_requested.wait(timeout=5)
+        assert next(pages).events == [2]
+
+    def test_prefetch_depth_reads_several_pages_ahead(self):
+        requested = []
+        all_requested = threading.Event()
+
+        def _fetch(token, line_count):
+            index = 0 if token is None else int(token)
+            requested.append(index)
+            if index == 3:
+                all_requested.set()
+                return _page([index])
+            return _page([index], str(index + 1))
+
+        pages = iter_log_pages(_fetch, prefetch=3)
+        assert next(pages).events == [0]
+        # Pages 1-2 are buffered and page 3 is in flight while page 0 is being consumed.
+        assert all_requested.wait(timeout=5)
+        assert [p.events[0] for p in pages] == [1, 2, 3]
+
+    def test_adaptive_line_count_grows_while_pages_are_full(self):
+        sizes = []
+
+        def _fetch(token, line_count):
+            sizes.append(line_count)
+            index = 0 if token is None else int(token)
+            return _page(list(range(line_count)), str(index + 1) if index < 4 else None)
+
+        list(iter_log_pages(_fetch, line_count=100, adaptive=True, max_line_count=500))
+
+        assert sizes == [100, 200, 400, 500, 500]
+
+    def test_adaptive_line_count_stops_at_server_cap(self):
+        sizes = []
+
+        def _fetch(token, line_count):
+            sizes.append(line_count)
+            index = 0 if token is None else int(token)
+            return _page(list(range(min(line_count, 150))), str(index + 1) if index < 4 else None)
+
+        list(iter_log_pages(_fetch, line_count=100, adaptive=True))
+
+        assert sizes == [100, 200, 200, 150, 300]
+
+    def test_adaptive_line_count_recovers_after_sparse_page(self):
+        sizes = []
+        returned = [100, 50, 0, 200, 400, 800]
+
+        def _fetch(token, line_count):
+            sizes.append(line_count)
+            index = 0 if token is None else int(token)
+            count = min(line_count, returned[index])
+            return _page(list(range(count)), str(index + 1) if index < len(returned) - 1 else None)
+
+        list(iter_log_pages(_fetch, line_count=100, adaptive=True))
+
+        # Two short pages fall back to the requested size, never below it, and dense pages grow it again.
+        assert sizes == [100, 200, 200, 100, 200, 400]
+
+
+class TestGetDeploymentLogs:
+    def test_returns_all_events_across_pages(self):
+        api = _paged_api([_page([{"message": "a"}], "t1"), _page([{"message": "b"}])])
+
+        events = CentMLClient(api).get_deployment_logs(1, 2, 0, 10)
+
+        assert events == [{"message": "a"}, {"message": "b"}]
+
+    def test_current_revision_number_is_highest(self):
+        api = MagicMock()
+        api.get_deployment_revisions_deployments_revisions_deployment_id_get.return_value = SimpleNamespace(
+            results=[SimpleNamespace(revision_number=2), SimpleNamespace(revision_number=5)]
+        )
+
+        assert CentMLClient(api).get_current_revision_number(1) == 5
+
+
+class TestFollowLogs:
+    def test_skips_events_repeated_at_poll_boundary(self):
+        windows = [
+            [{"timestamp": 1, "message": "a"}, {"timestamp": 2, "message": "b"}],
+            # The next window starts at ts=2 (inclusive) and repeats "b".
+            [{"timestamp": 2, "message": "b"}, {"timestamp": 2, "message": "c"}, {"timestamp": 3, "message": "d"}],
+            [{"timestamp": 3, "message": "d"}],
+            [{"timestamp": 3, "message": "d"}, {"timestamp": 4, "message": "e"}],
+        ]
+        requested = []
+
+        def _fetch(start, end):
+            requested.append(start)
+            return windows[len(requested) - 1]
+
+        stream = follow_logs(_fetch, 0, sleep=lambda _: None, clock=lambda: 100)
+        messages = [next(stream)["message"] for _ in range(5)]
+
+        assert messages == ["a", "b", "c", "d", "e"]
+        assert requested == [0, 2, 3, 3]
+
+    def test_events_without_timestamp_are_emitted_once(self):
+        windows = [
+            [{"message": "boot"}, {"timestamp": 1, "message": "a"}],
+            [{"message": "boot"}, {"timestamp": 1, "message": "a"}],
+            [{"message": "boot"}, {"message": "ready"}, {"timestamp": 2, "message": "b"}],
+        ]
+        calls = iter(windows)
+
+        stream = follow_logs(lambda start, end: next(calls), 0, sleep=lambda _: None, clock=lambda: 100)
+        messages = [next(stream)["message"] for _ in range(4)]
+
+        assert messages == ["boot", "a", "ready", "b"]
+
+    def test_only_remembers_events_without_timestamp_from_the_previous_poll(self):
+        windows = [
+            [{"message": "boot"}, {"message": "boot"}],
+            [{"message": "boot"}],
+            [{"timestamp": 1, "message": "a"}],
+            [{"message": "boot"}],
+        ]
+        calls = iter(windows)
+
+        stream = follow_logs(lambda start, end: next(calls), 0, sleep=lambda _: None, clock=lambda: 100)
+        messages = [next(stream)["message"] for _ in range(3)]
+
+        assert messages == ["boot", "a", "boot"]
+
+    def test_stops_polling_once_stop_is_set(self):
+        stop = threading.Event()
+        requested = []
+
+        def _fetch(start, end):
+            requested.append(start)
+            stop.set()
+            return [{"timestamp": 1, "message": "a"}]
+
+        stream = follow_logs(_fetch, 0, clock=lambda: 100, stop=stop)
+
+        assert [e["message"] for e in stream] == ["a"]
+        assert requested == [0]
+
+    def test_client_retries_a_poll_with_a_new_token_after_401(self):
+        api = MagicMock()
+        api.api_client.configuration.access_token = "expired"
+        pages = [
+            _page([{"timestamp": 1, "message": "a"}], "t1"),
+            ApiException(status=401, reason="Unauthorized"),
+            _page([{"timestamp": 1, "message": "a"}], "t1"),
+            _page([{"timestamp": 2, "message": "b"}]),
+        ]
+
+        def _get(**kwargs):
+            page = pages.pop(0)
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.side_effect = _get
+        client = CentMLClient(api, get_token=lambda: "fresh")
+
+        stream = client.follow_deployment_logs(1, 2, 0)
+        messages = [next(stream)["message"] for _ in range(2)]
+
+        assert messages == ["a", "b"]
+        assert api.api_client.configuration.access_token == "fresh"
+
+
+class TestShardedLogs:
+    def test_split_time_range_is_disjoint_and_complete(self):
+        shards = split_time_range(0, 99, 3)
+
+        assert shards[0][0] == 0 and shards[-1][1] == 99
+        assert all(shards[i][1] + 1 == shards[i + 1][0] for i in range(len(shards) - 1))
+        assert split_time_range(5, 6, 10) == [(5, 5), (6, 6)]
+
+    def test_merge_events_orders_by_timestamp(self):
+        merged = merge_events([iter([{"ts": 1}, {"ts": 4}]), iter([{"ts": 2}, {"ts": 3}])])
+
+        assert [e["ts"] for e in merged] == [1, 2, 3, 4]
+
+    def test_sharded_fetch_returns_every_event_in_order(self):
+        # Two pages per shard: one event at the shard start, one at its end.
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def _fetch(start, end, token, line_count):
+            with lock:
+                in_flight.append(1)
+                max_in_flight.append(len(in_flight))
+            try:
+                if token is None:
+                    return _page([{"timestamp": start}], "next")
+                return _page([{"timestamp": end}])
+            finally:
+                with lock:
+                    in_flight.pop()
+
+        events = list(iter_sharded_events(_fetch, 0, 999, shards=8, max_workers=3))
+
+        timestamps = [e["timestamp"] for e in events]
+        assert timestamps == sorted(timestamps)
+        assert len(timestamps) == 16
+        assert max(max_in_flight) <= 3
+
+    def test_thread_count_is_bounded_by_max_workers(self):
+        fetching_threads = set()
+        lock = threading.Lock()
+
+        def _fetch(start, end, token, line_count):
+            with lock:
+                fetching_threads.add(threading.current_thread().name)
+            return _page([{"timestamp": start}])
+
+        before = threading.active_count()
+        stream = iter_sharded_events(_fetch, 0, 999, shards=50, max_workers=3)
+        first = next(stream)
+        running = threading.active_count() - before
+        rest = list(stream)
+
+        assert first["timestamp"] == 0 and len(rest) == 49
+        assert running <= 3 and len(fetching_threads) <= 3
+
+    def test_worker_errors_reach_the_consumer(self):
+        def _fetch(start, end, token, line_count):
+            raise RuntimeError("api down")
+
+        with pytest.raises(RuntimeError, match="api down"):
+            list(iter_sharded_events(_fetch, 0, 100, shards=2))
+
+    def test_client_sharded_mode_queries_each_shard_from_head(self):
+        api = MagicMock()
+        api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.side_effect = (
+            lambda **kw: _page([{"timestamp": kw["start_time"]}])
+        )
+
+        events = CentMLClient(api).get_deployment_logs(1, 2, 0, 99, start_from_head=False, shards=4)
+
+        assert [e["timestamp"] for e in events] == [0, 25, 50, 75]
+        calls = api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.call_args_list
+        assert all(c.kwargs["start_from_head"] for c in calls)
+
+
+class TestMergedSources:
+    def test_sources_are_merged_in_order_and_tagged(self):
+        api = MagicMock()
+        logs = {
+            (1, 1): [_page([{"timestamp": 10, "message": "old"}], "p2"), _page([{"timestamp": 40, "message": "old"}])],
+            (1, 2): [_page([{"timestamp": 20, "message": "new"}, {"timestamp": 30, "message": "new"}])],
+            (7, 3): [_page([{"timestamp": 5, "message": "router"}])],
+        }
+
+        def _get(**kw):
+            pages = logs[(kw["deployment_id"], kw["revision_number"])]
+            return pages[1] if kw["next_page_token"] else pages[0]
+
+        api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.side_effect = _get
+
+        events = CentMLClient(api).get_merged_deployment_logs([(1, 1), (1, 2), (7, 3)], 0, 100)
+
+        assert [e["timestamp"] for e in events] == [5, 10, 20, 30, 40]
+        assert [(e["source"]["deployment_id"], e["source"]["revision_number"]) for e in events] == [
+            (7, 3),
+            (1, 1),
+            (1, 2),
+            (1, 2),
+            (1, 1),
+        ]
+
+    def test_iter_source_events_yields_source_pairs(self):
+        pairs = list(iter_source_events(lambda source, token, n: _page([{"ts": source * 10}]), [3, 1, 2]))
+        assert pairs == [(1, {"ts": 10}), (2, {"ts": 20}), (3, {"ts": 30})]
+
+
+class TestFilters:
+    EVENTS = [
+        {"timestamp": 0, "message": "INFO: server started"},
+        {"timestamp": 30_000, "message": "WARNING: slow request /v1/chat"},
+        {"timestamp": 61_000, "message": "ERROR: CUDA out of memory", "kubernetes": {"pod_name": "p-1"}},
+        {"timestamp": 62_000, "level": "debug", "message": "heartbeat"},
+        {"timestamp": 125_000, "message": "no level here"},
+    ]
+
+    def test_event_level(self):
+        assert [event_level(e) for e in self.EVENTS] == ["INFO", "WARNING", "ERROR", "DEBUG", None]
+        assert event_level({"message": "[warn] disk almost full"}) == "WARNING"
+
+    def test_patterns_are_combined(self):
+        matched = list(filter_events(self.EVENTS, ["cuda", "^INFO"], ignore_case=True))
+        assert [e["timestamp"] for e in matched] == [0, 61_000]
+        inverted = list(filter_events(self.EVENTS, ["cuda", "^INFO"], ignore_case=True, invert=True))
+        assert [e["timestamp"] for e in inverted] == [30_000, 62_000, 125_000]
+
+    def test_min_level(self):
+        assert [e["timestamp"] for e in filter_events(self.EVENTS, min_level="warn")] == [30_000, 61_000]
+        with pytest.raises(ValueError):
+            EventFilter(min_level="loud")
+
+    def test_field_projection(self):
+        projected = list(filter_events(self.EVENTS, ["CUDA"], fields=["timestamp", "kubernetes.pod_name", "missing"]))
+        assert projected == [{"timestamp": 61_000, "kubernetes.pod_name": "p-1", "missing": None}]
+
+    def test_max_matches_stops_upstream(self):
+        pulled = []
+
+        def source():
+            for i in itertools.count():
+                pulled.append(i)
+                yield {"timestamp": i, "message": "ERROR boom" if i % 2 else "INFO ok"}
+
+        upstream = source()
+        matched = list(filter_events(upstream, ["boom"], max_matches=3))
+
+        assert [e["timestamp"] for e in matched] == [1, 3, 5]
+        assert pulled == list(range(6))
+        with pytest.raises(StopIteration):
+            next(upstream)
+
+    def test_aggregate(self):
+        stats = aggregate_events(self.EVENTS)
+        assert stats.total == 5
+        assert stats.by_level == {"INFO": 1, "WARNING": 1, "ERROR": 1, "DEBUG": 1, "UNKNOWN": 1}
+        assert stats.histogram() == [(0, 2), (60_000, 2), (120_000, 1)]
@@ -0,0 +1,98 @@
+"""Tests for centml.sdk.logs.export -- streaming compressed NDJSON export."""
+
+import gzip
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from centml.cli.logs import export_logs, parse_size
+from centml.sdk.logs import export
+from centml.sdk.logs.export import export_events, export_path
+
+
+def _events(count, step_ms=1000):
+    return ({"timestamp": i * step_ms, "message": f"line {i}"} for i in range(count))
+
+
+def _read_gzip(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_gzip_roundtrip(tmp_path):
+    stats = export_events(_events(1000), str(tmp_path / "out.ndjson.gz"))
+
+    assert stats.events == 1000
+    assert stats.files == [str(tmp_path / "out.ndjson.gz")]
+    assert _read_gzip(stats.files[0]) == list(_events(1000))
+    assert stats.bytes_written == (tmp_path / "out.ndjson.gz").stat().st_size
+
+
+def test_uncompressed_export(tmp_path):
+    stats = export_events(_events(3), str(tmp_path / "out"), compression="none")
+
+    assert stats.files == [str(tmp_path / "out.ndjson")]
+    assert (tmp_path / "out.ndjson").read_text().splitlines()[0] == '{"timestamp":0,"message":"line 0"}'
+
+
+def test_rotate_by_event_time(tmp_path):
+    # 10 minutes of events, one file per 3 minutes of log time
+    stats = export_events(_events(600), str(tmp_path / "out.ndjson.gz"), rotate_seconds=180)
+
+    assert [p.rsplit("/", 1)[1] for p in stats.files] == [f"out.{n:05d}.ndjson.gz" for n in range(1, 5)]
+    parts = [_read_gzip(p) for p in stats.files]
+    assert [len(p) for p in parts] == [180, 180, 180, 60]
+    assert [e for p in parts for e in p] == list(_events(600))
+
+
+def test_rotate_by_size(tmp_path):
+    rng = random.Random(0)
+    events = [{"timestamp": i, "message": "%032x" % rng.getrandbits(128)} for i in range(20_000)]
+
+    with patch.object(export, "WRITE_BATCH_BYTES", 4096):
+        stats = export_events(iter(events), str(tmp_path / "out.ndjson.gz"), rotate_bytes=64 * 1024)
+
+    assert len(stats.files) > 1
+    assert [e for p in stats.files for e in _read_gzip(p)] == events
+    assert stats.bytes_written == sum((tmp_path / p.rsplit("/", 1)[1]).stat().st_size for p in stats.files)
+
+
+def test_progress_reported(tmp_path):
+    reports = []
+    export_events(_events(10), str(tmp_path / "out.ndjson.gz"), progress=lambda s: reports.append(s.events))
+    assert reports[-1] == 10
+
+
+def test_errors(tmp_path):
+    with pytest.raises(ValueError):
+        export_events([], str(tmp_path / "out"), compression="bz2")
+    with patch.object(export, "zstandard", None):
+        with pytest.raises(RuntimeError, match="zstandard"):
+            export_events([], str(tmp_path / "out"), compression="zstd")
+
+
+def test_export_path():
+    assert export_path("logs", "gzip") == "logs.ndjson.gz"
+    assert export_path("logs.ndjson.gz", "gzip", 3) == "logs.00003.ndjson.gz"
+    assert parse_size("500M") == 500 * 1024**2
+    assert parse_size("1024") == 1024
+
+
+def test_export_logs_command(tmp_path):
+    with patch("centml.cli.logs.get_centml_client") as get_client:
+        cclient = get_client.return_value.__enter__.return_value
+        cclient.get_current_revision_number.return_value = 2
+        cclient.get_deployment_logs.return_value = _events(5)
+
+        result = CliRunner().invoke(
+            export_logs, ["42", str(tmp_path / "out.ndjson.gz"), "--since", "1h", "--shards", "4"]
+        )
+
+    assert result.exit_code == 0, result.output
+    args, kwargs = cclient.get_deployment_logs.call_args
+    assert args[:2] == (42, 2)
+    assert kwargs["stream"] is True and kwargs["shards"] == 4
+    assert _read_gzip(tmp_path / "out.ndjson.gz") == list(_events(5))
@@ -0,0 +1,108 @@
+"""Tests for centml.sdk.logs.store -- the on-disk log segment cache."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from centml.sdk.api import CentMLClient
+from centml.sdk.logs.store import LogSegmentStore, subtract_ranges
+
+NOW = 10_000_000
+
+
+@pytest.fixture(autouse=True)
+def frozen_now():
+    with patch("centml.sdk.logs.store.now_ms", return_value=NOW):
+        yield
+
+
+class _Api:
+    """Fake log window source: one event per 100 ms, recording requested windows."""
+
+    def __init__(self):
+        self.windows = []
+
+    def __call__(self, start, end):
+        self.windows.append((start, end))
+        first = -(-start // 100) * 100
+        return iter({"timestamp": ts, "message": f"e{ts}"} for ts in range(first, end + 1, 100))
+
+
+def test_subtract_ranges():
+    assert subtract_ranges(0, 99, []) == [(0, 99)]
+    assert subtract_ranges(0, 99, [(10, 19), (50, 59)]) == [(0, 9), (20, 49), (60, 99)]
+    assert not subtract_ranges(0, 99, [(0, 49), (40, 120)])
+    assert subtract_ranges(20, 30, [(0, 10), (40, 50)]) == [(20, 30)]
+
+
+def test_second_query_fetches_only_gaps(tmp_path):
+    store = LogSegmentStore(str(tmp_path))
+    api = _Api()
+
+    first = list(store.iter_events(api, 1, 2, 1000, 1999))
+    second = list(store.iter_events(api, 1, 2, 500, 2499))
+
+    assert [e["timestamp"] for e in first] == list(range(1000, 2000, 100))
+    assert [e["timestamp"] for e in second] == list(range(500, 2500, 100))
+    assert api.windows == [(1000, 1999), (500, 999), (2000, 2499)]
+
+    assert list(store.iter_events(api, 1, 2, 600, 2200)) == [e for e in second if 600 <= e["timestamp"] <= 2200]
+    assert len(api.windows) == 3
+
+
+def test_recent_logs_are_not_cached(tmp_path):
+    store = LogSegmentStore(str(tmp_path), settle_ms=1000)
+    api = _Api()
+
+    list(store.iter_events(api, 1, 2, NOW - 3000, NOW))
+    list(store.iter_events(api, 1, 2, NOW - 3000, NOW))
+
+    settled = NOW - 1000
+    assert api.windows == [(NOW - 3000, settled), (settled + 1, NOW), (settled + 1, NOW)]
+
+
+def test_abandoned_fetch_is_not_stored(tmp_path):
+    store = LogSegmentStore(str(tmp_path))
+    api = _Api()
+
+    events = store.iter_events(api, 1, 2, 0, 999)
+    next(events)
+    events.close()
+
+    assert store.segments(1, 2) == []
+    list(store.iter_events(api, 1, 2, 0, 999))
+    assert api.windows == [(0, 999), (0, 999)]
+
+
+def test_evicts_least_recently_used_segments(tmp_path):
+    store = LogSegmentStore(str(tmp_path))
+    api = _Api()
+    list(store.iter_events(api, 1, 2, 0, 999))
+    list(store.iter_events(api, 1, 2, 1000, 1999))
+    # Touch the first segment so the second one becomes the eviction candidate.
+    list(store.iter_events(api, 1, 2, 0, 999))
+
+    sizes = sum(s["bytes"] for s in store.segments(1, 2))
+    store.max_bytes = sizes - 1
+    list(store.iter_events(api, 1, 3, 0, 99))
+
+    remaining = [(s["revision"], s["start"]) for s in store.segments(1, 2) + store.segments(1, 3)]
+    assert remaining == [(2, 0), (3, 0)]
+    assert not os.path.exists(os.path.join(str(tmp_path), "1", "2", "1000-1999.ndjson.gz"))
+
+
+def test_client_cache_option_uses_store(tmp_path):
+    api = MagicMock()
+    api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.side_effect = (
+        lambda **kw: SimpleNamespace(events=[{"timestamp": kw["start_time"]}], next_page_token=None)
+    )
+    client = CentMLClient(api)
+    store = LogSegmentStore(str(tmp_path))
+
+    first = client.get_deployment_logs(1, 2, 0, 99, cache=store)
+    second = client.get_deployment_logs(1, 2, 0, 99, cache=store)
+
+    assert first == second == [{"timestamp": 0}]
+    api.get_deployment_logs_v3_deployments_logs_v3_deployment_id_revision_number_get.assert_called_once()
@@ -1,19 +1,21 @@
-"""Tests for _pyte_extract_text in centml.sdk.shell.session."""
+"""Tests for strip_escapes in centml.sdk.shell.session."""
 
-import pyte
+from centml.sdk.shell.session import END_MARKER, _parse_exit_code, strip_escapes
 
-from centml.sdk.shell.session import _pyte_extract_text
 
-
-class TestPyteExtractText:
+class TestStripEscapes:
     def test_strips_ansi(self):
-        screen = pyte.Screen(80, 1)
-        stream = pyte.Stream(screen)
-        result = _pyte_extract_text(stream, screen, "\x1b[32mhello\x1b[0m")
-        assert result == "hello"
+        assert strip_escapes("\x1b[32mhello\x1b[0m") == "hello"
 
     def test_plain_text(self):
-        screen = pyte.Screen(80, 1)
-        stream = pyte.Stream(screen)
-        result = _pyte_extract_text(stream, screen, "plain text")
-        assert result == "plain text"
+        assert strip_escapes("plain text") == "plain text"
+
+    def test_strips_osc_charset_and_control_sequences(self):
+        text = "\x1b]0;user@pod: ~\x07\x1b(B\x1b[?2004lready\x1b[K\r"
+        assert strip_escapes(text) == "ready"
+
+    def test_independent_of_terminal_width(self):
+        line = "x" * 5000 + f"\x1b[0m{END_MARKER}:7"
+        clean = strip_escapes(line)
+        assert clean.endswith(f"{END_MARKER}:7")
+        assert _parse_exit_code(clean) == 7
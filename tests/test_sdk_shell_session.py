@@ -1,6 +1,7 @@
 """Tests for centml.sdk.shell.session -- WebSocket session logic."""
 
 import asyncio
+import base64
 import io
 import json
 import os
@@ -13,10 +14,15 @@ import pytest
 
 from platform_api_python_client import PodStatus, PodDetails, RevisionPodDetails
 
+from centml.sdk.shell.exceptions import ShellError
 from centml.sdk.shell.session import (
     BEGIN_MARKER,
     END_MARKER,
+    STDERR_MARKER,
+    ExecSession,
+    _ExecOutputParser,
     build_ws_url,
+    exec_binary_session,
     exec_session,
     forward_io,
     interactive_session,
@@ -241,7 +247,7 @@ class TestExecSession:
         assert "output line" in output
 
     def test_handles_ansi_around_markers(self):
-        """Markers wrapped in ANSI codes are still detected via pyte."""
+        """Markers wrapped in ANSI codes are still detected."""
         ws = AsyncMock()
         # Markers surrounded by ANSI color codes.
         data = f"\x1b[32m{BEGIN_MARKER}\x1b[0m\noutput\n\x1b[32m{END_MARKER}:0\x1b[0m\n"
@@ -269,6 +275,151 @@ class TestExecSession:
         assert "output" in output
 
 
+class TestExecOutputParser:
+    def _feed(self, chunks):
+        captured = []
+        with patch("centml.sdk.shell.session.sys") as mock_sys:
+            mock_sys.stdout.write = captured.append
+            parser = _ExecOutputParser()
+            for chunk in chunks:
+                parser.feed(chunk)
+            parser.finish()
+        return parser, "".join(captured)
+
+    def test_lines_split_across_chunks(self):
+        data = f"noise\r\n{BEGIN_MARKER}\r\nfirst line\r\nsecond line\r\n{END_MARKER}:3\r\nafter\r\n"
+        parser, output = self._feed([data[i : i + 7] for i in range(0, len(data), 7)])
+
+        assert output == "first line\r\nsecond line\r\n"
+        assert parser.is_done and parser.exit_code == 3
+
+    def test_marker_after_line_wider_than_terminal(self):
+        wide = "y" * 10_000
+        parser, output = self._feed(
+            [f"{BEGIN_MARKER}\r\n{wide}\r\n\x1b[1mbold\x1b[0m\r\n{wide}", f"\x1b[32m{END_MARKER}:5\x1b[0m\r\n"]
+        )
+
+        assert output == f"{wide}\r\n\x1b[1mbold\x1b[0m\r\n"
+        assert parser.is_done and parser.exit_code == 5
+
+
+class TestExecBinarySession:
+    def _run(self, messages):
+        ws = AsyncMock()
+        ws.__aiter__ = MagicMock(return_value=_async_iter_from_list([json.dumps({"data": m}) for m in messages]))
+        ws.recv = AsyncMock(side_effect=_ws_lib.ConnectionClosed(None, None))
+        written, stderr = [], io.BytesIO()
+
+        async def _write(data):
+            written.append(data)
+
+        with (
+            patch("centml.sdk.shell.session.websockets") as mock_ws_mod,
+            patch("centml.sdk.shell.session.sys") as mock_sys,
+        ):
+            mock_ws_mod.connect = MagicMock(
+                return_value=AsyncMock(__aenter__=AsyncMock(return_value=ws), __aexit__=AsyncMock(return_value=False))
+            )
+            mock_ws_mod.ConnectionClosed = _ws_lib.ConnectionClosed
+            mock_sys.stderr.buffer = stderr
+            exit_code, stats = asyncio.run(exec_binary_session("wss://test/ws", "fake-token", "cat blob", write=_write))
+        return exit_code, stats, written, stderr.getvalue(), ws
+
+    def test_output_is_byte_exact(self):
+        blob = bytes(range(256)) * 300
+        encoded = base64.b64encode(blob).decode()
+        lines = [encoded[i : i + 16384] for i in range(0, len(encoded), 16384)]
+        data = f"prompt$ \r\n{BEGIN_MARKER}\r\n" + "\r\n".join(lines) + "\r\n"
+        # Split mid-line, as the terminal does.
+        messages = [data[:1000], data[1000:30000], data[30000:], f"\r\n{STDERR_MARKER}\r\n\r\n{END_MARKER}:0\r\n"]
+
+        exit_code, stats, written, stderr, ws = self._run(messages)
+
+        assert exit_code == 0
+        assert b"".join(written) == blob
+        assert stats.bytes == len(blob)
+        assert stderr == b""
+        wrapped = json.loads(ws.send.call_args_list[-1].args[0])["data"]
+        assert "( cat blob ) </dev/null" in wrapped and "| base64" in wrapped
+
+    def test_stderr_and_exit_code_follow_the_output(self):
+        stdout, err = base64.b64encode(b"\x00\xff").decode(), base64.b64encode(b"warning\n").decode()
+        messages = [f"{BEGIN_MARKER}\r\n{stdout}\r\n{STDERR_MARKER}\r\n{err}\r\n\r\n{END_MARKER}:3\r\n"]
+
+        exit_code, _, written, stderr, _ = self._run(messages)
+
+        assert (exit_code, b"".join(written), stderr) == (3, b"\x00\xff", b"warning\n")
+
+    def test_missing_end_marker_fails(self):
+        exit_code, _, _, _, _ = self._run([f"{BEGIN_MARKER}\r\nAAAA\r\n"])
+
+        assert exit_code == 1
+
+
+# ===========================================================================
+# ExecSession -- several commands over one shell
+# ===========================================================================
+
+
+def _framed(n, output, exit_code):
+    """Terminal output of the n-th ExecSession command, as the shell prints it."""
+    return f"$ \r\n__CENTML_BEGIN_feed_{n}__\r\n{output}\r\n__CENTML_END_feed_{n}__:{exit_code}\r\n"
+
+
+class TestExecSessionCommands:
+    def _run(self, messages, commands, write=None):
+        ws = AsyncMock()
+        ws.recv = AsyncMock(side_effect=[m if isinstance(m, Exception) else json.dumps({"data": m}) for m in messages])
+        results = []
+
+        async def _session():
+            async with ExecSession("wss://test/ws", "fake-token") as session:
+                for command in commands:
+                    results.append(await session.run(command, write=write))
+
+        with (
+            patch("centml.sdk.shell.session.websockets") as mock_ws_mod,
+            patch("centml.sdk.shell.session.secrets.token_hex", return_value="feed"),
+        ):
+            mock_ws_mod.connect = MagicMock(
+                return_value=AsyncMock(__aenter__=AsyncMock(return_value=ws), __aexit__=AsyncMock(return_value=False))
+            )
+            mock_ws_mod.ConnectionClosed = _ws_lib.ConnectionClosed
+            asyncio.run(_session())
+        return results, [json.loads(call.args[0]) for call in ws.send.call_args_list]
+
+    def test_runs_commands_in_one_connection(self):
+        results, sent = self._run([_framed(1, "one\r\n", 0), _framed(2, "two", 3)], ["echo one", "printf two; exit 3"])
+
+        assert [(r.command, r.output, r.exit_code) for r in results] == [
+            ("echo one", "one\n", 0),
+            ("printf two; exit 3", "two", 3),
+        ]
+        stdin = [m["data"] for m in sent if m["operation"] == "stdin"]
+        assert stdin[0].startswith("stty -echo")
+        assert "{ echo one; } </dev/null" in stdin[1] and "\\137\\137CENTML_BEGIN_feed_1" in stdin[1]
+        assert "CENTML_END_feed_2" in stdin[2].replace("\\137", "_")
+        assert stdin[-1] == "exit\n"
+
+    def test_ignores_markers_of_other_commands(self):
+        stale = "__CENTML_END_feed_1__:9\r\n"
+        results, _ = self._run([_framed(1, "", 9), stale + _framed(2, "fresh\r\n", 0)], ["first", "second"])
+
+        assert (results[1].output, results[1].exit_code) == ("fresh\n", 0)
+
+    def test_streams_output_with_normalized_line_endings(self):
+        chunks = []
+        messages = ["__CENTML_BEGIN_feed_1__\r\na\r\n", "b\r\n\r\n__CENTML_END_feed_1__:0\r\n"]
+        results, _ = self._run(messages, ["cmd"], write=chunks.append)
+
+        assert "".join(chunks) == results[0].output == "a\nb\n"
+
+    def test_shell_exit_raises(self):
+        ws_messages = ["__CENTML_BEGIN_feed_1__\r\npartial\r\n"]
+        with pytest.raises(ShellError, match="exited before 'exit'"):
+            self._run(ws_messages + [_ws_lib.ConnectionClosed(None, None)], ["exit"])
+
+
 # ===========================================================================
 # forward_io -- exit detection and shutdown
 # ===========================================================================
@@ -282,7 +433,7 @@ class TestForwardIo:
     so forward_io relies on ConnectionClosed to terminate cleanly.
     """
 
-    def _run_forward_io(self, ws, shutdown=None):
+    def _run_forward_io(self, ws, shutdown=None, stdout=None, stderr=None):
         """Helper: run forward_io with a real pipe fd standing in for stdin."""
 
         if shutdown is None:
@@ -297,8 +448,8 @@ class TestForwardIo:
             ):
                 mock_sys.stdin.fileno.return_value = read_fd
                 mock_sys.stdin.buffer.read1 = lambda n: b""
-                mock_sys.stdout.buffer = io.BytesIO()
-                mock_sys.stderr.buffer = io.BytesIO()
+                mock_sys.stdout.buffer = stdout or io.BytesIO()
+                mock_sys.stderr.buffer = stderr or io.BytesIO()
                 mock_ws_mod.ConnectionClosed = _ws_lib.ConnectionClosed
 
                 return asyncio.run(forward_io(ws, [80, 24], shutdown))
@@ -320,6 +471,44 @@ class TestForwardIo:
 
         assert self._run_forward_io(ws) == 0
 
+    def test_received_messages_are_written_together(self):
+        ws = AsyncMock()
+        ws.recv = AsyncMock(
+            side_effect=[
+                json.dumps({"data": "one\r\n"}),
+                json.dumps({"data": "two\r\n"}),
+                json.dumps({"data": "three\r\n"}),
+                _ws_lib.ConnectionClosed(None, None),
+            ]
+        )
+        stdout = MagicMock(wraps=io.BytesIO())
+
+        assert self._run_forward_io(ws, stdout=stdout) == 0
+
+        stdout.write.assert_called_once_with(b"one\r\ntwo\r\nthree\r\n")
+        stdout.flush.assert_called_once()
+
+    def test_errors_stay_in_order_with_output(self):
+        ws = AsyncMock()
+        ws.recv = AsyncMock(
+            side_effect=[
+                json.dumps({"data": "before\r\n"}),
+                json.dumps({"error": "boom"}),
+                json.dumps({"data": "after\r\n"}),
+                _ws_lib.ConnectionClosed(None, None),
+            ]
+        )
+        events = MagicMock()
+
+        assert self._run_forward_io(ws, stdout=events.stdout, stderr=events.stderr) == 0
+
+        writes = [(c[0], c.args[0]) for c in events.mock_calls if c[0].endswith("write")]
+        assert writes == [
+            ("stdout.write", b"before\r\n"),
+            ("stderr.write", b"Error: boom\r\n"),
+            ("stdout.write", b"after\r\n"),
+        ]
+
     def test_shutdown_event_exits(self):
         """shutdown event causes forward_io to exit."""
 
@@ -365,6 +554,42 @@ class TestForwardIo:
         finally:
             os.close(read_fd)
 
+    def _run_with_stdin_reads(self, reads):
+        """Run forward_io with a readable stdin whose reads return ``reads``; return the stdin frames sent."""
+        ws = AsyncMock()
+
+        async def _block_recv():
+            await asyncio.sleep(999)
+
+        ws.recv = _block_recv
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"x")
+        try:
+            with (
+                patch("centml.sdk.shell.session.sys") as mock_sys,
+                patch("centml.sdk.shell.session.websockets") as mock_ws_mod,
+            ):
+                mock_sys.stdin.fileno.return_value = read_fd
+                mock_sys.stdin.buffer.read1 = MagicMock(side_effect=reads)
+                mock_sys.stdout.buffer = io.BytesIO()
+                mock_ws_mod.ConnectionClosed = _ws_lib.ConnectionClosed
+
+                assert asyncio.run(asyncio.wait_for(forward_io(ws, [80, 24], asyncio.Event()), 5)) == 0
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        return [json.loads(call.args[0]) for call in ws.send.call_args_list]
+
+    def test_stdin_reads_of_one_iteration_share_a_frame(self):
+        frames = self._run_with_stdin_reads([b"l", b"s", b"\r", b""])
+
+        assert "".join(frame["data"] for frame in frames) == "ls\r"
+        assert len(frames) < 3
+        assert all(frame["operation"] == "stdin" and frame["cols"] == 80 for frame in frames)
+
+    def test_stdin_eof_ends_session_without_timeout(self):
+        assert not self._run_with_stdin_reads([b""])
+
 
 # ===========================================================================
 # interactive_session -- terminal restore
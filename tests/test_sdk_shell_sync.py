@@ -0,0 +1,193 @@
+"""Tests for centml.sdk.shell.sync -- delta directory sync to pods."""
+
+import asyncio
+import io
+import os
+import subprocess
+import tarfile
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from centml.sdk.shell.session import ExecResult, TransferStats
+from centml.sdk.shell.sync import (
+    BLOCK_SIZE,
+    block_size,
+    delta,
+    is_excluded,
+    local_block_hashes,
+    parse_listing,
+    scan_local,
+    sync_to_pod,
+)
+
+
+class TestHelpers:
+    def test_block_size_grows_with_the_file(self):
+        assert block_size(0) == block_size(BLOCK_SIZE * 256) == BLOCK_SIZE
+        assert block_size(BLOCK_SIZE * 256 + 1) == 2 * BLOCK_SIZE
+
+    def test_is_excluded(self):
+        assert is_excluded(".git/HEAD", [".git"])
+        assert is_excluded("pkg/__pycache__/m.pyc", ["__pycache__"])
+        assert is_excluded("data/a.bin", ["data/*.bin"])
+        assert not is_excluded("other/data/a.bin", ["data/*.bin"])
+        assert not is_excluded("src/main.py", [".git", "*.pyc"])
+
+    def test_scan_local_skips_excluded_paths(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("ref", encoding="utf-8")
+        (tmp_path / "pkg" / "empty").mkdir(parents=True)
+        (tmp_path / "pkg" / "m.py").write_text("x", encoding="utf-8")
+        (tmp_path / "dangling").symlink_to(tmp_path / "missing")
+
+        files, dirs = scan_local(str(tmp_path), exclude=[".git"])
+
+        assert list(files) == ["pkg/m.py"]
+        assert dirs == ["pkg", "pkg/empty"]
+
+    def test_parse_listing(self):
+        output = "12 1700000000 ./a b.txt\n0 1700000001 ./pkg/m.py\nstat: cannot stat 'x'\n"
+
+        assert parse_listing(output) == {"a b.txt": (12, 1700000000), "pkg/m.py": (0, 1700000001)}
+
+    def test_delta_reuses_blocks_anywhere_in_the_old_file(self):
+        old = ["a", "b", "c", "d"]
+
+        assert delta(old, old) == ([("old", 0, 4)], [])
+        assert delta(["a", "x", "c", "d", "e"], old) == (
+            [("old", 0, 1), ("new", 0, 1), ("old", 2, 2), ("new", 1, 1)],
+            [1, 4],
+        )
+        assert delta(["c", "d", "a"], old) == ([("old", 2, 2), ("old", 0, 1)], [])
+        assert delta([], old) == ([], [])
+
+
+def _pod_session(pod_dir):
+    """An ExecSession stand-in running commands with sh in ``pod_dir``."""
+
+    class _Session:
+        def __init__(self, ws_url, token):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def run(self, command, write=None):
+            done = subprocess.run(["sh", "-c", command], cwd=pod_dir, capture_output=True, text=True, check=False)
+            return ExecResult(command, done.stdout, done.returncode)
+
+    return _Session
+
+
+def _sync(source, pod_dir, **kwargs):
+    """Run sync_to_pod, extracting the upload into a staging dir of ``pod_dir`` and applying it there."""
+    uploads = []
+
+    async def _upload(ws_url, token, blocks, command, description):
+        archive = b"".join(blocks)
+        uploads.append(archive)
+        with tempfile.TemporaryDirectory(dir=pod_dir, prefix=".centml-sync.") as staging:
+            with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+                tar.extractall(staging)
+            subprocess.run(["sh", os.path.join(staging, "apply.sh"), staging], cwd=pod_dir, check=True)
+        return TransferStats(bytes=len(archive))
+
+    with (
+        patch("centml.sdk.shell.sync.ExecSession", _pod_session(pod_dir)),
+        patch("centml.sdk.shell.sync._upload", new=_upload),
+    ):
+        result = asyncio.run(sync_to_pod("wss://test/ws", "fake-token", str(source), ".", **kwargs))
+    return result, uploads
+
+
+def _tree(root):
+    tree = {}
+    for current, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(current, name)
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                tree[os.path.relpath(path, root)] = (f.read(), int(st.st_mtime), st.st_mode)
+    return tree
+
+
+class TestSyncToPod:
+    @pytest.fixture(name="trees")
+    def fixture_trees(self, tmp_path):
+        local, pod = tmp_path / "local", tmp_path / "pod"
+        (local / "pkg").mkdir(parents=True)
+        pod.mkdir()
+        (local / "weights.bin").write_bytes(os.urandom(5 * BLOCK_SIZE + 100))
+        (local / "pkg" / "main.py").write_text("print('hi')\n", encoding="utf-8")
+        (local / "run.sh").write_text("#!/bin/sh\n", encoding="utf-8")
+        (local / "run.sh").chmod(0o755)
+        return local, pod
+
+    def test_first_sync_sends_everything(self, trees):
+        local, pod = trees
+
+        result, _ = _sync(local, pod)
+
+        assert result.new == ["pkg/main.py", "run.sh", "weights.bin"]
+        assert result.sent_bytes == result.total_bytes
+        assert _tree(pod) == _tree(local)
+
+    def test_second_sync_sends_only_changed_blocks(self, trees):
+        local, pod = trees
+        _sync(local, pod)
+        with open(local / "weights.bin", "r+b") as f:
+            f.seek(2 * BLOCK_SIZE + 10)
+            f.write(b"changed")
+        with open(local / "weights.bin", "ab") as f:
+            f.write(b"appended")
+        os.utime(local / "pkg" / "main.py", (1_600_000_000, 1_600_000_000))
+
+        result, uploads = _sync(local, pod)
+
+        assert result.changed == ["weights.bin"]
+        assert result.unchanged == 2
+        # The edited block and the grown last block.
+        assert result.sent_bytes == BLOCK_SIZE + 100 + len(b"appended")
+        assert len(uploads[0]) < 3 * BLOCK_SIZE
+        assert _tree(pod) == _tree(local)
+
+    def test_unchanged_tree_uploads_nothing(self, trees):
+        local, pod = trees
+        _sync(local, pod)
+
+        result, uploads = _sync(local, pod)
+
+        assert (result.new, result.changed, result.unchanged, uploads) == ([], [], 3, [])
+
+    def test_delete_keeps_excluded_files(self, trees):
+        local, pod = trees
+        (pod / "stale.txt").write_text("old", encoding="utf-8")
+        (pod / "cache.pyc").write_text("keep", encoding="utf-8")
+
+        result, _ = _sync(local, pod, exclude=["*.pyc"], delete=True)
+
+        assert result.deleted == ["stale.txt"]
+        assert not (pod / "stale.txt").exists() and (pod / "cache.pyc").exists()
+
+    def test_dry_run_changes_nothing(self, trees):
+        local, pod = trees
+
+        result, uploads = _sync(local, pod, dry_run=True)
+
+        assert len(result.new) == 3 and result.stats is None
+        assert not uploads and not os.listdir(pod)
+
+
+def test_local_block_hashes_match_the_pod_side(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(os.urandom(2 * BLOCK_SIZE + 5))
+    command = f"for i in 0 1 2; do dd if=blob bs={BLOCK_SIZE} skip=$i count=1 2>/dev/null | sha256sum; done"
+
+    pod_side = subprocess.run(["sh", "-c", command], cwd=tmp_path, capture_output=True, text=True, check=True)
+
+    assert [line.split()[0] for line in pod_side.stdout.splitlines()] == local_block_hashes(path, BLOCK_SIZE)
@@ -0,0 +1,267 @@
+"""Tests for centml.sdk.shell.transfer -- cp over the terminal WebSocket."""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import websockets as _ws_lib
+
+from centml.sdk.shell.exceptions import ShellError
+from centml.sdk.shell.session import BEGIN_MARKER, END_MARKER, TransferStats
+from centml.sdk.shell.transfer import copy_from_pod, copy_to_pod
+
+
+class _FakePod:
+    """The pod side of an upload: decodes the chunks typed into the terminal and acknowledges them.
+
+    Acknowledgements are held back until ``hold`` chunks are unacknowledged,
+    so a sender ignoring its window would push more than ``hold`` at a time.
+    """
+
+    def __init__(self, hold=1, bad_chunk=None, exit_code=0):
+        self.hold = hold
+        self.bad_chunk = bad_chunk
+        self.exit_code = exit_code
+        self.command = None
+        self.chunks = []
+        self.stdin = []
+        self.max_in_flight = 0
+        self._unacked = []
+        self._typed = ""
+        self._inbox = asyncio.Queue()
+
+    def _reply(self, text):
+        self._inbox.put_nowait(json.dumps({"data": text}))
+
+    def _ack(self):
+        for index in self._unacked:
+            data = b"garbled" if index == self.bad_chunk else self.chunks[index]
+            self._reply(f"ACK {index} {hashlib.sha256(data).hexdigest()}  -\r\n")
+        self._unacked.clear()
+
+    async def send(self, raw):
+        msg = json.loads(raw)
+        if msg["operation"] != "stdin":
+            return
+        self.stdin.append(msg["data"])
+        if self.command is None:
+            self.command = msg["data"]
+            self._reply(f"$ \r\n{BEGIN_MARKER}\r\n")
+            return
+        self._typed += msg["data"]
+        while "\x04" in self._typed:
+            chunk, _, self._typed = self._typed.partition("\x04")
+            data = base64.b64decode(chunk.replace("\n", ""))
+            if not data:
+                self._ack()
+                self._reply(f"\r\n{END_MARKER}:{self.exit_code}\r\n")
+                continue
+            self._unacked.append(len(self.chunks))
+            self.chunks.append(data)
+            self.max_in_flight = max(self.max_in_flight, len(self._unacked))
+            if len(self._unacked) >= self.hold:
+                self._ack()
+
+    async def recv(self):
+        return await self._inbox.get()
+
+
+def _upload(source, destination, pod_args=None, **kwargs):
+    async def _run():
+        pod = _FakePod(**(pod_args or {}))
+        with patch("centml.sdk.shell.transfer.websockets") as mock_ws_mod:
+            mock_ws_mod.connect = MagicMock(
+                return_value=AsyncMock(__aenter__=AsyncMock(return_value=pod), __aexit__=AsyncMock(return_value=False))
+            )
+            mock_ws_mod.ConnectionClosed = _ws_lib.ConnectionClosed
+            try:
+                return await copy_to_pod("wss://test/ws", "fake-token", str(source), destination, **kwargs), pod
+            except ShellError as e:
+                e.pod = pod
+                raise
+
+    return asyncio.run(_run())
+
+
+class TestCopyToPod:
+    def test_file_arrives_compressed_in_chunks(self, tmp_path):
+        content = os.urandom(10000)
+        source = tmp_path / "weights.bin"
+        source.write_bytes(content)
+
+        stats, pod = _upload(source, "/data/my dir", chunk_size=1024)
+
+        assert gzip.decompress(b"".join(pod.chunks)) == content
+        assert len(pod.chunks) > 1 and all(len(chunk) <= 1024 for chunk in pod.chunks)
+        assert stats.bytes == len(content)
+        assert "__d='/data/my dir'" in pod.command and "/weights.bin" in pod.command
+        assert 'gunzip >"$__d.centml-part"' in pod.command
+        assert all(len(line) <= 4000 for data in pod.stdin[1:] for line in data.split("\n"))
+
+    def test_directory_is_sent_as_tar(self, tmp_path):
+        (tmp_path / "src" / "sub").mkdir(parents=True)
+        (tmp_path / "src" / "a.txt").write_text("a", encoding="utf-8")
+        (tmp_path / "src" / "sub" / "b.txt").write_text("b", encoding="utf-8")
+
+        _, pod = _upload(tmp_path / "src", "/srv")
+
+        with tarfile.open(fileobj=io.BytesIO(gzip.decompress(b"".join(pod.chunks)))) as tar:
+            assert {"./a.txt", "./sub/b.txt"} <= set(tar.getnames())
+        assert "tar xf -" in pod.command
+
+    def test_waits_for_acknowledgements_beyond_the_window(self, tmp_path):
+        source = tmp_path / "blob"
+        source.write_bytes(os.urandom(20000))
+
+        _, pod = _upload(source, "/tmp", pod_args={"hold": 3}, chunk_size=1024, window=3)
+
+        assert len(pod.chunks) > 6
+        assert pod.max_in_flight == 3
+
+    def test_checksum_mismatch_fails_and_ends_the_pod_loop(self, tmp_path):
+        source = tmp_path / "blob"
+        source.write_bytes(os.urandom(5000))
+
+        with pytest.raises(ShellError, match="Copying") as excinfo:
+            _upload(source, "/tmp", pod_args={"bad_chunk": 1}, chunk_size=1024)
+
+        pod = excinfo.value.pod
+        assert len(pod.chunks) < 5
+        assert pod.stdin[-1] == "\x04"
+
+    def test_pod_side_failure_raises(self, tmp_path):
+        source = tmp_path / "blob"
+        source.write_bytes(b"data")
+
+        with pytest.raises(ShellError, match="failed"):
+            _upload(source, "/read-only", pod_args={"exit_code": 1})
+
+
+def _download(stream, source, destination, exit_code=0, split=7):
+    commands = []
+
+    async def _exec_binary_session(ws_url, token, command, write=None):
+        commands.append(command)
+        for start in range(0, len(stream), split):
+            await write(stream[start : start + split])
+        return exit_code, TransferStats(bytes=len(stream))
+
+    with patch("centml.sdk.shell.transfer.exec_binary_session", new=_exec_binary_session):
+        stats = asyncio.run(copy_from_pod("wss://test/ws", "fake-token", source, str(destination)))
+    return stats, commands[0]
+
+
+class TestCopyFromPod:
+    def test_file_lands_in_existing_directory(self, tmp_path):
+        content = os.urandom(5000)
+
+        stats, command = _download(gzip.compress(b"F" + content), "/data/model.bin", tmp_path)
+
+        assert (tmp_path / "model.bin").read_bytes() == content
+        assert stats.bytes == len(content)
+        assert os.listdir(tmp_path) == ["model.bin"]
+        assert "gzip -1 -c" in command and "cat /data/model.bin" in command
+
+    def test_directory_is_extracted(self, tmp_path):
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for name, data in (("./config.json", b"{}"), ("./shards/0.bin", b"\x00\x01")):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        _download(gzip.compress(b"D" + archive.getvalue()), "/ckpt/", tmp_path / "out")
+
+        assert (tmp_path / "out" / "config.json").read_bytes() == b"{}"
+        assert (tmp_path / "out" / "shards" / "0.bin").read_bytes() == b"\x00\x01"
+
+    def test_directory_is_merged_into_an_existing_one(self, tmp_path):
+        (tmp_path / "ckpt" / "shards").mkdir(parents=True)
+        (tmp_path / "ckpt" / "shards" / "1.bin").write_bytes(b"kept")
+        (tmp_path / "ckpt" / "config.json").write_bytes(b"old")
+        archive = _archive(_member("./config.json", b"{}"), _member("./shards/0.bin", b"\x00"))
+
+        _download(gzip.compress(b"D" + archive), "/ckpt", tmp_path)
+
+        assert (tmp_path / "ckpt" / "config.json").read_bytes() == b"{}"
+        assert sorted(os.listdir(tmp_path / "ckpt" / "shards")) == ["0.bin", "1.bin"]
+        assert os.listdir(tmp_path) == ["ckpt"]
+
+    def test_truncated_directory_leaves_nothing_behind(self, tmp_path):
+        stream = gzip.compress(b"D" + _archive(_member("./a.txt", os.urandom(5000))))
+
+        with pytest.raises(ShellError, match="truncated"):
+            _download(stream[:-20], "/ckpt", tmp_path / "out")
+
+        assert not os.listdir(tmp_path)
+
+    def test_truncated_stream_leaves_nothing_behind(self, tmp_path):
+        stream = gzip.compress(b"F" + os.urandom(5000))
+
+        with pytest.raises(ShellError, match="truncated"):
+            _download(stream[:-20], "/data/model.bin", tmp_path)
+
+        assert not os.listdir(tmp_path)
+
+    def test_missing_source_raises(self, tmp_path):
+        with pytest.raises(ShellError, match="exit code 1"):
+            _download(b"", "/nope", tmp_path, exit_code=1)
+
+
+def _archive(*members):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        for info, data in members:
+            tar.addfile(info, io.BytesIO(data) if data else None)
+    return archive.getvalue()
+
+
+def _member(name, data=b"", linkname=None):
+    info = tarfile.TarInfo(name)
+    if linkname is None:
+        info.size = len(data)
+    else:
+        info.type, info.linkname = tarfile.SYMTYPE, linkname
+    return info, data
+
+
+class TestUnfilteredExtraction:
+    @pytest.fixture(autouse=True)
+    def _without_data_filter(self, monkeypatch):
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+
+    def test_regular_members_are_extracted(self, tmp_path):
+        archive = _archive(_member("./a.txt", b"a"), _member("./sub/link", linkname="../a.txt"))
+
+        _download(gzip.compress(b"D" + archive), "/ckpt", tmp_path / "out")
+
+        assert (tmp_path / "out" / "sub" / "link").read_bytes() == b"a"
+
+    @pytest.mark.parametrize(
+        "member",
+        [
+            _member("../escaped.txt", b"x"),
+            _member("/tmp/escaped.txt", b"x"),
+            _member("./link", linkname="/etc"),
+            _member("./link", linkname="../.."),
+        ],
+    )
+    def test_members_leaving_the_destination_are_refused(self, tmp_path, member):
+        with pytest.raises(ShellError, match="outside"):
+            _download(gzip.compress(b"D" + _archive(member)), "/ckpt", tmp_path / "out")
+
+        assert not os.listdir(tmp_path)
+
+
+def test_data_after_the_archive_fails_cleanly(tmp_path):
+    stream = gzip.compress(b"D" + _archive(_member("./a.txt", b"a")) + os.urandom(256 * 1024))
+
+    with pytest.raises(ShellError, match="ended before the stream"):
+        _download(stream, "/ckpt", tmp_path / "out", split=4096)
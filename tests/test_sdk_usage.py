@@ -0,0 +1,189 @@
+"""Tests for centml.sdk.usage and CentMLClient.get_deployment_usage."""
+
+import json
+import math
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from platform_api_python_client import ApiException, DeploymentUsage, DeploymentUsageValue, Metric
+
+from centml.sdk.api import CentMLClient
+from centml.sdk.utils.rate_limit import RateLimiter
+from centml.sdk.usage import (
+    MAX_DATA_POINTS,
+    UsageSeries,
+    collect_usage,
+    get_step_size,
+    split_usage_window,
+    stitch_usage_columns,
+    stitch_usage_series,
+)
+
+DAY = 24 * 60 * 60
+
+
+def _series(timestamps, gpu="0"):
+    return DeploymentUsage(
+        metric={"gpu": gpu}, values=[DeploymentUsageValue(timestamp=ts, value=float(ts)) for ts in timestamps]
+    )
+
+
+def test_get_step_size_tiers():
+    assert get_step_size(0, DAY) == 60
+    assert get_step_size(0, 7 * DAY) == 300
+    assert get_step_size(0, 45 * DAY) == 3600
+    assert get_step_size(0, 365 * DAY) == 3 * 3600
+
+
+def test_split_usage_window_respects_point_limit():
+    chunks = split_usage_window(0, 90 * DAY, 60)
+
+    assert chunks[0][0] == 0 and chunks[-1][1] == 90 * DAY
+    assert all((end - start) // 60 + 1 <= MAX_DATA_POINTS for start, end in chunks)
+    assert all(chunks[i + 1][0] == chunks[i][1] + 60 for i in range(len(chunks) - 1))
+    assert split_usage_window(0, 600, 60) == [(0, 600)]
+    with pytest.raises(ValueError):
+        split_usage_window(0, 600, 0)
+
+
+def test_stitch_merges_series_by_labels_and_drops_overlap():
+    stitched = stitch_usage_series(
+        [[_series([0, 60]), _series([0], gpu="1")], [_series([60, 120]), _series([60], gpu="1")]]
+    )
+
+    assert [[v.timestamp for v in s.values] for s in stitched] == [[0, 60, 120], [0, 60]]
+    assert [s.metric for s in stitched] == [{"gpu": "0"}, {"gpu": "1"}]
+
+
+def test_get_deployment_usage_stitches_chunks():
+    api = MagicMock()
+
+    def _get(**kw):
+        timestamps = range(kw["start_time_in_seconds"], kw["end_time_in_seconds"] + 1, kw["step"])
+        return SimpleNamespace(values=[_series(timestamps)])
+
+    api.get_usage_deployments_usage_deployment_id_get.side_effect = _get
+
+    series = CentMLClient(api).get_deployment_usage(1, Metric.GPU, 0, 30 * DAY, step=60)
+
+    timestamps = [v.timestamp for v in series[0].values]
+    assert timestamps == list(range(0, 30 * DAY + 1, 60))
+    assert api.get_usage_deployments_usage_deployment_id_get.call_count == 5
+
+
+def test_get_deployment_usage_picks_step():
+    api = MagicMock()
+    api.get_usage_deployments_usage_deployment_id_get.return_value = SimpleNamespace(values=[])
+
+    CentMLClient(api).get_deployment_usage(1, Metric.GPU, 0, 10 * DAY)
+
+    assert api.get_usage_deployments_usage_deployment_id_get.call_args.kwargs["step"] == 600
+
+
+class TestUsageSeries:
+    SERIES = UsageSeries.from_points({"gpu": "0"}, [(0, 1.0), (60, 3.0), (120, 5.0), (180, 7.0), (480, 9.0)], step=60)
+
+    def test_resample(self):
+        resampled = self.SERIES.resample(240)
+        assert list(resampled.timestamps) == [0, 480]
+        assert list(resampled.values) == [4.0, 9.0]
+        assert list(self.SERIES.resample(240, how="max").values) == [7.0, 9.0]
+        with pytest.raises(ValueError):
+            self.SERIES.resample(240, how="median")
+
+    def test_rolling_mean(self):
+        rolled = self.SERIES.rolling_mean(2)
+        assert list(rolled.timestamps) == [60, 120, 180, 480]
+        assert list(rolled.values) == [2.0, 4.0, 6.0, 8.0]
+        assert len(self.SERIES.rolling_mean(10)) == 0
+
+    def test_percentiles(self):
+        assert self.SERIES.percentiles([0, 50, 100, 25]) == [1.0, 5.0, 9.0, 3.0]
+
+    def test_gaps(self):
+        assert self.SERIES.gaps() == [(180, 480)]
+        assert self.SERIES.gaps(step=300) == []
+
+    def test_stitch_columns(self):
+        first = UsageSeries.from_points({"gpu": "0"}, [(0, 1.0), (60, 2.0)], step=60)
+        second = UsageSeries.from_points({"gpu": "0"}, [(60, 2.0), (120, 3.0)], step=60)
+        [stitched] = stitch_usage_columns([[first], [second]])
+        assert list(stitched.timestamps) == [0, 60, 120]
+        assert list(stitched.values) == [1.0, 2.0, 3.0]
+
+
+def test_get_deployment_usage_columnar_reads_raw_json():
+    api = MagicMock()
+
+    def _get(**kw):
+        timestamps = range(kw["start_time_in_seconds"], kw["end_time_in_seconds"] + 1, kw["step"])
+        body = {"values": [{"metric": {"gpu": "0"}, "values": [{"timestamp": ts, "value": 0.5} for ts in timestamps]}]}
+        return SimpleNamespace(status=200, reason="OK", data=json.dumps(body).encode())
+
+    api.get_usage_deployments_usage_deployment_id_get_without_preload_content.side_effect = _get
+
+    [series] = CentMLClient(api).get_deployment_usage(1, Metric.GPU, 0, 20 * DAY, step=60, columnar=True)
+
+    assert list(series.timestamps) == list(range(0, 20 * DAY + 1, 60))
+    assert series.metric == {"gpu": "0"} and series.step == 60
+    api.get_usage_deployments_usage_deployment_id_get.assert_not_called()
+
+
+def test_get_deployment_usage_columnar_raises_api_errors():
+    api = MagicMock()
+    api.get_usage_deployments_usage_deployment_id_get_without_preload_content.return_value = SimpleNamespace(
+        status=404, reason="Not Found", data=b'{"detail": "no such deployment"}'
+    )
+
+    with pytest.raises(ApiException) as excinfo:
+        CentMLClient(api).get_deployment_usage(1, Metric.GPU, 0, 600, columnar=True)
+    assert excinfo.value.status == 404
+
+
+def test_rate_limiter_spaces_calls_after_burst():
+    now = [0.0]
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(2, burst=2, clock=lambda: now[0], sleep=_sleep)
+    for _ in range(4):
+        limiter.acquire()
+
+    assert sleeps == [0.5, 0.5]
+    assert now[0] == 1.0
+
+
+def test_collect_deployment_usage_aligns_matrix():
+    api = MagicMock()
+
+    def _get(**kw):
+        if kw["deployment_id"] == 2 and kw["metric"] == Metric.MEMORY:
+            series = []
+        else:
+            # Two GPUs, the second one missing the first sample; off-grid timestamps snap to the grid.
+            scale = 10 if kw["metric"] == Metric.GPU else 1
+            series = [
+                {
+                    "metric": {"gpu": "0"},
+                    "values": [{"timestamp": ts + 1, "value": kw["deployment_id"] * scale} for ts in (0, 60, 120)],
+                },
+                {"metric": {"gpu": "1"}, "values": [{"timestamp": ts, "value": 0.0} for ts in (60, 120)]},
+            ]
+        return SimpleNamespace(status=200, reason="OK", data=json.dumps({"values": series}).encode())
+
+    api.get_usage_deployments_usage_deployment_id_get_without_preload_content.side_effect = _get
+
+    matrix = CentMLClient(api).collect_deployment_usage([1, 2], [Metric.GPU, Metric.MEMORY], 0, 120, step=60)
+
+    assert list(matrix.timestamps) == [0, 60, 120]
+    assert list(matrix.row(1, Metric.GPU)) == [10.0, 5.0, 5.0]
+    assert list(matrix.row(2, Metric.GPU)) == [20.0, 10.0, 10.0]
+    assert all(math.isnan(v) for v in matrix.row(2, Metric.MEMORY))
+    assert api.get_usage_deployments_usage_deployment_id_get_without_preload_content.call_count == 4
+
+    with pytest.raises(ValueError):
+        collect_usage(lambda d, m: [], [1], [Metric.GPU], 0, 60, 60, reduce="median")
@@ -0,0 +1,87 @@
+"""Tests for centml.sdk.usage.store -- the incremental local usage store."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from platform_api_python_client import Metric
+
+from centml.sdk.api import CentMLClient
+from centml.sdk.usage import UsageSeries, UsageStore
+
+# On the 60 s grid, so window bounds are sample timestamps.
+NOW = 1_000_020
+
+
+@pytest.fixture(name="clock")
+def fixture_clock():
+    with patch("centml.sdk.usage.store.time.time") as time_mock:
+        time_mock.return_value = NOW
+        yield time_mock
+
+
+class _Api:
+    """Fake usage source: one sample per step on the absolute step grid, recording requested windows."""
+
+    def __init__(self, step=60):
+        self.step = step
+        self.windows = []
+
+    def __call__(self, start, end):
+        self.windows.append((start, end))
+        first = -(-start // self.step) * self.step
+        points = [(ts, ts / 10) for ts in range(first, end + 1, self.step)]
+        return [UsageSeries.from_points({"gpu": "0"}, points, self.step)]
+
+
+def _timestamps(usage):
+    [series] = usage
+    return list(series.timestamps)
+
+
+def test_refresh_fetches_only_new_points(tmp_path, clock):
+    store, api = UsageStore(str(tmp_path / "usage.db"), settle_seconds=0), _Api()
+
+    first = store.get_usage(api, 1, Metric.GPU, NOW - 3600, NOW, 60)
+    clock.return_value = NOW + 600
+    second = store.get_usage(api, 1, Metric.GPU, NOW - 3000, NOW + 600, 60)
+
+    assert _timestamps(first) == list(range(NOW - 3600, NOW + 1, 60))
+    assert _timestamps(second) == list(range(NOW - 3000, NOW + 601, 60))
+    assert api.windows == [(NOW - 3600, NOW), (NOW + 60, NOW + 600)]
+
+
+def test_backfills_older_gaps(tmp_path, clock):
+    store, api = UsageStore(str(tmp_path / "usage.db"), settle_seconds=0), _Api()
+
+    store.get_usage(api, 1, "gpu", 6000, 12000, 60)
+    usage = store.get_usage(api, 1, "gpu", 0, 12000, 60)
+
+    assert _timestamps(usage) == list(range(0, 12001, 60))
+    assert api.windows == [(6000, 12000), (0, 5940)]
+    assert store.coverage(1, "gpu", 60) == [(0, 12000)]
+
+
+def test_unsettled_tail_is_refetched(tmp_path, clock):
+    store, api = UsageStore(str(tmp_path / "usage.db"), settle_seconds=300), _Api()
+
+    store.get_usage(api, 1, "gpu", NOW - 1200, NOW, 60)
+    store.get_usage(api, 1, "gpu", NOW - 1200, NOW, 60)
+
+    assert api.windows[1][0] > NOW - 300
+
+
+def test_retention_drops_old_samples(tmp_path, clock):
+    store, api = UsageStore(str(tmp_path / "usage.db"), retention_seconds=3600, settle_seconds=0), _Api()
+
+    store.get_usage(api, 1, "gpu", NOW - 7200, NOW, 60)
+
+    assert store.coverage(1, "gpu", 60) == [(NOW - 3600, NOW)]
+    # Windows past the retention limit are still answered, but fetched every time.
+    assert _timestamps(store.get_usage(api, 1, "gpu", NOW - 7200, NOW, 60))[0] == NOW - 7200
+    assert api.windows[-1] == (NOW - 7200, NOW - 3660)
+
+
+def test_client_cache_requires_columnar(tmp_path):
+    client = CentMLClient(MagicMock())
+    with pytest.raises(ValueError):
+        client.get_deployment_usage(1, Metric.GPU, 0, 600, cache=UsageStore(str(tmp_path / "usage.db")))